@@ -0,0 +1,4 @@
+"""Benchmarks for the gateway, run against local mock upstreams.
+
+Run them from ``study-buddy/gateway``, e.g. ``python -m bench.loadtest``.
+"""
@@ -0,0 +1,222 @@
+"""Answer cache benchmark: hit rate, false hits and latency on a synthetic
+classroom question log.
+
+The log draws questions from a few hundred intents with Zipf popularity,
+each asked in several wordings ("What is osmosis?", "explain osmosis
+please", ...). Many intents have near-miss siblings that share most of
+their words but need a different answer: other operators or exponents,
+swapped units, mitosis and meiosis, or one added word that narrows the
+topic ("the second derivative"). Every answer records the intent it was
+written for, so a hit that returns another intent's answer is counted as a
+false hit::
+
+    python -m bench.answer_cache --questions 20000 --thresholds 0.8 0.85 0.9
+
+Runs in-process against ``AnswerCache``; no gateway or mocks are needed.
+"""
+
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass
+
+from gateway.answer_cache import AnswerCache
+
+from .harness import percentile
+
+_PERSONALITIES = ["friendly_tutor", "serious_professor", "storyteller"]
+_PROFILES = [
+    {"topic": "Science", "education": "Middle School", "grade": "7"},
+    {"topic": "Science", "education": "High School", "grade": "10"},
+    {"topic": "Math", "education": "High School", "grade": "9"},
+]
+
+_CONCEPTS = (
+    "photosynthesis mitosis meiosis osmosis diffusion respiration evolution gravity "
+    "inertia momentum friction electricity magnetism refraction reflection erosion "
+    "weathering condensation evaporation precipitation democracy inflation fraction "
+    "decimal percentage ratio probability algebra geometry symmetry"
+).split()
+# Wordings that ask the same thing
+_CONCEPT_WORDINGS = [
+    "What is {c}?",
+    "what is {c}",
+    "Explain {c}",
+    "Can you explain {c} please?",
+    "Tell me about {c}",
+    "What's {c}?",
+    "Describe {c}.",
+]
+_HOW_WORDINGS = ["How does {c} work?", "how does {c} work", "Can you tell me how {c} works?"]
+_LONG_WORDINGS = [
+    "Explain the main stages of {c} and how each stage affects plants animals and the environment around us",
+    "Explain the main stages of {c} and how each stage affects plants animals and the environment around us today",
+    "Explain the main stages of {c} and how each stage affects plants, animals and the environment around us?",
+]
+# Topics, each with a narrower sibling that adds one word but needs a
+# different answer ("the derivative" and "the second derivative")
+_NARROWED_TOPICS = [
+    ("the area of a triangle", "the area of a right triangle"),
+    ("the derivative of a polynomial", "the second derivative of a polynomial"),
+    ("the causes of the war and how it changed the map of europe", "the causes of the cold war and how it changed the map of europe"),
+    ("the structure of a cell and what each part of it does", "the structure of a plant cell and what each part of it does"),
+    ("the law of motion and how it applies to a car braking", "the third law of motion and how it applies to a car braking"),
+    ("the parts of a flower and how pollination works", "the female parts of a flower and how pollination works"),
+]
+_TOPIC_WORDINGS = [
+    "Explain {t}",
+    "Can you explain {t} please",
+    "Explain {t} with a worked example and show how each step follows from the one before",
+    "Explain {t} with a worked example and show how each step follows from the one before today",
+    "Explain {t} simply with a worked example and show how each step follows from the one before",
+]
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    wordings: tuple[str, ...]
+
+
+def build_intents(rng: random.Random) -> list[Intent]:
+    intents = []
+    for concept in _CONCEPTS:
+        intents.append(Intent(f"what:{concept}", tuple(w.format(c=concept) for w in _CONCEPT_WORDINGS)))
+        intents.append(Intent(f"how:{concept}", tuple(w.format(c=concept) for w in _HOW_WORDINGS)))
+        intents.append(Intent(f"long:{concept}", tuple(w.format(c=concept) for w in _LONG_WORDINGS)))
+    for topics in _NARROWED_TOPICS:
+        for topic in topics:
+            intents.append(Intent(f"topic:{topic}", tuple(w.format(t=topic) for w in _TOPIC_WORDINGS)))
+
+    for _ in range(40):
+        a, b, c, d = (rng.randint(1, 9) for _ in range(4))
+        for op in "+-*/":
+            intents.append(Intent(f"frac:{a}/{b}{op}{c}/{d}", (
+                f"What is {a}/{b} {op} {c}/{d}?",
+                f"what is {a}/{b}{op}{c}/{d}",
+                f"Can you solve {a}/{b} {op} {c}/{d} please",
+            )))
+    for n in range(2, 10):
+        intents.append(Intent(f"derivative:x^{n}", (
+            f"What is the derivative of x^{n}?",
+            f"derivative of x^{n}",
+            f"Can you explain the derivative of x^{n}",
+        )))
+    for degrees in (0, 32, 37, 50, 100, 212):
+        for source, target in (("fahrenheit", "celsius"), ("celsius", "fahrenheit")):
+            intents.append(Intent(f"convert:{degrees}{source}->{target}", (
+                f"Convert {degrees} {source} to {target}",
+                f"convert {degrees} {source} to {target} please",
+                f"How do I convert {degrees} {source} to {target}?",
+            )))
+    for _ in range(30):
+        a, b, c = rng.randint(2, 9), rng.randint(1, 20), rng.randint(21, 60)
+        for rhs in (c, c + 1):
+            intents.append(Intent(f"solve:{a}x+{b}={rhs}", (
+                f"Solve {a}x + {b} = {rhs}",
+                f"solve {a}x+{b}={rhs}",
+                f"How do I solve {a}x + {b} = {rhs}?",
+            )))
+    return intents
+
+
+def question_log(count: int, seed: int) -> list[tuple[str, dict, str, Intent]]:
+    rng = random.Random(seed)
+    intents = build_intents(rng)
+    rng.shuffle(intents)
+    # Zipf popularity: a few questions are asked constantly, most rarely
+    weights = [1 / rank for rank in range(1, len(intents) + 1)]
+    log = []
+    for intent in rng.choices(intents, weights, k=count):
+        log.append((
+            rng.choice(_PERSONALITIES),
+            rng.choice(_PROFILES),
+            rng.choice(intent.wordings),
+            intent,
+        ))
+    return log
+
+
+def run(log: list, threshold: float, max_bytes: int) -> dict:
+    cache = AnswerCache(max_bytes, ttl=86400, threshold=threshold)
+    lookups: list[float] = []
+    stores: list[float] = []
+    false_hits: list[tuple[str, str]] = []
+    seen: set[tuple] = set()
+    possible = 0
+    for personality, profile, question, intent in log:
+        scope = (personality, tuple(profile.values()), intent.name)
+        possible += scope in seen
+        seen.add(scope)
+
+        started = time.perf_counter_ns()
+        hit = cache.lookup(personality, profile, question)
+        lookups.append((time.perf_counter_ns() - started) / 1000)
+        if hit is not None:
+            if hit.answer.split("\n", 1)[0] != intent.name:
+                false_hits.append((question, hit.answer.split("\n")[1]))
+            continue
+
+        # What the model would have answered, tagged with what was asked
+        answer = f"{intent.name}\n{question}\n" + "An answer of typical length. " * 25
+        started = time.perf_counter_ns()
+        cache.store(personality, profile, question, answer)
+        stores.append((time.perf_counter_ns() - started) / 1000)
+
+    stats = cache.stats()
+    hits = stats["hits"]["exact"] + stats["hits"]["similar"]
+    return {
+        "threshold": threshold,
+        "questions": len(log),
+        "hits_exact": stats["hits"]["exact"],
+        "hits_similar": stats["hits"]["similar"],
+        "false_hits": len(false_hits),
+        "hit_rate": stats["hit_rate"],
+        # Questions whose intent had been asked before in the same scope
+        "best_possible_hit_rate": round(possible / len(log), 4),
+        "llm_calls_saved": hits - len(false_hits),
+        "lookup_us_p50": round(percentile(lookups, 50), 1),
+        "lookup_us_p99": round(percentile(lookups, 99), 1),
+        "store_us_p50": round(percentile(stores, 50), 1) if stores else None,
+        "store_us_p99": round(percentile(stores, 99), 1) if stores else None,
+        "entries": stats["entries"],
+        "evictions": stats["evictions"],
+        "false_hit_examples": false_hits[:5],
+    }
+
+
+def _print_table(reports: list[dict]) -> None:
+    print(
+        f"{'threshold':>9} {'exact':>7} {'similar':>7} {'false':>6} {'hit rate':>8} "
+        f"{'possible':>8} {'saved':>7} {'lookup us p50/p99':>18} {'store us p50/p99':>17}"
+    )
+    for r in reports:
+        print(
+            f"{r['threshold']:>9} {r['hits_exact']:>7} {r['hits_similar']:>7} {r['false_hits']:>6} "
+            f"{r['hit_rate']:>8.2%} {r['best_possible_hit_rate']:>8.2%} {r['llm_calls_saved']:>7} "
+            f"{r['lookup_us_p50']:>8}/{r['lookup_us_p99']:<9} {r['store_us_p50']:>8}/{r['store_us_p99']}"
+        )
+        for question, cached in r["false_hit_examples"]:
+            print(f"    false hit: {question!r} answered with {cached!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.85, 0.9])
+    parser.add_argument("--cache-mb", type=float, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args()
+
+    log = question_log(args.questions, args.seed)
+    reports = [run(log, threshold, int(args.cache_mb * 1024 * 1024)) for threshold in args.thresholds]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        _print_table(reports)
+
+
+if __name__ == "__main__":
+    main()
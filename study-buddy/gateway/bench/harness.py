@@ -0,0 +1,93 @@
+"""Shared plumbing for the benchmarks: a local gateway plus mock upstreams,
+started in subprocesses, and latency percentiles."""
+
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import fields
+from pathlib import Path
+
+from .mock_upstreams import MockLatency
+
+GATEWAY_DIR = Path(__file__).resolve().parents[1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with status {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout}s")
+
+
+def _latency_arguments(latency: MockLatency) -> list[str]:
+    return [
+        arg
+        for field in fields(MockLatency)
+        for arg in (f"--{field.name.replace('_', '-')}", str(getattr(latency, field.name)))
+    ]
+
+
+@contextmanager
+def local_stack(
+    latency: MockLatency,
+    gateway_env: dict[str, str] | None = None,
+    verbose: bool = False,
+) -> Iterator[str]:
+    """Run mock upstreams and a gateway pointed at them; yields the gateway URL."""
+    mock_port, gateway_port = free_port(), free_port()
+    output = None if verbose else subprocess.DEVNULL
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "mock",
+        "ELEVEN_LABS_API_KEY": "mock",
+        "GEMINI_BASE_URL": mock_url,
+        "ELEVEN_LABS_BASE_URL": mock_url,
+        "GATEWAY_PORT": str(gateway_port),
+        **(gateway_env or {}),
+    }
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "bench.mock_upstreams", "--port", str(mock_port),
+             "--seed", "1", *_latency_arguments(latency)],
+            cwd=GATEWAY_DIR, stdout=output, stderr=output,
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "gateway"],
+            cwd=GATEWAY_DIR, env=env, stdout=output, stderr=output,
+        ),
+    ]
+    try:
+        _wait_for_port(mock_port, processes[0])
+        _wait_for_port(gateway_port, processes[1])
+        yield f"http://127.0.0.1:{gateway_port}"
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def percentile(samples: Sequence[float], p: float) -> float | None:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
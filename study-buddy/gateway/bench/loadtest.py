@@ -0,0 +1,184 @@
+"""Load test: many concurrent tutoring sessions through the gateway.
+
+Starts mock upstreams and a gateway (see ``bench.harness``), then for each
+session count runs that many sessions at once. A session sends ``--turns``
+chat turns; each turn streams ``/chat`` to the end and then fetches TTS for
+the first two sentences, as the browser does. Reports p50/p99 latency and
+requests per second::
+
+    python -m bench.loadtest --sessions 100 250 500 1000
+
+At 1,000 sessions raise the open-file limit first (``ulimit -n 8192``).
+The answer and audio caches are off unless ``--with-caches`` is given, so
+every turn reaches the mock upstreams.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from .harness import local_stack, percentile
+from .mock_upstreams import add_latency_arguments, latency_from_arguments
+
+_PROFILE = {"topic": "Biology", "education": "High School", "grade": "10"}
+_SENTENCE = re.compile(r"[^.!?]+[.!?]+")
+
+
+class _Round:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.requests = 0
+
+
+async def _tts(client: httpx.AsyncClient, text: str, result: _Round) -> None:
+    started = time.perf_counter()
+    result.requests += 1
+    try:
+        response = await client.post(
+            "/tts", json={"personality": "friendly_tutor", "text": text}
+        )
+    except httpx.HTTPError as err:
+        result.errors[f"tts {type(err).__name__}"] += 1
+        return
+    if response.status_code != 200:
+        result.errors[f"tts {response.status_code}"] += 1
+        return
+    result.samples["tts"].append(time.perf_counter() - started)
+
+
+async def _session(
+    client: httpx.AsyncClient, session: int, turns: int, think: float, result: _Round
+) -> None:
+    history: list[dict[str, str]] = []
+    for turn in range(turns):
+        message = f"Question {turn} from student {session}: how does photosynthesis work?"
+        body = {
+            "personality": "friendly_tutor",
+            "profile": _PROFILE,
+            "history": history[-6:],
+            "message": message,
+        }
+        started = time.perf_counter()
+        first_byte = None
+        parts: list[str] = []
+        result.requests += 1
+        try:
+            async with client.stream("POST", "/chat", json=body) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    result.errors[f"chat {response.status_code}"] += 1
+                    continue
+                async for piece in response.aiter_text():
+                    if first_byte is None:
+                        first_byte = time.perf_counter()
+                    parts.append(piece)
+        except httpx.HTTPError as err:
+            result.errors[f"chat {type(err).__name__}"] += 1
+            continue
+        finished = time.perf_counter()
+        if first_byte is not None:
+            result.samples["chat_ttfb"].append(first_byte - started)
+        result.samples["chat_total"].append(finished - started)
+
+        reply = "".join(parts)
+        sentences = [match.group().strip() for match in _SENTENCE.finditer(reply)][:2]
+        await asyncio.gather(*(_tts(client, sentence, result) for sentence in sentences))
+        history += [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+        if think:
+            await asyncio.sleep(think)
+
+
+async def run_round(gateway_url: str, sessions: int, turns: int, think: float) -> dict:
+    result = _Round()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(
+        base_url=gateway_url, limits=limits, timeout=httpx.Timeout(120)
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(_session(client, session, turns, think, result) for session in range(sessions))
+        )
+        elapsed = time.perf_counter() - started
+
+    report: dict = {
+        "sessions": sessions,
+        "requests": result.requests,
+        "seconds": round(elapsed, 3),
+        "rps": round(result.requests / elapsed, 1),
+        "errors": dict(result.errors),
+    }
+    for name, samples in result.samples.items():
+        report[name] = {
+            "count": len(samples),
+            "p50_ms": round(percentile(samples, 50) * 1000, 1),
+            "p99_ms": round(percentile(samples, 99) * 1000, 1),
+        }
+    return report
+
+
+def _print_table(reports: list[dict]) -> None:
+    header = (
+        f"{'sessions':>8} {'requests':>8} {'req/s':>7} {'chat ttfb p50/p99':>18} "
+        f"{'chat total p50/p99':>19} {'tts p50/p99':>12} {'errors':>6}"
+    )
+    print(header)
+    for report in reports:
+        cells = []
+        for name in ("chat_ttfb", "chat_total", "tts"):
+            stage = report.get(name)
+            cells.append(f"{stage['p50_ms']:.0f}/{stage['p99_ms']:.0f}" if stage else "-")
+        print(
+            f"{report['sessions']:>8} {report['requests']:>8} {report['rps']:>7} "
+            f"{cells[0]:>18} {cells[1]:>19} {cells[2]:>12} {sum(report['errors'].values()):>6}"
+        )
+
+
+async def _run(args: argparse.Namespace, gateway_url: str) -> list[dict]:
+    reports = []
+    for sessions in args.sessions:
+        report = await run_round(gateway_url, sessions, args.turns, args.think_ms / 1000)
+        reports.append(report)
+        print(f"{sessions} sessions done in {report['seconds']}s", file=sys.stderr)
+    return reports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--think-ms", type=float, default=0)
+    parser.add_argument(
+        "--gateway-url", help="benchmark a gateway that is already running instead"
+    )
+    parser.add_argument("--with-caches", action="store_true")
+    parser.add_argument("--max-upstream-concurrency", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show gateway and mock logs")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    if args.gateway_url:
+        reports = asyncio.run(_run(args, args.gateway_url))
+    else:
+        env = {} if args.with_caches else {"ANSWER_CACHE_MAX_BYTES": "0", "TTS_CACHE_MAX_BYTES": "0"}
+        if args.max_upstream_concurrency:
+            env["MAX_UPSTREAM_CONCURRENCY"] = str(args.max_upstream_concurrency)
+        with local_stack(latency_from_arguments(args), env, args.verbose) as gateway_url:
+            reports = asyncio.run(_run(args, gateway_url))
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print()
+        _print_table(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Local stand-ins for the Gemini and ElevenLabs APIs.
+
+Serves the three endpoints the gateway calls, on one port, with
+configurable latency and error injection so benchmarks are reproducible
+and cost nothing::
+
+    python -m bench.mock_upstreams --port 8790 --ttfb-ms 400 --error-rate 0.05
+
+Point ``GEMINI_BASE_URL`` and ``ELEVEN_LABS_BASE_URL`` at it.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass, fields
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+_REPLY = (
+    "Great question! Photosynthesis is how plants turn light into food. "
+    "Chlorophyll in the leaves captures sunlight, and the plant uses that "
+    "energy to combine water from the roots with carbon dioxide from the air. "
+    "The result is glucose, which the plant stores or burns for energy, and "
+    "oxygen, which it releases for us to breathe. You can think of a leaf as "
+    "a tiny solar-powered kitchen. Light is the stove, water and carbon "
+    "dioxide are the ingredients, and sugar is the meal. "
+)
+
+# Roughly what 128 kbps MP3 costs per character of English speech.
+_AUDIO_BYTES_PER_CHAR = 1100
+
+
+@dataclass
+class MockLatency:
+    """Simulated upstream timings, in milliseconds."""
+
+    ttfb_ms: float = 300
+    # Delay between streamed pieces, and characters per piece
+    piece_ms: float = 25
+    piece_chars: int = 24
+    reply_chars: int = 600
+    generate_ms: float = 800
+    tts_ms: float = 250
+    tts_ms_per_char: float = 1.5
+    # Fraction of requests answered with 429 and a Retry-After header
+    error_rate: float = 0.0
+    # Random +/- spread applied to every delay, as a fraction
+    jitter: float = 0.1
+
+
+_GENERATED = "The student asked about photosynthesis and the tutor explained it."
+_SUMMARY_PROMPT = re.compile(
+    r"CURRENT SUMMARY:\n(?P<summary>.*?)\n\nNEW MESSAGES:\n(?P<messages>.*?)\n"
+    r"Rewrite the summary .*? at most (?P<words>\d+) words",
+    re.DOTALL,
+)
+
+
+def _reply_text(chars: int) -> str:
+    return (_REPLY * (chars // len(_REPLY) + 1))[:chars]
+
+
+def _summarize(prompt: str) -> str:
+    """A predictable stand-in for a summary prompt (see
+    ``gateway.prompt.build_summary_prompt``): the current summary followed
+    by what the student said, cut to the word limit. Whatever the gateway
+    fails to pass along is lost, so tests can measure recall through it."""
+    match = _SUMMARY_PROMPT.search(prompt)
+    summary = match["summary"].strip()
+    said = [
+        line.removeprefix("Student: ").strip()
+        for line in match["messages"].splitlines()
+        if line.startswith("Student: ")
+    ]
+    kept = ([] if summary == "(none yet)" else [summary]) + said
+    words = " ".join(kept).split()
+    return " ".join(words[: int(match["words"])])
+
+
+def create_app(latency: MockLatency, seed: int | None = None) -> Starlette:
+    rng = random.Random(seed)
+
+    async def sleep(ms: float) -> None:
+        await asyncio.sleep(ms * (1 + rng.uniform(-latency.jitter, latency.jitter)) / 1000)
+
+    def rate_limited() -> Response | None:
+        if rng.random() >= latency.error_rate:
+            return None
+        return JSONResponse(
+            {"error": {"code": 429, "message": "mock rate limit"}},
+            status_code=429,
+            headers={"Retry-After": "1"},
+        )
+
+    async def stream_generate(request: Request) -> Response:
+        await request.body()
+        if (limited := rate_limited()) is not None:
+            return limited
+        await sleep(latency.ttfb_ms)
+        text = _reply_text(latency.reply_chars)
+
+        async def events():
+            for start in range(0, len(text), latency.piece_chars):
+                if start:
+                    await sleep(latency.piece_ms)
+                event = {
+                    "candidates": [
+                        {"content": {"parts": [{"text": text[start : start + latency.piece_chars]}]}}
+                    ]
+                }
+                yield f"data: {json.dumps(event)}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def generate(request: Request) -> Response:
+        payload = await request.json()
+        if (limited := rate_limited()) is not None:
+            return limited
+        await sleep(latency.generate_ms)
+        prompt = payload["contents"][0]["parts"][0]["text"]
+        text = _summarize(prompt) if _SUMMARY_PROMPT.search(prompt) else _GENERATED
+        return JSONResponse({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    async def text_to_speech(request: Request) -> Response:
+        payload = await request.json()
+        if (limited := rate_limited()) is not None:
+            return limited
+        text = str(payload.get("text", ""))
+        await sleep(latency.tts_ms + latency.tts_ms_per_char * len(text))
+        # An MPEG frame header followed by silence; enough for size-realistic
+        # transfers, not meant to be played.
+        audio = b"\xff\xfb\x90\x64" + bytes(max(0, len(text) * _AUDIO_BYTES_PER_CHAR - 4))
+        return Response(audio, media_type="audio/mpeg")
+
+    return Starlette(
+        routes=[
+            Route("/v1beta/models/{model}:streamGenerateContent", stream_generate, methods=["POST"]),
+            Route("/v1beta/models/{model}:generateContent", generate, methods=["POST"]),
+            Route("/v1/text-to-speech/{voice_id}", text_to_speech, methods=["POST"]),
+        ]
+    )
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add one ``--flag`` per MockLatency field, e.g. ``--ttfb-ms``."""
+    for field in fields(MockLatency):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=field.type,
+            default=field.default,
+        )
+
+
+def latency_from_arguments(args: argparse.Namespace) -> MockLatency:
+    return MockLatency(**{field.name: getattr(args, field.name) for field in fields(MockLatency)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--seed", type=int, default=None)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(latency_from_arguments(args), args.seed),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Replay benchmark: a scripted tutoring conversation through the gateway.
+
+Starts mock upstreams and a gateway (see ``bench.harness``) and replays
+``bench/conversation.json`` (or ``--script``) one turn at a time, the way
+the browser sends it: ``/chat`` is streamed and split into sentences as in
+``studyAI/src/lib/sentenceChunker.js``, and every sentence goes to
+``/tts`` as soon as it is complete. Reports p50/p95 per stage::
+
+    python -m bench.replay --save-baseline replay-baseline.json
+    python -m bench.replay --baseline replay-baseline.json
+
+With ``--baseline`` it exits with status 1 when a stage is slower (or a
+prompt larger) than the baseline by more than ``--tolerance``. Compare
+runs on the same machine with the same latency flags. The answer and audio
+caches are off unless ``--with-caches`` is given.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+
+import httpx
+
+from .harness import local_stack, percentile
+from .mock_upstreams import add_latency_arguments, latency_from_arguments
+
+DEFAULT_SCRIPT = Path(__file__).with_name("conversation.json")
+
+# Mirrors the browser: the reply limit, recent history sent with each turn
+# and parallel TTS requests (chatbox.jsx and gateway.js)
+OUTPUT_CHAR_LIMIT = 1000
+HISTORY_MESSAGES = 6
+TTS_CONCURRENCY = 4
+
+# Stage name -> unit; sizes are checked for regressions as well
+STAGES = {
+    "prompt_build": "ms",
+    "chat_ttfb": "ms",
+    "chat_total": "ms",
+    "tts": "ms",
+    "first_audio": "ms",
+    "turn_total": "ms",
+    "prompt_tokens": "tokens",
+    "reply_chars": "chars",
+}
+
+_PROMPT_TIMING = re.compile(r"\bprompt;dur=([\d.]+)")
+
+# Checked against studyAI/src/lib/sentenceChunker.cases.json, as is the
+# browser's chunker (tests/test_replay_chunker.py)
+_SENTENCE_BOUNDARY = re.compile(r"""[.!?…]+["')\]]*\s+|\n{2,}""")
+_MIN_FIRST_CHUNK_CHARS = 20
+_MIN_CHUNK_CHARS = 60
+_MAX_CHUNK_CHARS = 300
+
+
+class SentenceChunker:
+    """Port of ``createSentenceChunker`` so replayed turns send the same
+    TTS requests as the browser."""
+
+    def __init__(self, on_chunk: Callable[[str], None], char_limit: int = OUTPUT_CHAR_LIMIT) -> None:
+        self._on_chunk = on_chunk
+        self._char_limit = char_limit
+        self._buffer = ""
+        self.text = ""  # everything accepted so far
+        self._consumed = 0
+        self._emitted = 0
+        self.truncated = False
+
+    def _emit(self, raw: str) -> None:
+        chunk = raw.strip()
+        if chunk:
+            self._on_chunk(chunk)
+            self._emitted += 1
+
+    def _drain(self) -> None:
+        while self._buffer:
+            min_chars = _MIN_FIRST_CHUNK_CHARS if self._emitted == 0 else _MIN_CHUNK_CHARS
+            cut = next(
+                (m.end() for m in _SENTENCE_BOUNDARY.finditer(self._buffer) if m.end() >= min_chars),
+                -1,
+            )
+            if cut == -1 and len(self._buffer) > _MAX_CHUNK_CHARS:
+                space = self._buffer.rfind(" ", 0, _MAX_CHUNK_CHARS + 1)
+                cut = space + 1 if space > 0 else _MAX_CHUNK_CHARS
+            if cut == -1:
+                return
+            self._emit(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+
+    def push(self, piece: str) -> bool:
+        """Feed streamed text; False once the limit is reached."""
+        if self.truncated:
+            return False
+        room = self._char_limit - self._consumed
+        if len(piece) > room:
+            tail = piece[:room] + "..."
+            self._buffer += tail
+            self.text += tail
+            self._consumed = self._char_limit
+            self.truncated = True
+            self._drain()
+            return False
+        self._buffer += piece
+        self.text += piece
+        self._consumed += len(piece)
+        self._drain()
+        return True
+
+    def flush(self) -> None:
+        self._emit(self._buffer)
+        self._buffer = ""
+
+
+class _Replay:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def add(self, stage: str, value: float) -> None:
+        self.samples[stage].append(value)
+
+
+async def _tts(
+    client: httpx.AsyncClient,
+    slots: asyncio.Semaphore,
+    body: dict,
+    turn_started: float,
+    result: _Replay,
+) -> float | None:
+    """Synthesize one chunk; returns when its audio arrived, or None."""
+    async with slots:
+        started = time.perf_counter()
+        try:
+            response = await client.post("/tts", json=body)
+        except httpx.HTTPError as err:
+            result.errors[f"tts {type(err).__name__}"] += 1
+            return None
+    finished = time.perf_counter()
+    if response.status_code != 200:
+        result.errors[f"tts {response.status_code}"] += 1
+        return None
+    result.add("tts", (finished - started) * 1000)
+    return finished - turn_started
+
+
+async def _turn(
+    client: httpx.AsyncClient,
+    slots: asyncio.Semaphore,
+    profile: dict,
+    personality: str,
+    message: str,
+    history: list[dict[str, str]],
+    result: _Replay,
+) -> str | None:
+    tasks: list[asyncio.Task] = []
+    previous_chunk = ""
+    started = time.perf_counter()
+
+    def on_chunk(chunk: str) -> None:
+        nonlocal previous_chunk
+        body = {"personality": personality, "text": chunk, "previousText": previous_chunk}
+        tasks.append(asyncio.create_task(_tts(client, slots, body, started, result)))
+        previous_chunk = chunk
+
+    chunker = SentenceChunker(on_chunk)
+    body = {
+        "personality": personality,
+        "profile": profile,
+        "history": history[-HISTORY_MESSAGES:],
+        "message": message,
+    }
+    first_byte = None
+    try:
+        async with client.stream("POST", "/chat", json=body) as response:
+            if response.status_code != 200:
+                await response.aread()
+                result.errors[f"chat {response.status_code}"] += 1
+                return None
+            if timing := _PROMPT_TIMING.search(response.headers.get("server-timing", "")):
+                result.add("prompt_build", float(timing.group(1)))
+            if tokens := response.headers.get("x-prompt-tokens"):
+                result.add("prompt_tokens", int(tokens))
+            async for piece in response.aiter_text():
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+                if not chunker.push(piece):
+                    break
+    except httpx.HTTPError as err:
+        result.errors[f"chat {type(err).__name__}"] += 1
+        await asyncio.gather(*tasks)
+        return None
+    chunker.flush()
+    chat_finished = time.perf_counter()
+
+    if first_byte is not None:
+        result.add("chat_ttfb", (first_byte - started) * 1000)
+    result.add("chat_total", (chat_finished - started) * 1000)
+    result.add("reply_chars", len(chunker.text))
+    audio = [at for at in await asyncio.gather(*tasks) if at is not None]
+    if audio:
+        result.add("first_audio", min(audio) * 1000)
+    result.add("turn_total", (time.perf_counter() - started) * 1000)
+    return chunker.text
+
+
+async def replay(gateway_url: str, script: dict, runs: int) -> dict:
+    result = _Replay()
+    slots = asyncio.Semaphore(TTS_CONCURRENCY)
+    async with httpx.AsyncClient(base_url=gateway_url, timeout=httpx.Timeout(120)) as client:
+        for _ in range(runs):
+            history: list[dict[str, str]] = []
+            for turn in script["turns"]:
+                reply = await _turn(
+                    client, slots, script.get("profile") or {}, turn["personality"],
+                    turn["message"], history, result,
+                )
+                if reply is None:
+                    continue
+                history += [
+                    {"role": "user", "content": turn["message"]},
+                    {"role": "assistant", "content": reply},
+                ]
+
+    report: dict = {"turns": runs * len(script["turns"]), "errors": dict(result.errors), "stages": {}}
+    for stage in STAGES:
+        samples = result.samples.get(stage)
+        if samples:
+            report["stages"][stage] = {
+                "count": len(samples),
+                "p50": round(percentile(samples, 50), 2),
+                "p95": round(percentile(samples, 95), 2),
+            }
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float, slack_ms: float) -> list[str]:
+    """Stages whose p50 or p95 got worse than the baseline allows."""
+    regressions = []
+    for stage, base in baseline["stages"].items():
+        current = report["stages"].get(stage)
+        if current is None:
+            regressions.append(f"{stage}: no samples (baseline had {base['count']})")
+            continue
+        # A few milliseconds of scheduling noise is not a regression
+        slack = slack_ms if STAGES.get(stage) == "ms" else 0
+        for key in ("p50", "p95"):
+            limit = base[key] * (1 + tolerance) + slack
+            if current[key] > limit:
+                regressions.append(
+                    f"{stage} {key}: {current[key]:g} {STAGES.get(stage, '')} "
+                    f"vs baseline {base[key]:g} (limit {limit:.2f})"
+                )
+    return regressions
+
+
+def _print_table(report: dict, baseline: dict | None) -> None:
+    print(f"{report['turns']} turns, errors: {report['errors'] or 'none'}")
+    print(f"{'stage':<14} {'unit':<6} {'count':>5} {'p50':>9} {'p95':>9}"
+          + (f" {'base p50':>9} {'base p95':>9}" if baseline else ""))
+    for stage, unit in STAGES.items():
+        current = report["stages"].get(stage)
+        if current is None:
+            continue
+        line = f"{stage:<14} {unit:<6} {current['count']:>5} {current['p50']:>9g} {current['p95']:>9g}"
+        base = baseline and baseline["stages"].get(stage)
+        if base:
+            line += f" {base['p50']:>9g} {base['p95']:>9g}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", type=Path, default=DEFAULT_SCRIPT)
+    parser.add_argument("--runs", type=int, default=3, help="times to replay the script")
+    parser.add_argument(
+        "--gateway-url", help="replay against a gateway that is already running instead"
+    )
+    parser.add_argument("--with-caches", action="store_true")
+    parser.add_argument("--save-baseline", type=Path, help="write this run's results here")
+    parser.add_argument("--baseline", type=Path, help="fail on regressions against this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    parser.add_argument("--slack-ms", type=float, default=5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show gateway and mock logs")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    script = json.loads(args.script.read_text(encoding="utf-8"))
+    latency = latency_from_arguments(args)
+    if args.gateway_url:
+        report = asyncio.run(replay(args.gateway_url, script, args.runs))
+    else:
+        env = {} if args.with_caches else {"ANSWER_CACHE_MAX_BYTES": "0", "TTS_CACHE_MAX_BYTES": "0"}
+        with local_stack(latency, env, args.verbose) as gateway_url:
+            report = asyncio.run(replay(gateway_url, script, args.runs))
+    report["latency"] = asdict(latency)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_table(report, baseline)
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if baseline is None:
+        return
+    if baseline.get("latency") != report["latency"]:
+        print("warning: baseline was recorded with different mock latency", file=sys.stderr)
+    regressions = compare(report, baseline, args.tolerance, args.slack_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+    print("no regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
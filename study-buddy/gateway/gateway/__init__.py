@@ -0,0 +1 @@
+"""Study Buddy gateway: proxies chat and TTS calls to Gemini and ElevenLabs."""
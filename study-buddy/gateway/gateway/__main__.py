@@ -0,0 +1,19 @@
+"""Run the gateway with ``python -m gateway``."""
+
+import logging
+import os
+
+import uvicorn
+
+from .app import create_app
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    uvicorn.run(
+        create_app(),
+        host=os.environ.get("GATEWAY_HOST", "127.0.0.1"),
+        port=int(os.environ.get("GATEWAY_PORT", "8787")),
+        # uvloop and httptools are picked up automatically when installed.
+        loop="auto",
+        http="auto",
+    )
@@ -0,0 +1,239 @@
+"""Shared cache of chat answers for common questions.
+
+Answers are keyed by persona, learner profile and the normalised question.
+A lookup tries the exact key first, then falls back to questions with a
+similar wording for the same persona and profile. A similar question must
+have the same numbers, variables, symbols and negations, in the same
+order, may only add or leave out a few words that do not change the
+topic ("today", "simply"), and needs a Jaccard overlap of words and ordered word pairs of at least the
+threshold. Candidates are found with MinHash signatures and
+locality-sensitive hashing, so a lookup never scans the whole cache.
+
+Only stand-alone questions are cached: turns with an attached file or
+retrieved passages, and follow-ups that lean on earlier turns, bypass it.
+"""
+
+import hashlib
+import random
+import re
+from collections.abc import Hashable, Mapping, Sequence
+from dataclasses import dataclass
+
+from .lru import LRUCache
+
+# Words that change the phrasing of a question but not what is being asked.
+# Words that carry direction or relations ("to", "of", "from") are kept.
+_FILLER = frozenset(
+    "a about an are can could define describe do does explain i is know me "
+    "please tell the what whats want you".split()
+)
+# Words a student may add to a question without changing what it is about
+# ("... today", "explain it simply"). Any other extra word can narrow the
+# topic ("the second derivative", "a right triangle") and is a miss.
+_QUALIFIERS = frozenset(
+    "briefly easily easy just now quick quickly really short simple simply today".split()
+)
+# Words that only make sense after earlier turns ("explain it again", "go
+# back to the previous one", "give me another").
+_BACK_REFERENCES = frozenset("above again another previous previously".split())
+# Pronouns that stand in for an earlier topic when they open or close the
+# question ("why is that", "explain it like i'm five"), not in the middle of
+# one ("the law that says...").
+_PRONOUNS = frozenset("it that these this those they them".split())
+_PRONOUN_POSITIONS = 2
+_MENTIONS = re.compile(r"\byou (?:said|mentioned|just|wrote|told)\b")
+# Words that flip the meaning of a question; like numbers and symbols they
+# must match exactly.
+_NEGATIONS = frozenset(
+    "not no never without except cant dont doesnt didnt isnt arent wont".split()
+)
+
+_APOSTROPHE = re.compile(r"['\u2018\u2019]")
+_HYPHEN = re.compile(r"(?<=[^\W\d_]{2})-(?=[^\W\d_]{2})")
+# Numbers, words, and any other single symbol (operators, brackets, units)
+_TOKEN = re.compile(r"\d+(?:[.,]\d+)*|[^\W\d_]+|[^\w\s]")
+_PUNCTUATION = frozenset('?!,.;:"`\u201c\u201d')
+
+_NUM_PERM = 64
+_BAND_ROWS = 4
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5B1D)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(_NUM_PERM)]
+_START, _END = "\x02", "\x03"
+
+
+def _stem(word: str) -> str:
+    # Plurals only: "fractions" and "fraction" ask the same thing
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _words(question: str) -> list[str]:
+    text = _HYPHEN.sub(" ", _APOSTROPHE.sub("", question.lower()))
+    return [_stem(token) for token in _TOKEN.findall(text) if token not in _PUNCTUATION]
+
+
+def normalize_question(question: str) -> str:
+    words = _words(question)
+    kept = [word for word in words if word not in _FILLER]
+    # A question made only of filler ("what is it") keeps its own words.
+    return " ".join(kept or words)
+
+
+def _is_exact(token: str) -> bool:
+    return not token.isalpha() or len(token) == 1 or token in _NEGATIONS
+
+
+def _exact_tokens(tokens: Sequence[str]) -> tuple[str, ...]:
+    """Numbers, variables, symbols and negations, in order. Questions that
+    differ in any of these ask different things, however alike the rest."""
+    return tuple(token for token in tokens if _is_exact(token))
+
+
+def is_context_dependent(question: str, history: Sequence[object]) -> bool:
+    """Whether the answer to ``question`` depends on the earlier turns."""
+    if not history:
+        return False
+    words = _words(question)
+    content = [word for word in words if word not in _FILLER]
+    return (
+        len(words) < 3
+        or any(word in _BACK_REFERENCES for word in words)
+        or any(word in _PRONOUNS for word in content[:_PRONOUN_POSITIONS])
+        or (bool(content) and content[-1] in _PRONOUNS)
+        or _MENTIONS.search(question.lower()) is not None
+    )
+
+
+def _shingles(tokens: Sequence[str]) -> set[str]:
+    # Words plus ordered word pairs, so "fahrenheit to celsius" and
+    # "celsius to fahrenheit" share their words but not their pairs
+    padded = [_START, *tokens, _END]
+    return {*tokens, *(f"{a} {b}" for a, b in zip(padded, padded[1:]))}
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def _signature(shingles: set[str]) -> tuple[int, ...]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in shingles
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _bands(signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+    return [
+        (i, signature[i : i + _BAND_ROWS]) for i in range(0, _NUM_PERM, _BAND_ROWS)
+    ]
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    answer: str
+    # "exact" or "similar"
+    match: str
+    similarity: float
+
+
+class AnswerCache:
+    def __init__(self, max_bytes: int, ttl: float, threshold: float):
+        self.threshold = threshold
+        self.hits = {"exact": 0, "similar": 0}
+        self.misses = 0
+        self._entries: LRUCache[str] = LRUCache(max_bytes, ttl, on_evict=self._unindex)
+        # (personality, profile, exact tokens, band number, band) -> keys of
+        # cached entries
+        self._buckets: dict[tuple, set[Hashable]] = {}
+
+    @staticmethod
+    def _scope(personality: str, profile: Mapping[str, str]) -> tuple[str, ...]:
+        return (
+            personality,
+            *(" ".join(str(profile.get(field, "")).lower().split())
+              for field in ("education", "grade", "topic")),
+        )
+
+    @staticmethod
+    def _bucket_keys(scope: tuple[str, ...], normalized: str) -> tuple[set[str], list[tuple]]:
+        tokens = normalized.split(" ")
+        shingles = _shingles(tokens)
+        exact = _exact_tokens(tokens)
+        return shingles, [(scope, exact, *band) for band in _bands(_signature(shingles))]
+
+    def lookup(
+        self, personality: str, profile: Mapping[str, str], question: str
+    ) -> CacheHit | None:
+        scope = self._scope(personality, profile)
+        normalized = normalize_question(question)
+        answer = self._entries.get((scope, normalized))
+        if answer is not None:
+            self.hits["exact"] += 1
+            return CacheHit(answer, "exact", 1.0)
+
+        # Signatures only narrow the search down; candidates are compared
+        # exactly, so an unlucky estimate never turns into a wrong answer.
+        shingles, bucket_keys = self._bucket_keys(scope, normalized)
+        candidates: set[Hashable] = set()
+        for bucket_key in bucket_keys:
+            candidates.update(self._buckets.get(bucket_key, ()))
+
+        words = set(normalized.split(" "))
+        best_key, best = None, 0.0
+        for key in candidates:
+            if key not in self._entries:
+                continue
+            # Only qualifiers may be added or left out ("... today"), and
+            # only on one side; no other word may differ ("stages of
+            # meiosis", "the cold war"), however long the rest is.
+            other = key[1].split(" ")
+            added, dropped = words.difference(other), set(other).difference(words)
+            if (added and dropped) or not (added | dropped) <= _QUALIFIERS:
+                continue
+            similarity = _jaccard(shingles, _shingles(other))
+            if similarity > best:
+                best_key, best = key, similarity
+        if best_key is not None and best >= self.threshold:
+            answer = self._entries.get(best_key)
+            if answer is not None:
+                self.hits["similar"] += 1
+                return CacheHit(answer, "similar", round(best, 4))
+        self.misses += 1
+        return None
+
+    def store(
+        self, personality: str, profile: Mapping[str, str], question: str, answer: str
+    ) -> None:
+        scope = self._scope(personality, profile)
+        normalized = normalize_question(question)
+        if not normalized or not answer.strip():
+            return
+        key = (scope, normalized)
+        size = len(answer.encode()) + len(normalized.encode())
+        self._entries.set(key, answer, size)
+        if key in self._entries:
+            for bucket_key in self._bucket_keys(scope, normalized)[1]:
+                self._buckets.setdefault(bucket_key, set()).add(key)
+
+    def _unindex(self, key: Hashable) -> None:
+        scope, normalized = key
+        for bucket_key in self._bucket_keys(scope, normalized)[1]:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def stats(self) -> dict[str, object]:
+        lookups = self.hits["exact"] + self.hits["similar"] + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._entries.bytes,
+            "evictions": self._entries.evictions,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,320 @@
+"""HTTP routes.
+
+``POST /chat`` streams the reply text, ``POST /tts`` returns MP3 and
+``POST /summarize`` folds older turns into the rolling conversation summary.
+``POST /traces`` accepts per-turn latency traces from the browser and
+``GET /cache/stats`` reports answer and audio cache usage.
+"""
+
+import json
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from .answer_cache import AnswerCache, is_context_dependent
+from .config import Settings, load_settings
+from .context import estimate_tokens
+from .lru import LRUCache
+from .personalities import PERSONALITIES, PERSONALITY_VOICE_IDS
+from .prompt import build_prompt, build_summary_prompt
+from .upstream import ElevenLabsClient, GeminiClient, UpstreamError
+
+
+trace_log = logging.getLogger("gateway.traces")
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _error_response(err: UpstreamError) -> JSONResponse:
+    # Pass rate limiting through unchanged so clients can back off; anything
+    # else from upstream is reported as a bad gateway.
+    status = err.status_code if err.status_code in (429, 503) else 502
+    headers = {"Retry-After": err.retry_after} if err.retry_after else None
+    return JSONResponse({"error": err.detail}, status_code=status, headers=headers)
+
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """A streaming response that closes ``resources`` once it is done.
+
+    Closing here rather than in the body generator also covers requests
+    whose body never starts, e.g. when the client disconnects first, so the
+    upstream connection and concurrency slot are always released.
+    """
+
+    def __init__(self, content, resources: AsyncExitStack, **kwargs):
+        super().__init__(content, **kwargs)
+        self.resources = resources
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.resources.aclose()
+
+
+async def _read_json(request: Request) -> dict:
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise BadRequest("request body must be JSON")
+    if not isinstance(payload, dict):
+        raise BadRequest("request body must be a JSON object")
+    return payload
+
+
+def _personality(payload: dict) -> str:
+    key = payload.get("personality", "")
+    if not isinstance(key, str) or key not in PERSONALITIES:
+        raise BadRequest(f"unknown personality: {key!r}")
+    return key
+
+
+def _profile(payload: dict) -> dict[str, str]:
+    profile = payload.get("profile") or {}
+    if not isinstance(profile, dict) or not all(
+        isinstance(value, str) for value in profile.values()
+    ):
+        raise BadRequest("profile must be an object of strings")
+    return profile
+
+
+def _messages(payload: dict, field: str) -> list[dict[str, str]]:
+    messages = payload.get(field) or []
+    if not isinstance(messages, list) or not all(
+        isinstance(msg, dict)
+        and isinstance(msg.get("role"), str)
+        and isinstance(msg.get("content"), str)
+        for msg in messages
+    ):
+        raise BadRequest(f"{field} must be a list of {{role, content}} objects")
+    return messages
+
+
+def _file(payload: dict) -> dict[str, str] | None:
+    file = payload.get("file") or None
+    if file is not None and not (
+        isinstance(file, dict)
+        and isinstance(file.get("data"), str)
+        and isinstance(file.get("mimeType"), str)
+    ):
+        raise BadRequest("file must have data and mimeType")
+    return file
+
+
+def _retrieved(payload: dict) -> list[dict]:
+    retrieved = payload.get("retrieved") or []
+    if not isinstance(retrieved, list) or not all(
+        isinstance(passage, dict) for passage in retrieved
+    ):
+        raise BadRequest("retrieved must be a list of objects")
+    return retrieved
+
+
+async def chat(request: Request) -> Response:
+    settings: Settings = request.app.state.settings
+    payload = await _read_json(request)
+    personality = _personality(payload)
+    message = str(payload.get("message", "")).strip()
+    if not message:
+        raise BadRequest("message is required")
+
+    profile = _profile(payload)
+    history = _messages(payload, "history")
+    file = _file(payload)
+    retrieved = _retrieved(payload)
+    summary = str(payload.get("summary", ""))
+    # Answers grounded in the student's own files or earlier turns are not
+    # shared with anyone else.
+    cacheable = not (file or retrieved or is_context_dependent(message, history))
+    # A stand-alone question may still be answered from the cache mid-
+    # conversation, but an answer written with this student's history or
+    # summary in the prompt is only stored when there was none.
+    shareable = cacheable and not history and not summary.strip()
+    answer_cache: AnswerCache = request.app.state.answer_cache
+    if cacheable:
+        lookup_started = time.perf_counter()
+        hit = answer_cache.lookup(personality, profile, message)
+        if hit is not None:
+            lookup_ms = (time.perf_counter() - lookup_started) * 1000
+            return Response(
+                hit.answer,
+                media_type="text/plain; charset=utf-8",
+                headers={
+                    "Server-Timing": f"cache;dur={lookup_ms:.2f}",
+                    "X-Answer-Cache": f"hit-{hit.match}",
+                },
+            )
+
+    build_started = time.perf_counter()
+    prompt = build_prompt(
+        personality,
+        profile,
+        history,
+        message,
+        settings.output_char_limit,
+        retrieved,
+        summary,
+        settings.prompt_token_budget,
+    )
+    build_ms = (time.perf_counter() - build_started) * 1000
+
+    stack = AsyncExitStack()
+    try:
+        pieces = await stack.enter_async_context(
+            request.app.state.gemini.stream(prompt, file)
+        )
+    except UpstreamError as err:
+        await stack.aclose()
+        return _error_response(err)
+
+    async def body():
+        parts: list[str] = []
+        completed = False
+        try:
+            async for piece in pieces:
+                parts.append(piece)
+                yield piece
+            completed = True
+        finally:
+            answer = "".join(parts)
+            # The browser stops reading at the output limit, so a reply cut
+            # off past it still shows the student exactly what they saw.
+            if shareable and (completed or len(answer) >= settings.output_char_limit):
+                answer_cache.store(personality, profile, message, answer)
+
+    return _ClosingStreamingResponse(
+        body(),
+        stack,
+        media_type="text/plain; charset=utf-8",
+        headers={
+            "Server-Timing": f"prompt;dur={build_ms:.2f}",
+            "X-Prompt-Chars": str(len(prompt)),
+            "X-Prompt-Tokens": str(estimate_tokens(prompt)),
+            "X-Answer-Cache": "miss" if cacheable else "bypass",
+        },
+    )
+
+
+async def tts(request: Request) -> Response:
+    payload = await _read_json(request)
+    personality = _personality(payload)
+    text = str(payload.get("text", "")).strip()
+    if not text:
+        raise BadRequest("text is required")
+
+    # Cached answers are spoken in the same chunks every time, so their
+    # audio is reused across students as well.
+    audio_cache: LRUCache[bytes] = request.app.state.audio_cache
+    voice_id = PERSONALITY_VOICE_IDS[personality]
+    previous_text = str(payload.get("previousText", ""))
+    key = (voice_id, text, previous_text)
+    audio = audio_cache.get(key)
+    if audio is not None:
+        return Response(audio, media_type="audio/mpeg", headers={"X-Audio-Cache": "hit"})
+
+    try:
+        audio = await request.app.state.eleven_labs.synthesize(voice_id, text, previous_text)
+    except UpstreamError as err:
+        return _error_response(err)
+    audio_cache.set(key, audio, len(audio))
+    return Response(audio, media_type="audio/mpeg", headers={"X-Audio-Cache": "miss"})
+
+
+async def summarize(request: Request) -> Response:
+    settings: Settings = request.app.state.settings
+    payload = await _read_json(request)
+    turns = _messages(payload, "turns")
+    if not turns:
+        raise BadRequest("turns must be a non-empty list")
+
+    prompt = build_summary_prompt(
+        str(payload.get("summary", "")), turns, settings.summary_max_words
+    )
+    try:
+        summary = await request.app.state.gemini.generate(prompt)
+    except UpstreamError as err:
+        return _error_response(err)
+    return JSONResponse({"summary": summary.strip()})
+
+
+async def traces(request: Request) -> Response:
+    payload = await _read_json(request)
+    batch = payload.get("traces")
+    if not isinstance(batch, list):
+        raise BadRequest("traces must be a list")
+    # One JSON line per turn; ship them wherever the gateway's logs go.
+    for trace in batch:
+        trace_log.info(json.dumps(trace, separators=(",", ":")))
+    return Response(status_code=204)
+
+
+async def cache_stats(request: Request) -> Response:
+    audio_cache: LRUCache[bytes] = request.app.state.audio_cache
+    return JSONResponse({
+        "answers": request.app.state.answer_cache.stats(),
+        "audio": {
+            "entries": len(audio_cache),
+            "bytes": audio_cache.bytes,
+            "evictions": audio_cache.evictions,
+        },
+    })
+
+
+async def _bad_request(request: Request, exc: BadRequest) -> JSONResponse:
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+def create_app(settings: Settings | None = None) -> Starlette:
+    settings = settings or load_settings()
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        app.state.settings = settings
+        app.state.gemini = GeminiClient(settings)
+        app.state.eleven_labs = ElevenLabsClient(settings)
+        app.state.answer_cache = AnswerCache(
+            settings.answer_cache_max_bytes,
+            settings.answer_cache_ttl,
+            settings.answer_cache_threshold,
+        )
+        app.state.audio_cache = LRUCache(settings.tts_cache_max_bytes)
+        try:
+            yield
+        finally:
+            await app.state.gemini.aclose()
+            await app.state.eleven_labs.aclose()
+
+    return Starlette(
+        routes=[
+            Route("/chat", chat, methods=["POST"]),
+            Route("/tts", tts, methods=["POST"]),
+            Route("/summarize", summarize, methods=["POST"]),
+            Route("/traces", traces, methods=["POST"]),
+            Route("/cache/stats", cache_stats, methods=["GET"]),
+        ],
+        middleware=[
+            Middleware(
+                CORSMiddleware,
+                allow_origins=list(settings.allowed_origins),
+                allow_methods=["POST"],
+                allow_headers=["Content-Type"],
+                expose_headers=[
+                    "Server-Timing",
+                    "X-Prompt-Chars",
+                    "X-Prompt-Tokens",
+                    "X-Answer-Cache",
+                ],
+            )
+        ],
+        exception_handlers={BadRequest: _bad_request},
+        lifespan=lifespan,
+    )
@@ -0,0 +1,91 @@
+"""Runtime settings, read once from the environment."""
+
+import os
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+# Where the browser-only build kept its API keys (as VITE_* names).
+LEGACY_ENV_FILE = Path(__file__).resolve().parents[2] / "studyAI" / ".env"
+
+
+@cache
+def _legacy_env() -> dict[str, str]:
+    """``NAME=value`` lines from studyAI/.env, if the file exists."""
+    values: dict[str, str] = {}
+    try:
+        lines = LEGACY_ENV_FILE.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return values
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        name, _, value = line.removeprefix("export ").partition("=")
+        values[name.strip()] = value.strip().strip("'\"")
+    return values
+
+
+def _env(name: str, default: str = "") -> str:
+    # Real environment variables win; the old VITE_* names and the existing
+    # studyAI/.env are accepted so setups from the browser-only build keep
+    # working.
+    legacy = _legacy_env()
+    return (
+        os.environ.get(name)
+        or os.environ.get(f"VITE_{name}")
+        or legacy.get(name)
+        or legacy.get(f"VITE_{name}")
+        or default
+    )
+
+
+@dataclass(frozen=True)
+class Settings:
+    gemini_api_key: str
+    gemini_model: str
+    gemini_base_url: str
+    eleven_labs_api_key: str
+    eleven_labs_base_url: str
+    tts_output_format: str
+    output_char_limit: int
+    # Token budget for a whole chat prompt, and length of rolling summaries.
+    prompt_token_budget: int
+    summary_max_words: int
+    # Shared answer cache: size budget (0 disables), entry lifetime in
+    # seconds and the similarity needed to reuse a differently worded answer.
+    answer_cache_max_bytes: int
+    answer_cache_ttl: float
+    answer_cache_threshold: float
+    # Synthesised audio kept in memory and shared across users (0 disables).
+    tts_cache_max_bytes: int
+    # Upper bound on requests in flight to each upstream, shared by all users.
+    max_upstream_concurrency: int
+    # Size of the keep-alive connection pool per upstream host.
+    max_connections: int
+    allowed_origins: tuple[str, ...]
+
+
+def load_settings() -> Settings:
+    return Settings(
+        gemini_api_key=_env("GEMINI_API_KEY"),
+        gemini_model=_env("GEMINI_MODEL", "gemini-2.0-flash-exp"),
+        gemini_base_url=_env("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com"),
+        eleven_labs_api_key=_env("ELEVEN_LABS_API_KEY"),
+        eleven_labs_base_url=_env("ELEVEN_LABS_BASE_URL", "https://api.elevenlabs.io"),
+        tts_output_format=_env("TTS_OUTPUT_FORMAT", "mp3_44100_128"),
+        output_char_limit=int(_env("OUTPUT_CHAR_LIMIT", "1000")),
+        prompt_token_budget=int(_env("PROMPT_TOKEN_BUDGET", "3000")),
+        summary_max_words=int(_env("SUMMARY_MAX_WORDS", "200")),
+        answer_cache_max_bytes=int(_env("ANSWER_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+        answer_cache_ttl=float(_env("ANSWER_CACHE_TTL", "86400")),
+        answer_cache_threshold=float(_env("ANSWER_CACHE_THRESHOLD", "0.85")),
+        tts_cache_max_bytes=int(_env("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        max_upstream_concurrency=int(_env("MAX_UPSTREAM_CONCURRENCY", "64")),
+        max_connections=int(_env("MAX_CONNECTIONS", "100")),
+        allowed_origins=tuple(
+            origin.strip()
+            for origin in _env("ALLOWED_ORIGINS", "http://localhost:5173").split(",")
+            if origin.strip()
+        ),
+    )
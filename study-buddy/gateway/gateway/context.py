@@ -0,0 +1,51 @@
+"""Token budgeting for prompt assembly.
+
+Tokens are estimated rather than counted: about four characters per token
+for English text, which is close enough to keep requests a predictable
+size without a tokenizer round trip.
+"""
+
+from dataclasses import dataclass
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = " [...]") -> str:
+    """Cut ``text`` to roughly ``max_tokens``, on a word boundary when possible."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens * 4 - len(marker))
+    cut = text.rfind(" ", 0, limit)
+    return text[: cut if cut > limit // 2 else limit] + marker
+
+
+@dataclass
+class Budget:
+    """Tokens left to hand out, spent tier by tier in priority order."""
+
+    remaining: int
+
+    def take(self, text: str) -> bool:
+        cost = estimate_tokens(text)
+        if cost > self.remaining:
+            return False
+        self.remaining -= cost
+        return True
+
+
+def fit_history(lines: list[str], budget: Budget) -> list[str]:
+    """Keep the newest history lines that fit, returned oldest first."""
+    kept: list[str] = []
+    for line in reversed(lines):
+        if not budget.take(line):
+            break
+        kept.append(line)
+    kept.reverse()
+    return kept
+
+
+def fit_passages(blocks: list[str], budget: Budget) -> list[str]:
+    """Keep passages in rank order, skipping any that no longer fit."""
+    return [block for block in blocks if budget.take(block)]
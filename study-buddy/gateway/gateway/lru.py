@@ -0,0 +1,70 @@
+"""Byte-budgeted LRU cache with optional time-to-live."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Least-recently-used cache bounded by the total size of its values.
+
+    Sizes are supplied by the caller on ``set``. ``on_evict`` is called with
+    the key of every entry dropped for space or age.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float | None = None,
+        on_evict: Callable[[Hashable], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.clock = clock
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[V, int, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, touch=False) is not None
+
+    def get(self, key: Hashable, touch: bool = True) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, _, expires = entry
+        if expires <= self.clock():
+            self._drop(key)
+            return None
+        if touch:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires = self.clock() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (value, size, expires)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def _drop(self, key: Hashable) -> None:
+        self._remove(key)
+        self.evictions += 1
+        if self.on_evict:
+            self.on_evict(key)
@@ -0,0 +1,126 @@
+"""Builds the Gemini prompts for chat turns and conversation summaries.
+
+A chat prompt is assembled to a fixed token budget. Tiers are funded in
+priority order: persona, learner context, rolling summary, recent turns,
+then retrieved passages. Lower tiers get whatever is left, so long
+sessions and long pastes keep a flat request size.
+"""
+
+from .context import Budget, estimate_tokens, fit_history, fit_passages, truncate_to_tokens
+from .personalities import get_personality
+
+# Caps for parts the client controls, so one oversized field cannot starve
+# the rest of the prompt.
+MAX_MESSAGE_TOKENS = 1000
+MAX_SUMMARY_TOKENS = 400
+
+
+def _instructions(char_limit: int) -> str:
+    return (
+        "Respond naturally in character. Provide comprehensive explanations with examples. "
+        "For math, read symbols properly (e.g., '3/6' as 'three divided by six', "
+        "not 'three forwardslash six')."
+        "Do not use parenthetical actions."
+        f" Please keep the response under {char_limit} characters."
+        "Avoid using symbols like * because it doesn't read well aloud."
+    )
+
+
+def build_prompt(
+    personality_key: str,
+    profile: dict[str, str],
+    history: list[dict[str, str]],
+    message: str,
+    char_limit: int,
+    retrieved: list[dict] | None = None,
+    summary: str = "",
+    token_budget: int = 3000,
+) -> str:
+    personality = get_personality(personality_key)
+    topic = profile.get("topic", "")
+    education = profile.get("education", "")
+    grade = profile.get("grade", "")
+
+    persona = f"ROLE AND PERSONA:\n{personality['system_prompt']}\n\n"
+    question = f"STUDENT'S QUESTION:\n{truncate_to_tokens(message, MAX_MESSAGE_TOKENS)}\n\n"
+    instructions = _instructions(char_limit)
+    # The persona, question and instructions are always sent
+    budget = Budget(
+        token_budget
+        - estimate_tokens(persona)
+        - estimate_tokens(question)
+        - estimate_tokens(instructions)
+    )
+
+    learner = ""
+    if topic or education or grade:
+        learner = "LEARNER CONTEXT:\n"
+        if topic:
+            learner += f"Learning Topic: {topic}\n"
+        if education:
+            learner += f"Education Level: {education}\n"
+        if grade:
+            learner += f"Grade/Academic Level: {grade}\n"
+        learner += "\n"
+        if not budget.take(learner):
+            learner = ""
+
+    summary_block = ""
+    if summary:
+        summary_block = (
+            "EARLIER IN THIS CONVERSATION (summary):\n"
+            f"{truncate_to_tokens(summary, MAX_SUMMARY_TOKENS)}\n\n"
+        )
+        if not budget.take(summary_block):
+            summary_block = ""
+
+    # Long pastes are capped in history too, or one of them would crowd out
+    # every turn before it
+    history_lines = fit_history(
+        [
+            f"{'Student' if msg.get('role') == 'user' else 'You'}: "
+            f"{truncate_to_tokens(msg.get('content', ''), MAX_MESSAGE_TOKENS)}\n"
+            for msg in history
+        ],
+        budget,
+    )
+
+    passages = fit_passages(
+        [
+            f"[{passage.get('source', 'document')}"
+            f"{', page ' + str(passage['page']) if passage.get('page') else ''}]\n"
+            f"{passage.get('text', '')}\n"
+            for passage in retrieved or []
+        ],
+        budget,
+    )
+
+    parts = [persona, learner, summary_block]
+    if history_lines:
+        parts += ["CONVERSATION HISTORY:\n", *history_lines, "\n"]
+    if passages:
+        parts += [
+            "REFERENCE MATERIAL (excerpts from the student's documents; "
+            "use them when relevant):\n",
+            *passages,
+            "\n",
+        ]
+    parts += [question, instructions]
+    return "".join(parts)
+
+
+def build_summary_prompt(summary: str, turns: list[dict[str, str]], max_words: int) -> str:
+    """Prompt that folds ``turns`` into the running ``summary``."""
+    transcript = "".join(
+        f"{'Student' if msg.get('role') == 'user' else 'Tutor'}: {msg.get('content', '')}\n"
+        for msg in turns
+    )
+    return (
+        "You maintain a running summary of a tutoring session so the tutor can "
+        "keep continuity after older messages are dropped.\n\n"
+        f"CURRENT SUMMARY:\n{summary or '(none yet)'}\n\n"
+        f"NEW MESSAGES:\n{transcript}\n"
+        f"Rewrite the summary to include the new messages in at most {max_words} words. "
+        "Keep what the student asked, what was explained, their misunderstandings, "
+        "and anything they said about themselves. Write plain prose with no preamble."
+    )
@@ -0,0 +1,152 @@
+"""Pooled clients for the Gemini and ElevenLabs APIs.
+
+One ``httpx.AsyncClient`` per upstream is shared by every request the
+gateway serves, so TLS handshakes and HTTP/2 connections are reused across
+users instead of being set up again by each browser.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+
+from .config import Settings
+
+
+class UpstreamError(Exception):
+    """An upstream API answered with a non-success status."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: str | None = None):
+        super().__init__(f"upstream returned {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@contextmanager
+def _network_errors() -> Iterator[None]:
+    """Report connection failures and timeouts as a 502 from upstream."""
+    try:
+        yield
+    except httpx.HTTPError as err:
+        raise UpstreamError(502, f"{type(err).__name__}: {err}") from err
+
+
+def _make_client(base_url: str, settings: Settings) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_connections,
+            keepalive_expiry=60,
+        ),
+        timeout=httpx.Timeout(60, connect=10),
+    )
+
+
+async def _raise_for_status(response: httpx.Response) -> None:
+    if response.status_code < 400:
+        return
+    body = (await response.aread()).decode(errors="replace")
+    raise UpstreamError(response.status_code, body, response.headers.get("retry-after"))
+
+
+class _Upstream:
+    def __init__(self, base_url: str, settings: Settings):
+        self.settings = settings
+        self.client = _make_client(base_url, settings)
+        # Central rate control: caps concurrent upstream calls for all users.
+        self.slots = asyncio.Semaphore(settings.max_upstream_concurrency)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class GeminiClient(_Upstream):
+    def __init__(self, settings: Settings):
+        super().__init__(settings.gemini_base_url, settings)
+
+    def _request(self, method: str, prompt: str, inline_file: dict[str, str] | None) -> httpx.Request:
+        parts: list[dict] = [{"text": prompt}]
+        if inline_file:
+            parts.append(
+                {"inline_data": {"mime_type": inline_file["mimeType"], "data": inline_file["data"]}}
+            )
+        return self.client.build_request(
+            "POST",
+            f"/v1beta/models/{self.settings.gemini_model}:{method}",
+            params={"alt": "sse"} if method == "streamGenerateContent" else None,
+            headers={"x-goog-api-key": self.settings.gemini_api_key},
+            json={"contents": [{"role": "user", "parts": parts}]},
+        )
+
+    async def generate(self, prompt: str) -> str:
+        """Run a non-streaming generation and return its text."""
+        with _network_errors():
+            async with self.slots:
+                response = await self.client.send(self._request("generateContent", prompt, None))
+            await _raise_for_status(response)
+        return "".join(self._candidate_text(response.json()))
+
+    @asynccontextmanager
+    async def stream(
+        self, prompt: str, inline_file: dict[str, str] | None = None
+    ) -> AsyncIterator[AsyncIterator[str]]:
+        """Open a streaming generation and yield an iterator over text pieces.
+
+        The upstream status is checked before the context is entered, so
+        callers can still turn an error into a proper HTTP response.
+        """
+        request = self._request("streamGenerateContent", prompt, inline_file)
+
+        async with self.slots:
+            with _network_errors():
+                response = await self.client.send(request, stream=True)
+            try:
+                with _network_errors():
+                    await _raise_for_status(response)
+                yield self._iter_text(response)
+            finally:
+                await response.aclose()
+
+    @staticmethod
+    async def _iter_text(response: httpx.Response) -> AsyncIterator[str]:
+        with _network_errors():
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                for text in GeminiClient._candidate_text(json.loads(line[len("data:"):])):
+                    yield text
+
+    @staticmethod
+    def _candidate_text(event: dict) -> list[str]:
+        return [
+            part["text"]
+            for candidate in event.get("candidates", [])[:1]
+            for part in candidate.get("content", {}).get("parts", [])
+            if part.get("text")
+        ]
+
+
+class ElevenLabsClient(_Upstream):
+    def __init__(self, settings: Settings):
+        super().__init__(settings.eleven_labs_base_url, settings)
+
+    async def synthesize(self, voice_id: str, text: str, previous_text: str = "") -> bytes:
+        body: dict = {"text": text, "voice_settings": {}}
+        if previous_text:
+            body["previous_text"] = previous_text
+
+        with _network_errors():
+            async with self.slots:
+                response = await self.client.post(
+                    f"/v1/text-to-speech/{voice_id}",
+                    params={"output_format": self.settings.tts_output_format},
+                    headers={"xi-api-key": self.settings.eleven_labs_api_key},
+                    json=body,
+                )
+            await _raise_for_status(response)
+        return response.content
@@ -0,0 +1,28 @@
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from bench.harness import free_port
+from bench.mock_upstreams import MockLatency, create_app
+
+
+@pytest.fixture(scope="session")
+def mock_upstreams() -> str:
+    """URL of ``bench.mock_upstreams`` running without delays or errors."""
+    port = free_port()
+    latency = MockLatency(ttfb_ms=0, piece_ms=0, generate_ms=0, tts_ms=0, tts_ms_per_char=0, jitter=0)
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(latency, seed=1), host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("mock upstreams did not start")
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=10)
@@ -0,0 +1,164 @@
+"""Answer cache matching: rewordings of a question hit, questions that only
+look alike miss."""
+
+import pytest
+
+from gateway.answer_cache import AnswerCache, is_context_dependent, normalize_question
+
+PROFILE = {"topic": "Math", "education": "High School", "grade": "9"}
+THRESHOLD = 0.85
+
+# Cached question, then a question that must not be answered with it
+NEAR_MISSES = [
+    ("What is 1/2 + 1/3?", "What is 1/2 - 1/3?"),
+    ("What is the derivative of x^2?", "What is the derivative of x^3?"),
+    ("Convert 100 fahrenheit to celsius", "Convert 100 celsius to fahrenheit"),
+    ("What is mitosis?", "What is meiosis?"),
+    ("Solve 3x + 5 = 20", "Solve 3x + 5 = 2"),
+    ("Is 0 an even number?", "Is 0 an odd number?"),
+    ("Why is x > 5 when x + 1 > 6?", "Why is x < 5 when x + 1 < 6?"),
+    (
+        "Explain the main stages of mitosis and how each stage changes the chromosomes, the nucleus, "
+        "the cell membrane and the spindle fibres inside a dividing animal cell",
+        "Explain the main stages of meiosis and how each stage changes the chromosomes, the nucleus, "
+        "the cell membrane and the spindle fibres inside a dividing animal cell",
+    ),
+    (
+        "Why do objects with more mass fall at the same speed as lighter objects in a vacuum",
+        "Why do objects with more mass not fall at the same speed as lighter objects in a vacuum",
+    ),
+    (
+        "Explain the derivative of a polynomial with a worked example and show how each step follows from the one before",
+        "Explain the second derivative of a polynomial with a worked example and show how each step follows from the one before",
+    ),
+    (
+        "Explain the causes of the war and how it changed the map of europe in the years that followed",
+        "Explain the causes of the cold war and how it changed the map of europe in the years that followed",
+    ),
+    (
+        "How do I find the area of a triangle and why does the formula use half of the base times the height",
+        "How do I find the area of a right triangle and why does the formula use half of the base times the height",
+    ),
+]
+
+# Cached question, then a rewording that should reuse its answer
+REWORDINGS = [
+    ("What is photosynthesis?", "Can you explain photosynthesis please", "exact"),
+    ("What are fractions?", "what is a fraction", "exact"),
+    ("Explain Newton's first law", "explain newtons first law", "exact"),
+    ("What is the light-dependent reaction?", "what is the light dependent reaction", "exact"),
+    (
+        "Explain the main stages of the water cycle and how water moves between the ocean, the air and the land",
+        "Explain the main stages of the water cycle and how water moves between the ocean, the air and the land today",
+        "similar",
+    ),
+]
+
+
+def _cache() -> AnswerCache:
+    return AnswerCache(max_bytes=1 << 20, ttl=3600, threshold=THRESHOLD)
+
+
+@pytest.mark.parametrize("cached, asked", NEAR_MISSES)
+def test_questions_that_only_look_alike_miss(cached, asked):
+    cache = _cache()
+    cache.store("friendly_tutor", PROFILE, cached, "cached answer")
+    assert cache.lookup("friendly_tutor", PROFILE, asked) is None
+
+
+@pytest.mark.parametrize("cached, asked, match", REWORDINGS)
+def test_rewordings_hit(cached, asked, match):
+    cache = _cache()
+    cache.store("friendly_tutor", PROFILE, cached, "cached answer")
+    hit = cache.lookup("friendly_tutor", PROFILE, asked)
+    assert hit is not None
+    assert (hit.answer, hit.match) == ("cached answer", match)
+    assert hit.similarity >= THRESHOLD
+
+
+def test_operators_and_numbers_survive_normalisation():
+    assert normalize_question("What is 1/2 + 1/3?") == "1 / 2 + 1 / 3"
+    assert normalize_question("What's 3.5% of 200?") == "3.5 % of 200"
+    assert normalize_question("convert 100 fahrenheit to celsius") == "convert 100 fahrenheit to celsius"
+
+
+def test_the_most_similar_question_wins():
+    cache = _cache()
+    base = "Explain the main stages of the water cycle and how water moves between the ocean, the air and the land"
+    cache.store("friendly_tutor", PROFILE, base + " today", "one extra word")
+    cache.store("friendly_tutor", PROFILE, base + " simply today", "two extra words")
+    assert cache.lookup("friendly_tutor", PROFILE, base).answer == "one extra word"
+
+
+def test_only_qualifiers_may_be_added():
+    cache = _cache()
+    base = "Explain the main stages of the water cycle and how water moves between the ocean, the air and the land"
+    cache.store("friendly_tutor", PROFILE, base + " today", "cached answer")
+    assert cache.lookup("friendly_tutor", PROFILE, base + " for my test") is None
+    # Nor may a qualifier on one side stand in for a different one on the other
+    assert cache.lookup("friendly_tutor", PROFILE, base + " quickly") is None
+
+
+def test_answers_are_not_shared_across_personas_or_profiles():
+    cache = _cache()
+    cache.store("friendly_tutor", PROFILE, "What is photosynthesis?", "cached answer")
+
+    assert cache.lookup("storyteller", PROFILE, "What is photosynthesis?") is None
+    assert cache.lookup("friendly_tutor", {**PROFILE, "grade": "3"}, "What is photosynthesis?") is None
+    # Case and spacing in the profile do not matter
+    assert cache.lookup("friendly_tutor", {**PROFILE, "topic": " math "}, "What is photosynthesis?")
+
+
+def test_evicted_entries_leave_no_candidates_behind():
+    cache = AnswerCache(max_bytes=300, ttl=3600, threshold=THRESHOLD)
+    for i in range(20):
+        cache.store("friendly_tutor", PROFILE, f"What is the capital of country number {i}?", "x" * 100)
+
+    assert cache.stats()["evictions"] > 0
+    live = {key for bucket in cache._buckets.values() for key in bucket}
+    assert live == {key for key in live if key in cache._entries}
+    assert len(live) == len(cache._entries)
+
+
+def test_stats_count_hits_and_misses():
+    cache = _cache()
+    cache.store("friendly_tutor", PROFILE, "What is photosynthesis?", "cached answer")
+    cache.lookup("friendly_tutor", PROFILE, "Explain photosynthesis")
+    cache.lookup("friendly_tutor", PROFILE, "What is respiration?")
+
+    stats = cache.stats()
+    assert stats["hits"] == {"exact": 1, "similar": 0}
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Explain Newton's first law",
+        "What is the second law of thermodynamics?",
+        "Give me one more example of a prime number",
+        "What is the other name for the powerhouse of the cell?",
+        "How do I solve a quadratic equation by completing the square?",
+    ],
+)
+def test_ordinary_words_are_not_back_references(question):
+    assert not is_context_dependent(question, history=[{"role": "user", "content": "hi"}])
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Can you explain that again?",
+        "What does it mean?",
+        "Why is that?",
+        "Go back to the previous step",
+        "Give me another example",
+        "What did you mean when you said mass?",
+        "Why?",
+    ],
+)
+def test_follow_ups_depend_on_the_conversation(question):
+    history = [{"role": "user", "content": "hi"}]
+    assert is_context_dependent(question, history)
+    assert not is_context_dependent(question, history=[])
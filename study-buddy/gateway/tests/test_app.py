@@ -0,0 +1,126 @@
+import asyncio
+import dataclasses
+import socket
+from contextlib import AsyncExitStack
+
+import pytest
+from starlette.requests import ClientDisconnect
+from starlette.testclient import TestClient
+
+from gateway.app import _ClosingStreamingResponse, create_app
+from gateway.config import load_settings
+
+
+def _unused_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def _client(upstream_url: str | None = None, **overrides) -> TestClient:
+    # Without ``upstream_url`` nothing listens on either upstream, so every
+    # call fails to connect.
+    settings = dataclasses.replace(
+        load_settings(),
+        gemini_base_url=upstream_url or _unused_url(),
+        eleven_labs_base_url=upstream_url or _unused_url(),
+        **{"answer_cache_max_bytes": 0, **overrides},
+    )
+    return TestClient(create_app(settings))
+
+
+def test_unreachable_upstream_is_a_bad_gateway():
+    with _client() as client:
+        chat = client.post("/chat", json={"personality": "friendly_tutor", "message": "hi"})
+        tts = client.post("/tts", json={"personality": "friendly_tutor", "text": "hi"})
+        summary = client.post("/summarize", json={"turns": [{"role": "user", "content": "hi"}]})
+        assert [chat.status_code, tts.status_code, summary.status_code] == [502, 502, 502]
+        assert "ConnectError" in chat.json()["error"]
+
+        # The failed calls gave their concurrency slots back
+        slots = client.app.state.gemini.slots
+        assert slots._value == client.app.state.settings.max_upstream_concurrency
+
+
+def test_summarize_folds_new_turns_into_the_current_summary(mock_upstreams):
+    with _client(mock_upstreams) as client:
+        first = client.post("/summarize", json={"turns": [
+            {"role": "user", "content": "My name is Priya."},
+            {"role": "assistant", "content": "Nice to meet you, Priya!"},
+        ]})
+        assert first.status_code == 200
+        assert first.json() == {"summary": "My name is Priya."}
+
+        second = client.post("/summarize", json={
+            "summary": first.json()["summary"],
+            "turns": [{"role": "user", "content": "I like basketball."}],
+        })
+        assert second.json() == {"summary": "My name is Priya. I like basketball."}
+
+
+def test_answers_shaped_by_a_students_context_are_not_shared(mock_upstreams):
+    question = {"personality": "friendly_tutor", "message": "What is photosynthesis?"}
+    history = [
+        {"role": "user", "content": "My name is Priya."},
+        {"role": "assistant", "content": "Nice to meet you, Priya!"},
+    ]
+
+    def cache_status(client, body):
+        response = client.post("/chat", json=body)
+        assert response.status_code == 200
+        return response.headers["x-answer-cache"]
+
+    with _client(mock_upstreams, answer_cache_max_bytes=1 << 20) as client:
+        assert cache_status(client, {**question, "history": history}) == "miss"
+        assert cache_status(client, {**question, "summary": "The student is called Priya."}) == "miss"
+        assert client.app.state.answer_cache.stats()["entries"] == 0
+
+        assert cache_status(client, question) == "miss"
+        # Once stored, a student mid-conversation gets the shared answer
+        assert cache_status(client, {**question, "history": history}) == "hit-exact"
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/chat", {"personality": ["x"], "message": "hi"}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "profile": "x"}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "profile": {"grade": 9}}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "history": ["a"]}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "history": [{"role": "user"}]}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "file": {"data": "x"}}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "file": "x"}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "retrieved": ["x"]}),
+        ("/chat", {"personality": "friendly_tutor", "message": "hi", "retrieved": {"text": "x"}}),
+        ("/tts", {"personality": {"x": 1}, "text": "hi"}),
+        ("/summarize", {"turns": ["a"]}),
+        ("/summarize", {"turns": "a"}),
+    ],
+)
+def test_malformed_fields_are_bad_requests(path, body):
+    with _client() as client:
+        response = client.post(path, json=body)
+        assert response.status_code == 400
+        assert "error" in response.json()
+
+
+def test_streaming_response_releases_resources_when_the_body_never_starts():
+    closed = []
+
+    async def body():
+        yield "never sent"
+
+    async def disconnected(message):
+        raise OSError("client went away")
+
+    async def run():
+        stack = AsyncExitStack()
+        stack.callback(closed.append, True)
+        response = _ClosingStreamingResponse(body(), stack)
+        try:
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, disconnected)
+        except (OSError, ClientDisconnect):
+            pass
+
+    asyncio.run(run())
+    assert closed == [True]
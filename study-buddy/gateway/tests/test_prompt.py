@@ -0,0 +1,161 @@
+"""Prompt size and context recall over a long tutoring session, compared
+with the prompt the browser built before the gateway existed (persona,
+learner context, the last four messages and the question, unbounded)."""
+
+import dataclasses
+
+from starlette.testclient import TestClient
+
+from gateway.app import create_app
+from gateway.config import load_settings
+from gateway.context import estimate_tokens
+from gateway.personalities import get_personality
+from gateway.prompt import build_prompt
+
+PROFILE = {"topic": "Algebra", "education": "High School", "grade": "9"}
+CHAR_LIMIT = 1000
+BUDGET = 3000
+TURNS = 120
+
+# Things the student says early on that a good tutor should still know
+FACTS = {
+    1: "My name is Priya and I am preparing for a test on Friday.",
+    3: "I always mix up the distributive property with factoring.",
+    5: "I learn best with examples about basketball.",
+}
+# What the background summarizer would have folded those turns into, for
+# the tests that only need some summary
+SUMMARY = (
+    "The student, Priya, is preparing for a test on Friday. She mixes up the "
+    "distributive property with factoring and learns best with basketball examples."
+)
+RECALL_MARKERS = ["Priya", "Friday", "distributive property", "basketball"]
+# How the browser batches summary requests (conversationSummary.js)
+RECENT_MESSAGES = 6
+SUMMARY_BATCH = 4
+
+
+def previous_prompt(history: list[dict[str, str]], message: str) -> str:
+    persona = get_personality("friendly_tutor")["system_prompt"]
+    prompt = f"ROLE AND PERSONA:\n{persona}\n\n"
+    prompt += "LEARNER CONTEXT:\n"
+    prompt += "".join(f"{label}: {PROFILE[key]}\n" for label, key in (
+        ("Learning Topic", "topic"),
+        ("Education Level", "education"),
+        ("Grade/Academic Level", "grade"),
+    ))
+    prompt += "\n"
+    if history:
+        prompt += "CONVERSATION HISTORY:\n"
+        for msg in history[-4:]:
+            prompt += f"{'Student' if msg['role'] == 'user' else 'You'}: {msg['content']}\n"
+        prompt += "\n"
+    prompt += f"STUDENT'S QUESTION:\n{message}\n\n"
+    prompt += (
+        "Respond naturally in character. Provide comprehensive explanations with examples. "
+        "For math, read symbols properly (e.g., '3/6' as 'three divided by six', "
+        "not 'three forwardslash six')."
+        "Do not use parenthetical actions."
+        f" Please keep the response under {CHAR_LIMIT} characters."
+        "Avoid using symbols like * because it doesn't read well aloud."
+    )
+    return prompt
+
+
+def session() -> list[dict[str, str]]:
+    """A long session: short questions, full-length answers and one huge paste."""
+    messages = []
+    for turn in range(1, TURNS + 1):
+        question = FACTS.get(turn, f"Question {turn}: how do I solve 3x + {turn} = 2x - 4?")
+        if turn == 60:
+            question = "Here are my notes, can you check them? " + "x = 2y + 3. " * 2000
+        messages.append({"role": "user", "content": question})
+        messages.append({"role": "assistant", "content": f"Answer {turn}. " + "Let's work it out step by step. " * 30})
+    return messages
+
+
+def new_prompt(history, message, summary="", retrieved=None, budget=BUDGET):
+    return build_prompt(
+        "friendly_tutor", PROFILE, history, message, CHAR_LIMIT, retrieved, summary, budget
+    )
+
+
+def test_prompt_stays_within_budget_over_a_long_session():
+    messages = session()
+    before, after = [], []
+    for i in range(0, len(messages), 2):
+        history, message = messages[:i], messages[i]["content"]
+        before.append(estimate_tokens(previous_prompt(history, message)))
+        after.append(estimate_tokens(new_prompt(history, message, SUMMARY if i > 12 else "")))
+
+    assert max(after) <= BUDGET
+    # The old prompt grew with whatever was pasted
+    assert max(before) > 2 * BUDGET
+    # and the new one stays flat once the session is underway: whole turns
+    # that no longer fit are left out, but history never collapses
+    assert min(after[10:]) > BUDGET // 2
+
+
+def test_summary_and_recent_turns_are_included():
+    messages = session()
+    prompt = new_prompt(messages[:200], "What should I practise next?", SUMMARY)
+
+    assert SUMMARY in prompt
+    assert "What should I practise next?" in prompt
+    assert get_personality("friendly_tutor")["system_prompt"] in prompt
+    # The newest turn is kept, the oldest ones are left to the summary
+    assert messages[199]["content"] in prompt
+    assert messages[0]["content"] not in prompt
+
+
+def rolling_summary(client: TestClient, messages: list[dict[str, str]]) -> tuple[str, int]:
+    """Fold a session into a summary through ``/summarize``, in the batches
+    the browser sends (see conversationSummary.js): after every turn, once
+    SUMMARY_BATCH messages have left the RECENT_MESSAGES window. Returns
+    the summary and how many messages it covers."""
+    summary, covered = "", 0
+    for end in range(2, len(messages) + 1, 2):
+        up_to = end - RECENT_MESSAGES
+        if up_to - covered < SUMMARY_BATCH:
+            continue
+        response = client.post("/summarize", json={"summary": summary, "turns": messages[covered:up_to]})
+        assert response.status_code == 200
+        summary, covered = response.json()["summary"], up_to
+    return summary, covered
+
+
+def test_context_recall_before_and_after(mock_upstreams):
+    messages = session()[:160]
+    message = "Can you give me one more practice problem?"
+    settings = dataclasses.replace(load_settings(), gemini_base_url=mock_upstreams)
+    with TestClient(create_app(settings)) as client:
+        summary, covered = rolling_summary(client, messages)
+
+    def recall(prompt: str) -> float:
+        return sum(marker in prompt for marker in RECALL_MARKERS) / len(RECALL_MARKERS)
+
+    # 38 rounds of four messages
+    assert covered == 152
+    assert recall(previous_prompt(messages, message)) == 0
+    # The facts from the first turns survived every round
+    assert recall(new_prompt(messages[covered:], message, summary)) == 1
+
+
+def test_oversized_message_and_summary_are_capped():
+    prompt = new_prompt([], "x " * 50_000, summary="y " * 50_000)
+    assert estimate_tokens(prompt) <= BUDGET
+    assert "[...]" in prompt
+
+
+def test_retrieved_passages_fill_what_is_left():
+    passages = [
+        {"text": f"Passage {i}. " + "Linear equations balance both sides. " * 40, "source": "notes.pdf", "page": i}
+        for i in range(1, 30)
+    ]
+    # Recent turns outrank passages, so keep the history short here
+    prompt = new_prompt(session()[:4], "What is a linear equation?", SUMMARY, passages)
+
+    assert estimate_tokens(prompt) <= BUDGET
+    assert "[notes.pdf, page 1]" in prompt
+    # Lower-ranked passages are dropped rather than the budget exceeded
+    assert "[notes.pdf, page 29]" not in prompt
@@ -0,0 +1,35 @@
+"""The replay benchmark's sentence chunker against the browser's: both run
+the cases in studyAI/src/lib/sentenceChunker.cases.json."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from bench import replay
+
+FIXTURE = json.loads(
+    (Path(__file__).resolve().parents[2] / "studyAI/src/lib/sentenceChunker.cases.json").read_text(encoding="utf-8")
+)
+
+
+def test_uses_the_shared_constants():
+    assert {
+        "sentenceBoundary": replay._SENTENCE_BOUNDARY.pattern,
+        "minFirstChunkChars": replay._MIN_FIRST_CHUNK_CHARS,
+        "minChunkChars": replay._MIN_CHUNK_CHARS,
+        "maxChunkChars": replay._MAX_CHUNK_CHARS,
+    } == FIXTURE["constants"]
+
+
+@pytest.mark.parametrize("case", FIXTURE["cases"], ids=[case["name"] for case in FIXTURE["cases"]])
+def test_chunks_like_the_browser(case):
+    chunks: list[str] = []
+    chunker = replay.SentenceChunker(chunks.append, case["charLimit"] or float("inf"))
+    for piece in case["pieces"]:
+        if not chunker.push(piece):
+            break
+    chunker.flush()
+
+    assert chunks == case["chunks"]
+    assert (chunker.text, chunker.truncated) == (case["text"], case["truncated"])
@@ -0,0 +1,209 @@
+// Transcript render benchmark: time to show one new message and JS heap
+// size with 100, 1,000 and 10,000 messages, for the windowed MessageList
+// and for the render-everything list the chat used before it.
+//
+//   npm run bench:render
+//
+// opens /bench/render.html on the Vite dev server. Query parameters:
+// sizes=100,1000,10000, appends=30, variants=windowed,full. Heap figures
+// need Chrome; start it with --enable-precise-memory-info and
+// --js-flags=--expose-gc for stable numbers. Results are also logged with
+// console.table and left on window.__renderBench for scripted runs.
+
+import { useState } from "react";
+import { flushSync } from "react-dom";
+import { createRoot } from "react-dom/client";
+
+import MessageList from "../src/components/MessageList.jsx";
+
+const params = new URLSearchParams(window.location.search);
+const SIZES = (params.get("sizes") || "100,1000,10000").split(",").map(Number).filter(Boolean);
+const APPENDS = Number(params.get("appends")) || 30;
+const VARIANTS = (params.get("variants") || "windowed,full").split(",");
+
+const SENTENCES = [
+  "Let's break this down step by step.",
+  "A fraction tells us how many equal parts we have.",
+  "To add fractions, first find a common denominator.",
+  "Great question! Photosynthesis turns light into chemical energy.",
+  "Remember to check your answer by substituting it back in.",
+  "Can you explain why the denominator stays the same?",
+  "The mitochondria release energy through cellular respiration."
+];
+
+function makeMessage(i) {
+  const length = 1 + (i * 7) % 6;
+  const content = Array.from({ length }, (_, j) => SENTENCES[(i + j) % SENTENCES.length]).join(" ");
+  return {
+    id: `bench-${i}`,
+    seq: i,
+    role: i % 2 === 0 ? "user" : "assistant",
+    content,
+    audioKey: i % 2 === 1 ? `audio-${i}` : undefined
+  };
+}
+
+// The transcript as chat rendered it before windowing: every message
+// mounted, keyed by index, styles rebuilt on every render.
+function FullList({ messages, onPlay }) {
+  return (
+    <div
+      style={{
+        flex: 1,
+        overflowY: "auto",
+        overflowX: "hidden",
+        padding: "20px",
+        display: "flex",
+        flexDirection: "column",
+        gap: "15px",
+        backgroundColor: "#fff",
+        minHeight: 0
+      }}
+    >
+      {messages.map((msg, index) => (
+        <div
+          key={index}
+          style={{
+            alignSelf: msg.role === "user" ? "flex-end" : "flex-start",
+            maxWidth: "70%",
+            padding: "12px 16px",
+            borderRadius: "12px",
+            backgroundColor: msg.role === "user" ? "#000" : msg.role === "error" ? "#ffebee" : "#f0f0f0",
+            color: msg.role === "user" ? "#fff" : msg.role === "error" ? "#c62828" : "#000",
+            wordWrap: "break-word",
+            whiteSpace: "pre-wrap"
+          }}
+        >
+          {msg.content}
+
+          {msg.audioKey && (
+            <button
+              onClick={() => onPlay(msg)}
+              style={{
+                marginLeft: 8,
+                padding: "2px 6px",
+                fontSize: 12,
+                background: "transparent",
+                border: "1px solid #333",
+                borderRadius: 4,
+                cursor: "pointer"
+              }}
+            >
+              Play
+            </button>
+          )}
+        </div>
+      ))}
+    </div>
+  );
+}
+
+const LISTS = {
+  windowed: (messages) => <MessageList messages={messages} onPlay={noop} hasOlder={false} onLoadOlder={noop} />,
+  full: (messages) => <FullList messages={messages} onPlay={noop} />
+};
+
+function noop() {}
+
+// Holds the transcript and hands its setter to the benchmark loop
+function Host({ variant, initial, onReady }) {
+  const [messages, setMessages] = useState(initial);
+  onReady(setMessages);
+  return LISTS[variant](messages);
+}
+
+const nextFrame = () => new Promise((resolve) => requestAnimationFrame(() => setTimeout(resolve, 0)));
+
+function heapMb() {
+  window.gc?.();
+  const used = performance.memory?.usedJSHeapSize;
+  return used === undefined ? null : used / 1048576;
+}
+
+function percentile(samples, p) {
+  const sorted = [...samples].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+async function measure(variant, size, container) {
+  await nextFrame();
+  const heapBefore = heapMb();
+  const initial = Array.from({ length: size }, (_, i) => makeMessage(i));
+  let setMessages;
+  const root = createRoot(container);
+
+  let started = performance.now();
+  flushSync(() => root.render(<Host variant={variant} initial={initial} onReady={(set) => { setMessages = set; }} />));
+  await nextFrame();
+  const mountMs = performance.now() - started;
+
+  const commitMs = [];
+  const frameMs = [];
+  for (let i = 0; i < APPENDS; i++) {
+    const message = makeMessage(size + i);
+    started = performance.now();
+    flushSync(() => setMessages((previous) => [...previous, message]));
+    commitMs.push(performance.now() - started);
+    await nextFrame();
+    frameMs.push(performance.now() - started);
+  }
+
+  const heapAfter = heapMb();
+  const domNodes = container.getElementsByTagName("*").length;
+  root.unmount();
+
+  const round = (value) => (value === null ? "n/a" : Number(value.toFixed(2)));
+  return {
+    variant,
+    messages: size,
+    "mount ms": round(mountMs),
+    "commit ms p50": round(percentile(commitMs, 50)),
+    "commit ms p95": round(percentile(commitMs, 95)),
+    "to frame ms p50": round(percentile(frameMs, 50)),
+    "to frame ms p95": round(percentile(frameMs, 95)),
+    "heap MB": round(heapAfter),
+    "heap delta MB": round(heapAfter === null || heapBefore === null ? null : heapAfter - heapBefore),
+    "DOM nodes": domNodes
+  };
+}
+
+function renderTable(rows, done) {
+  const columns = rows.length ? Object.keys(rows[0]) : [];
+  const table = (
+    <>
+      <p>{done ? "Done." : "Running…"} {APPENDS} appends per row; heap {performance.memory ? "from performance.memory" : "unavailable in this browser"}.</p>
+      <table style={{ borderCollapse: "collapse", marginBottom: 20, fontSize: 13 }}>
+        <thead>
+          <tr>{columns.map((column) => <th key={column} style={{ textAlign: "right", padding: "2px 10px" }}>{column}</th>)}</tr>
+        </thead>
+        <tbody>
+          {rows.map((row) => (
+            <tr key={`${row.variant}-${row.messages}`}>
+              {columns.map((column) => <td key={column} style={{ textAlign: "right", padding: "2px 10px" }}>{row[column]}</td>)}
+            </tr>
+          ))}
+        </tbody>
+      </table>
+    </>
+  );
+  flushSync(() => resultsRoot.render(table));
+}
+
+const resultsRoot = createRoot(document.getElementById("results"));
+
+async function main() {
+  const container = document.getElementById("root");
+  const rows = [];
+  renderTable(rows, false);
+  for (const size of SIZES) {
+    for (const variant of VARIANTS) {
+      rows.push(await measure(variant, size, container));
+      renderTable(rows, false);
+    }
+  }
+  renderTable(rows, true);
+  console.table(rows);
+  window.__renderBench = rows;
+}
+
+main();
@@ -0,0 +1,199 @@
+// Ingestion benchmark: extraction throughput (pages/sec) and prompt size
+// for synthetic 100- and 1,000-page documents.
+//
+//   node scripts/bench-ingest.js [pages...]
+//
+// Runs the same extraction, chunking and BM25 code as the ingestion
+// worker. The PDF case needs pdfjs-dist installed (npm ci) and is skipped
+// otherwise. "Inline" is what the old single-message upload cost: the whole
+// file as base64 in the prompt.
+
+import { Buffer } from 'node:buffer'
+import process from 'node:process'
+import { performance } from 'node:perf_hooks'
+
+import { extractPdf, extractText } from '../src/lib/documentText.js'
+import { chunkText, createBm25Index, estimateTokens, selectWithinBudget } from '../src/lib/retrieval.js'
+
+const RETRIEVAL_TOKEN_BUDGET = 1500
+const WORDS_PER_PAGE = 400
+const QUERIES = 20
+
+const VOCABULARY = (
+  'cell membrane energy light water carbon oxygen glucose enzyme protein nucleus ' +
+  'chloroplast mitochondria respiration diffusion osmosis gene trait species habitat ' +
+  'force mass velocity acceleration momentum friction gravity wave frequency current ' +
+  'voltage resistance circuit atom molecule bond reaction acid base solution equation'
+).split(' ')
+
+// Deterministic pseudo-random numbers, so every run sees the same text
+function random(seed) {
+  let state = seed
+  return () => {
+    state = (state * 1664525 + 1013904223) % 4294967296
+    return state / 4294967296
+  }
+}
+
+function syntheticPages(count) {
+  const next = random(42)
+  const pages = []
+  for (let page = 1; page <= count; page++) {
+    const words = []
+    for (let i = 0; i < WORDS_PER_PAGE; i++) {
+      // One rare term per page gives every page something to be found by
+      words.push(i % 50 === 0 ? `topic${page}` : VOCABULARY[Math.floor(next() * VOCABULARY.length)])
+      if (i % 80 === 79) words.push('.\n\n')
+    }
+    pages.push(words.join(' '))
+  }
+  return pages
+}
+
+function lines(text, width = 90) {
+  const result = []
+  let line = ''
+  for (const word of text.split(/\s+/).filter(Boolean)) {
+    if (line && line.length + word.length + 1 > width) {
+      result.push(line)
+      line = ''
+    }
+    line = line ? `${line} ${word}` : word
+  }
+  if (line) result.push(line)
+  return result
+}
+
+// Smallest valid PDF with one text page per entry of `pages`
+function buildPdf(pages) {
+  const objects = [
+    '<< /Type /Catalog /Pages 2 0 R >>',
+    null, // page tree, filled in once the page objects are numbered
+    '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+  ]
+  const kids = []
+  pages.forEach((text) => {
+    const escaped = lines(text).map((line) => `(${line.replace(/[\\()]/g, '\\$&')}) Tj T*`)
+    const stream = `BT /F1 9 Tf 11 TL 40 760 Td\n${escaped.join('\n')}\nET`
+    objects.push(`<< /Length ${Buffer.byteLength(stream)} >>\nstream\n${stream}\nendstream`)
+    const contents = objects.length
+    objects.push(
+      `<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] ` +
+        `/Resources << /Font << /F1 3 0 R >> >> /Contents ${contents} 0 R >>`
+    )
+    kids.push(`${objects.length} 0 R`)
+  })
+  objects[1] = `<< /Type /Pages /Kids [${kids.join(' ')}] /Count ${pages.length} >>`
+
+  let pdf = '%PDF-1.4\n'
+  const offsets = objects.map((body, i) => {
+    const offset = Buffer.byteLength(pdf)
+    pdf += `${i + 1} 0 obj\n${body}\nendobj\n`
+    return offset
+  })
+  const xref = Buffer.byteLength(pdf)
+  pdf += `xref\n0 ${objects.length + 1}\n0000000000 65535 f \n`
+  pdf += offsets.map((offset) => `${String(offset).padStart(10, '0')} 00000 n \n`).join('')
+  pdf += `trailer\n<< /Size ${objects.length + 1} /Root 1 0 R >>\nstartxref\n${xref}\n%%EOF\n`
+  return new Uint8Array(Buffer.from(pdf, 'latin1'))
+}
+
+async function loadPdfjs() {
+  try {
+    return await import('pdfjs-dist/legacy/build/pdf.mjs')
+  } catch {
+    return null
+  }
+}
+
+// Extract with `extract`, index every section; returns timings and the index
+async function ingest(extract, pageCount) {
+  const index = createBm25Index()
+  let extractMs = 0
+  let indexMs = 0
+  let last = performance.now()
+  await extract((text, { page }) => {
+    const now = performance.now()
+    extractMs += now - last
+    chunkText(text).forEach((chunk) => index.add({ text: chunk, source: 'bench', page }))
+    last = performance.now()
+    indexMs += last - now
+  })
+  extractMs += performance.now() - last
+  return {
+    index,
+    extractMs,
+    indexMs,
+    pagesPerSec: pageCount / ((extractMs + indexMs) / 1000),
+  }
+}
+
+function promptSize(index, pageCount, fileBytes) {
+  const next = random(7)
+  let retrievedTokens = 0
+  let searchMs = 0
+  for (let i = 0; i < QUERIES; i++) {
+    const page = 1 + Math.floor(next() * pageCount)
+    const started = performance.now()
+    const passages = selectWithinBudget(index.search(`explain topic${page} energy`, 8), RETRIEVAL_TOKEN_BUDGET)
+    searchMs += performance.now() - started
+    retrievedTokens += passages.reduce((sum, passage) => sum + estimateTokens(passage.text), 0)
+  }
+  return {
+    retrievedTokens: Math.round(retrievedTokens / QUERIES),
+    searchMs: searchMs / QUERIES,
+    inlineTokens: estimateTokens('x'.repeat(Math.ceil(fileBytes / 3) * 4)),
+  }
+}
+
+const round = (value, digits = 1) => Number(value.toFixed(digits))
+
+async function main() {
+  const sizes = process.argv.slice(2).map(Number).filter(Boolean)
+  const pdfjsLib = await loadPdfjs()
+  const rows = []
+
+  for (const pageCount of sizes.length ? sizes : [100, 1000]) {
+    const pages = syntheticPages(pageCount)
+
+    const txt = new Blob([pages.join('\n\n')])
+    const text = await ingest((onSection) => extractText(txt, onSection), pageCount)
+    rows.push({
+      format: 'txt',
+      pages: pageCount,
+      'pages/sec': round(text.pagesPerSec, 0),
+      'extract ms': round(text.extractMs),
+      'index ms': round(text.indexMs),
+      chunks: text.index.size,
+      ...promptColumns(promptSize(text.index, pageCount, txt.size)),
+    })
+
+    if (pdfjsLib) {
+      const data = buildPdf(pages)
+      const size = data.byteLength
+      const pdf = await ingest((onSection) => extractPdf(pdfjsLib, data, onSection), pageCount)
+      rows.push({
+        format: 'pdf',
+        pages: pageCount,
+        'pages/sec': round(pdf.pagesPerSec, 0),
+        'extract ms': round(pdf.extractMs),
+        'index ms': round(pdf.indexMs),
+        chunks: pdf.index.size,
+        ...promptColumns(promptSize(pdf.index, pageCount, size)),
+      })
+    }
+  }
+
+  console.table(rows)
+  if (!pdfjsLib) console.log('pdfjs-dist is not installed; PDF rows skipped (run npm ci).')
+}
+
+function promptColumns({ retrievedTokens, searchMs, inlineTokens }) {
+  return {
+    'search ms': round(searchMs, 2),
+    'prompt tokens (retrieved)': retrievedTokens,
+    'prompt tokens (inline)': inlineTokens,
+  }
+}
+
+main()
@@ -0,0 +1,109 @@
+// Startup benchmark: what /setup downloads and compiles before first paint.
+//
+//   npm run bench:startup                 # builds, then measures dist/
+//   npm run bench:startup:only -- a b     # measure existing builds a/ and b/
+//
+// Reads the built index.html for the entry script, its modulepreloads and
+// stylesheets (the initial assets), reports raw and gzip sizes, estimated
+// transfer time on a few network profiles and the time V8 takes to compile
+// the initial modules. Everything else under assets/ is loaded lazily and
+// reported as "deferred". Pass a build of an older commit as a second
+// directory to compare the two.
+
+import { readdirSync, readFileSync } from 'node:fs'
+import { extname, join } from 'node:path'
+import process from 'node:process'
+import { performance } from 'node:perf_hooks'
+import vm from 'node:vm'
+import { gzipSync } from 'node:zlib'
+
+const COMPILE_RUNS = 15
+
+// Throughput in kbit/s and round-trip time in ms; the first is the
+// throttling Lighthouse applies to its mobile runs
+const NETWORKS = {
+  'slow 4G': { kbps: 1638, rttMs: 150 },
+  '4G': { kbps: 9000, rttMs: 60 },
+  broadband: { kbps: 40000, rttMs: 20 },
+}
+
+function initialAssets(dist) {
+  const html = readFileSync(join(dist, 'index.html'), 'utf8')
+  const assets = new Set()
+  for (const [tag] of html.matchAll(/<(script|link)\b[^>]*>/g)) {
+    const url = /\b(?:src|href)="([^"]+)"/.exec(tag)?.[1]
+    if (!url || /^https?:/.test(url)) continue
+    const isScript = tag.startsWith('<script') && /type="module"/.test(tag)
+    const isPreload = /rel="modulepreload"/.test(tag)
+    const isStylesheet = /rel="stylesheet"/.test(tag)
+    if (isScript || isPreload || isStylesheet) assets.add(url.replace(/^\//, ''))
+  }
+  return [...assets]
+}
+
+function sizes(dist, files) {
+  let raw = 0
+  let gzip = 0
+  for (const file of files) {
+    const content = readFileSync(join(dist, file))
+    raw += content.length
+    gzip += gzipSync(content).length
+  }
+  return { raw, gzip }
+}
+
+// Median time to compile the initial modules. A unique trailing comment
+// keeps V8 from answering from its compilation cache.
+function compileMs(dist, scripts) {
+  const sources = scripts.map((file) => readFileSync(join(dist, file), 'utf8'))
+  const runs = []
+  for (let run = 0; run < COMPILE_RUNS; run++) {
+    const started = performance.now()
+    sources.forEach((source, i) => new vm.SourceTextModule(`${source}\n//${run}`, { identifier: scripts[i] }))
+    runs.push(performance.now() - started)
+  }
+  runs.sort((a, b) => a - b)
+  return runs[Math.floor(runs.length / 2)]
+}
+
+// One round trip for the HTML, one for the assets it references (fetched
+// in parallel), then the bytes at the profile's throughput
+function transferMs(gzipBytes, { kbps, rttMs }) {
+  return 2 * rttMs + (gzipBytes * 8) / kbps
+}
+
+function measure(dist) {
+  const initial = initialAssets(dist)
+  const scripts = initial.filter((file) => extname(file) === '.js')
+  const styles = initial.filter((file) => extname(file) === '.css')
+  const deferred = readdirSync(join(dist, 'assets'))
+    .map((file) => `assets/${file}`)
+    .filter((file) => extname(file) === '.js' && !initial.includes(file))
+
+  const js = sizes(dist, scripts)
+  const css = sizes(dist, styles)
+  const row = {
+    build: dist,
+    'initial JS files': scripts.length,
+    'initial JS kB': kb(js.raw),
+    'initial JS kB gzip': kb(js.gzip),
+    'CSS kB gzip': kb(css.gzip),
+    'compile ms': Number(compileMs(dist, scripts).toFixed(1)),
+    'deferred JS kB gzip': kb(sizes(dist, deferred).gzip),
+  }
+  for (const [name, network] of Object.entries(NETWORKS)) {
+    row[`${name} ms`] = Math.round(transferMs(js.gzip + css.gzip, network))
+  }
+  return row
+}
+
+const kb = (bytes) => Number((bytes / 1024).toFixed(1))
+
+function main() {
+  const dists = process.argv.slice(2)
+  const rows = (dists.length ? dists : ['dist']).map(measure)
+  console.table(rows)
+  console.log('Transfer estimates cover initial JS and CSS only, not the HTML or fonts.')
+}
+
+main()
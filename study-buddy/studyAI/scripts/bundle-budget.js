@@ -0,0 +1,42 @@
+// Vite plugin that fails the production build when the JavaScript needed
+// for first paint grows past a budget. "Initial JS" is the entry chunk plus
+// every chunk it imports statically, i.e. what /setup downloads before it
+// can render; lazy routes and workers are not counted.
+
+import { Buffer } from 'node:buffer'
+import { gzipSync } from 'node:zlib'
+
+export default function bundleBudget({ maxGzipKb }) {
+  return {
+    name: 'bundle-budget',
+    apply: 'build',
+    generateBundle(_options, bundle) {
+      const entry = Object.values(bundle).find((chunk) => chunk.type === 'chunk' && chunk.isEntry)
+      if (!entry) return
+
+      const initial = new Set()
+      const visit = (fileName) => {
+        if (initial.has(fileName)) return
+        initial.add(fileName)
+        bundle[fileName]?.imports?.forEach(visit)
+      }
+      visit(entry.fileName)
+
+      let rawBytes = 0
+      let gzipBytes = 0
+      initial.forEach((fileName) => {
+        const code = bundle[fileName]?.code ?? ''
+        rawBytes += Buffer.byteLength(code)
+        gzipBytes += gzipSync(code).length
+      })
+
+      const gzipKb = gzipBytes / 1024
+      const summary = `initial JS ${(rawBytes / 1024).toFixed(1)} kB (${gzipKb.toFixed(1)} kB gzip) ` +
+        `in ${initial.size} chunk(s), budget ${maxGzipKb} kB gzip`
+      if (gzipKb > maxGzipKb) {
+        this.error(`Bundle budget exceeded: ${summary}`)
+      }
+      console.log(`bundle-budget: ${summary}`)
+    },
+  }
+}
@@ -1,22 +1,28 @@
+import { lazy, Suspense } from 'react';
 import { BrowserRouter, Routes, Route } from 'react-router-dom';
 import NavBar from './components/navbar';
 import SetupPage from './components/setup';
-import PersonalitiesPage from './components/PersonalitiesPage';
 import { UserProfileProvider } from './context/UserProfileContext';
 
+// The setup page is the landing route and ships in the main bundle; the
+// chat route and everything it pulls in are split into their own chunk
+const PersonalitiesPage = lazy(() => import('./components/PersonalitiesPage'));
+
 function App() {
   return (
     <BrowserRouter>
       <UserProfileProvider>
         <NavBar />
-        <Routes>
-          <Route path="/" element={<SetupPage />} />
-          <Route path="/setup" element={<SetupPage />} />
-          <Route path="/personalities" element={<PersonalitiesPage />} />
-        </Routes>
+        <Suspense fallback={null}>
+          <Routes>
+            <Route path="/" element={<SetupPage />} />
+            <Route path="/setup" element={<SetupPage />} />
+            <Route path="/personalities" element={<PersonalitiesPage />} />
+          </Routes>
+        </Suspense>
       </UserProfileProvider>
     </BrowserRouter>
   )
 }
 
-export default App
\ No newline at end of file
+export default App
@@ -0,0 +1,215 @@
+import { memo, useCallback, useEffect, useLayoutEffect, useMemo, useRef, useState } from "react";
+
+// Windowed chat transcript: only rows near the viewport are mounted, so
+// typing and scrolling stay smooth with thousands of messages. Row heights
+// are measured as rows render; unmeasured rows use an estimate.
+
+const ESTIMATED_ROW_HEIGHT = 72;
+const ROW_GAP = 15;
+// Extra pixels rendered above and below the viewport
+const OVERSCAN_PX = 800;
+// Ask for older messages when scrolled this close to the top
+const LOAD_OLDER_THRESHOLD_PX = 300;
+// Follow new messages only if the user is already at the bottom
+const STICK_TO_BOTTOM_PX = 80;
+
+const CONTAINER_STYLE = {
+  flex: 1,
+  overflowY: "auto",
+  overflowX: "hidden",
+  padding: "20px",
+  backgroundColor: "#fff",
+  minHeight: 0
+};
+
+const EMPTY_STYLE = {
+  textAlign: "center",
+  color: "#999",
+  marginTop: "50px",
+  fontSize: "1.1em"
+};
+
+const BUBBLE_BASE = {
+  maxWidth: "70%",
+  padding: "12px 16px",
+  borderRadius: "12px",
+  wordWrap: "break-word",
+  whiteSpace: "pre-wrap"
+};
+
+const ROW_STYLES = {
+  user: { display: "flex", justifyContent: "flex-end", paddingBottom: ROW_GAP },
+  other: { display: "flex", justifyContent: "flex-start", paddingBottom: ROW_GAP }
+};
+
+const BUBBLE_STYLES = {
+  user: { ...BUBBLE_BASE, backgroundColor: "#000", color: "#fff" },
+  assistant: { ...BUBBLE_BASE, backgroundColor: "#f0f0f0", color: "#000" },
+  error: { ...BUBBLE_BASE, backgroundColor: "#ffebee", color: "#c62828" },
+  thinking: { ...BUBBLE_BASE, backgroundColor: "#f0f0f0", color: "#666" }
+};
+
+const PLAY_BUTTON_STYLE = {
+  marginLeft: 8,
+  padding: "2px 6px",
+  fontSize: 12,
+  background: "transparent",
+  border: "1px solid #333",
+  borderRadius: 4,
+  cursor: "pointer"
+};
+
+function MessageBubble({ message, onPlay }) {
+  return (
+    <div style={message.role === "user" ? ROW_STYLES.user : ROW_STYLES.other}>
+      <div style={BUBBLE_STYLES[message.role] || BUBBLE_STYLES.assistant}>
+        {message.content}
+
+        {message.audioKey && onPlay && (
+          <button onClick={() => onPlay(message)} style={PLAY_BUTTON_STYLE}>
+            Play
+          </button>
+        )}
+      </div>
+    </div>
+  );
+}
+
+// Re-renders only when its own message changes
+const MessageRow = memo(function MessageRow({ message, onPlay, onHeight }) {
+  const ref = useRef(null);
+
+  useLayoutEffect(() => {
+    const element = ref.current;
+    const report = () => onHeight(message.id, element.offsetHeight);
+    report();
+    const observer = new ResizeObserver(report);
+    observer.observe(element);
+    return () => observer.disconnect();
+  }, [message.id, onHeight]);
+
+  return (
+    <div ref={ref}>
+      <MessageBubble message={message} onPlay={onPlay} />
+    </div>
+  );
+});
+
+// Index of the first row whose bottom edge is below `y`
+function findRow(offsets, y) {
+  let low = 0;
+  let high = offsets.length - 2;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (offsets[mid + 1] <= y) low = mid + 1;
+    else high = mid;
+  }
+  return Math.max(0, low);
+}
+
+export default function MessageList({ messages, pendingReply, isThinking, onPlay, hasOlder, onLoadOlder }) {
+  const containerRef = useRef(null);
+  const heightsRef = useRef(new Map());
+  const offsetsRef = useRef(null);
+  const indexByIdRef = useRef(new Map());
+  const stickToBottomRef = useRef(true);
+  const previousFirstIdRef = useRef(null);
+  const [layoutVersion, setLayoutVersion] = useState(0);
+  const [viewport, setViewport] = useState({ top: 0, height: 0 });
+
+  // offsets[i] is the top of row i; offsets[length] is the total height
+  const offsets = useMemo(() => {
+    const result = new Float64Array(messages.length + 1);
+    const indexById = new Map();
+    messages.forEach((message, i) => {
+      indexById.set(message.id, i);
+      result[i + 1] = result[i] + (heightsRef.current.get(message.id) ?? ESTIMATED_ROW_HEIGHT);
+    });
+    indexByIdRef.current = indexById;
+    return result;
+    // layoutVersion changes whenever a row's measured height does
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [messages, layoutVersion]);
+  offsetsRef.current = offsets;
+
+  const onHeight = useCallback((id, height) => {
+    const previous = heightsRef.current.get(id) ?? ESTIMATED_ROW_HEIGHT;
+    if (previous === height && heightsRef.current.has(id)) return;
+    heightsRef.current.set(id, height);
+
+    // Keep the content on screen still when a row above it changes size
+    const container = containerRef.current;
+    const index = indexByIdRef.current.get(id);
+    if (container && index !== undefined && !stickToBottomRef.current
+        && offsetsRef.current[index + 1] <= container.scrollTop) {
+      container.scrollTop += height - previous;
+    }
+    setLayoutVersion(version => version + 1);
+  }, []);
+
+  const handleScroll = () => {
+    const container = containerRef.current;
+    stickToBottomRef.current =
+      container.scrollHeight - container.scrollTop - container.clientHeight < STICK_TO_BOTTOM_PX;
+    setViewport({ top: container.scrollTop, height: container.clientHeight });
+    if (hasOlder && container.scrollTop < LOAD_OLDER_THRESHOLD_PX) onLoadOlder();
+  };
+
+  // Track the viewport height
+  useEffect(() => {
+    const container = containerRef.current;
+    const observer = new ResizeObserver(() => {
+      setViewport({ top: container.scrollTop, height: container.clientHeight });
+    });
+    observer.observe(container);
+    return () => observer.disconnect();
+  }, []);
+
+  // When older messages are prepended, shift the scroll position by their
+  // height so the rows the user was reading stay in place
+  useLayoutEffect(() => {
+    const firstId = messages[0]?.id ?? null;
+    const previousFirstId = previousFirstIdRef.current;
+    previousFirstIdRef.current = firstId;
+    if (!previousFirstId || firstId === previousFirstId) return;
+    const index = indexByIdRef.current.get(previousFirstId);
+    if (index > 0) containerRef.current.scrollTop += offsets[index];
+  }, [messages, offsets]);
+
+  // Follow the conversation (including a reply that is still streaming)
+  // while the user is at the bottom
+  useLayoutEffect(() => {
+    if (stickToBottomRef.current) {
+      const container = containerRef.current;
+      container.scrollTop = container.scrollHeight;
+    }
+  });
+
+  const start = findRow(offsets, viewport.top - OVERSCAN_PX);
+  const end = Math.min(messages.length, findRow(offsets, viewport.top + viewport.height + OVERSCAN_PX) + 1);
+  const visible = messages.slice(start, end);
+
+  return (
+    <div ref={containerRef} onScroll={handleScroll} style={CONTAINER_STYLE}>
+      {messages.length === 0 && !pendingReply && (
+        <div style={EMPTY_STYLE}>
+          Start your conversation by typing a message below!
+        </div>
+      )}
+
+      <div style={{ position: "relative", height: offsets[messages.length] }}>
+        <div style={{ position: "absolute", top: offsets[start], left: 0, right: 0 }}>
+          {visible.map(message => (
+            <MessageRow key={message.id} message={message} onPlay={onPlay} onHeight={onHeight} />
+          ))}
+        </div>
+      </div>
+
+      {pendingReply?.content && <MessageBubble message={pendingReply} />}
+
+      {isThinking && (
+        <MessageBubble message={{ role: "thinking", content: "Thinking..." }} />
+      )}
+    </div>
+  );
+}
@@ -0,0 +1,108 @@
+import { useMemo, useSyncExternalStore } from "react";
+import { summarizeTraces, traceBuffer } from "../lib/tracing";
+import { getAudioCacheStats, subscribeAudioCacheStats } from "../lib/audioCache";
+import { getPersonalityName } from "../lib/personalities";
+
+// Stages in turn order; anything else recorded is listed after these
+const STAGE_ORDER = [
+  "turn",
+  "context_build",
+  "retrieval",
+  "file_encoding",
+  "prompt_build",
+  "llm_ttfb",
+  "llm_total",
+  "tts",
+  "audio_decode",
+  "playback_start"
+];
+
+const PANEL_STYLE = {
+  position: "absolute",
+  top: "70px",
+  right: "12px",
+  zIndex: 1100,
+  width: "340px",
+  maxHeight: "60%",
+  overflowY: "auto",
+  padding: "12px",
+  borderRadius: "8px",
+  backgroundColor: "rgba(0, 0, 0, 0.85)",
+  color: "#fff",
+  fontSize: "12px",
+  fontFamily: "ui-monospace, monospace"
+};
+
+const CELL_STYLE = { padding: "2px 6px", textAlign: "right" };
+const STAGE_CELL_STYLE = { padding: "2px 6px", textAlign: "left" };
+
+const formatMs = (value) => (value === null ? "–" : `${Math.round(value)}`);
+const formatMb = (bytes) => (bytes === null ? "–" : `${(bytes / (1024 * 1024)).toFixed(1)} MB`);
+
+function stageRank(stage) {
+  const index = STAGE_ORDER.indexOf(stage);
+  return index === -1 ? STAGE_ORDER.length : index;
+}
+
+function AudioCacheStats() {
+  const stats = useSyncExternalStore(subscribeAudioCacheStats, getAudioCacheStats);
+
+  return (
+    <div style={{ marginBottom: "10px" }}>
+      <div style={{ fontWeight: "bold", marginBottom: "4px" }}>Audio cache</div>
+      <div>
+        hits {stats.hits} (memory {stats.memoryHits}, disk {stats.diskHits}) · misses {stats.misses}
+        {" "}· {Math.round(stats.hitRate * 100)}%
+      </div>
+      <div>
+        memory {formatMb(stats.memoryBytes)} in {stats.memoryEntries} clips · disk {formatMb(stats.diskBytes)}
+        {" "}· evictions {stats.evictions}
+      </div>
+    </div>
+  );
+}
+
+// Rolling p50/p95 per stage for each personality, from the last traced turns,
+// plus the audio cache counters
+export default function PerfPanel() {
+  const traces = useSyncExternalStore(traceBuffer.subscribe, traceBuffer.getTraces);
+  const summary = useMemo(() => summarizeTraces(traces), [traces]);
+  const personalities = Object.keys(summary);
+
+  return (
+    <div style={PANEL_STYLE}>
+      <AudioCacheStats />
+
+      <div style={{ fontWeight: "bold", marginBottom: "6px" }}>
+        Turn latency (ms) · last {traces.length} turns
+      </div>
+
+      {personalities.length === 0 && <div>No turns traced yet.</div>}
+
+      {personalities.map(personality => (
+        <table key={personality} style={{ width: "100%", marginBottom: "8px", borderCollapse: "collapse" }}>
+          <thead>
+            <tr>
+              <th style={STAGE_CELL_STYLE}>{getPersonalityName(personality)}</th>
+              <th style={CELL_STYLE}>n</th>
+              <th style={CELL_STYLE}>p50</th>
+              <th style={CELL_STYLE}>p95</th>
+            </tr>
+          </thead>
+          <tbody>
+            {Object.entries(summary[personality])
+              .sort(([a], [b]) => stageRank(a) - stageRank(b))
+              .map(([stage, { count, p50, p95 }]) => (
+                <tr key={stage}>
+                  <td style={STAGE_CELL_STYLE}>{stage}</td>
+                  <td style={CELL_STYLE}>{count}</td>
+                  <td style={CELL_STYLE}>{formatMs(p50)}</td>
+                  <td style={CELL_STYLE}>{formatMs(p95)}</td>
+                </tr>
+              ))}
+          </tbody>
+        </table>
+      ))}
+    </div>
+  );
+}
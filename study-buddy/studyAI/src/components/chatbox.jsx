@@ -1,92 +1,93 @@
-import { useRef, useState, useEffect } from "react";
-import { GoogleGenerativeAI } from "@google/generative-ai";
-import * as pdfjsLib from "pdfjs-dist";
-import mammoth from "mammoth";
-
-// Initialize Gemini
-const genAI = new GoogleGenerativeAI(import.meta.env.VITE_GEMINI_API_KEY);
-const model = genAI.getGenerativeModel({ model: "gemini-2.0-flash-exp" });
-
-// Eleven Labs configuration
-const ELEVEN_LABS_API_KEY = import.meta.env.VITE_ELEVEN_LABS_API_KEY;
-// Output character limit for chatbot responses
+import { useRef, useState, useEffect, useCallback } from "react";
+import MessageList from "./MessageList";
+import { createSentenceChunker } from "../lib/sentenceChunker";
+import { createAudioQueue } from "../lib/audioQueue";
+import { parseServerTiming, streamChat, summarizeConversation, synthesizeSpeech } from "../lib/gateway";
+import { PRIORITY } from "../lib/scheduler";
+import { audioCacheKey, getAudioUrl, getOrSynthesize, putAudio } from "../lib/audioCache";
+import { createConversationSummary } from "../lib/conversationSummary";
+import {
+  ingestDocument,
+  isIndexableDocument,
+  prefetchDocumentParsers,
+  resetDocumentIndex,
+  retrievePassages
+} from "../lib/documentIndex";
+import {
+  createMessageMeta,
+  loadConversationSummary,
+  loadTranscriptPage,
+  saveConversationSummary,
+  saveMessage
+} from "../lib/transcriptStore";
+import { getPersonalityName } from "../lib/personalities";
+import { startTurnTrace } from "../lib/tracing";
+import PerfPanel from "./PerfPanel";
+
+// Output character limit for chatbot responses (the gateway asks the model
+// for the same limit; it is enforced here on the stream)
 const OUTPUT_CHAR_LIMIT = 1000;
+// How much of the attached documents may go into one prompt
+const RETRIEVAL_TOKEN_BUDGET = 1500;
+// All chats share one persisted transcript
+const CONVERSATION_ID = "default";
 
-const PERSONALITY_VOICE_IDS = {
-  "friendly_tutor": "pwMBn0SsmN1220Aorv15",
-  "serious_professor": "dUercWozs0yhe4xBCgZ0",
-  "storyteller": "BNgbHR0DNeZixGQVzloa",
-  "motivator": "DGzg6RaUqxGRTHSBjfgF",
-  "visionary_ceo": "oziFLKtaxVDHQAh7o45V",
-  "pro_gamer": "thajOKLdcqh1pzw0ETBO",
-  "brainrot_buddy": "WDXJsFzaHXUACLvslhks",
-  "rhyming_rapper": "qVpGLzi5EhjW3WGVhOa9"
-};
-
-// Personality definitions (moved from backend)
-const PERSONALITIES = {
-  "friendly_tutor": {
-    name: "Friendly Tutor",
-    description: "A bubbly, patient teacher who explains with real-life mini examples and emojis.",
-    systemPrompt: "You are a cheerful and approachable tutor who helps younger students understand tricky topics. Explain with warmth, humor, and tiny real-life examples (like pizza slices, video games, or school life). Use clear everyday language and add emojis to keep it fun."
-  },
-  "serious_professor": {
-    name: "Serious Professor",
-    description: "A calm, precise educator with academic tone; uses structure, logic, and brief examples.",
-    systemPrompt: "You are a highly knowledgeable professor who values clarity, logic, and academic rigor. Provide structured, step-by-step explanations, use correct terminology, and cite examples or formulas that show real conceptual depth."
-  },
-  "storyteller": {
-    name: "Storyteller",
-    description: "A creative explainer who turns lessons into tiny imaginative stories or metaphors.",
-    systemPrompt: "You are a captivating storyteller who teaches through imagination. Every explanation should feel like a short, vivid story or scene that sneaks in the concept naturally."
-  },
-  "motivator": {
-    name: "Coach Commander",
-    description: "A bold, high-energy commander who motivates learners with military-level focus.",
-    systemPrompt: "You are a tough but encouraging commander leading a learning squad. Speak with energy, confidence, and authority. Push learners to stay disciplined, focused, and resilient. End every response with a short motivational quote."
-  },
-  "visionary_ceo": {
-    name: "Visionary CEO",
-    description: "A strategic, forward-thinking leader who connects learning to real-world innovation.",
-    systemPrompt: "You are a visionary CEO mentoring a young professional. Use leadership and innovation language. Draw connections between topics and how they matter in careers, innovation, and growth."
-  },
-  "pro_gamer": {
-    name: "Pro Gamer",
-    description: "A gaming legend who teaches concepts using gaming terminology, strategies, and epic quest vibes. Perfect for gamers who want to level up their knowledge.",
-    systemPrompt: "You are a legendary pro gamer and streaming personality who makes learning feel like an epic gaming quest. Use gaming terminology naturally throughout your explanations (XP, grinding, boss battles, skill trees, meta, buffs, debuffs, farming, clutch plays, combos, etc.). Frame concepts as game mechanics, challenges, or quests that need to be conquered. Keep the energy high and competitive but supportive – like a pro player coaching their teammate. Use references to popular games when helpful (Minecraft, Fortnite, League, Valorant, Dark Souls, etc.) but stay educational. Celebrate progress like achieving a new rank or unlocking an achievement. Stay completely in character as the Pro Gamer throughout your response."
-  },
-  "brainrot_buddy": {
-    name: "Brainrot Buddy",
-    description: "Your chronically online bestie who speaks fluent Gen Z and explains concepts using memes, slang, and unhinged internet energy. It's giving educational chaos.",
-    systemPrompt: "You are the most chronically online tutor ever – your brain is literally rotted from too much TikTok and you speak in pure Gen Z brainrot. Use terms like: no cap, fr fr, bussin, slay, ate and left no crumbs, it's giving, the way I, not me [doing something], let him cook, understood the assignment, serving, periodt, lowkey/highkey, main character energy, rizz, aura points, sigma, beta, alpha, NPC behavior, cooked, we're so back, it's so over, caught in 4k, ratio, L + ratio, touch grass, based, cringe, mid, chat is this real, delulu, snatched, tea/spill the tea, vibe check, gagged, mother is mothering, icon, legend, the girls are fighting, etc. Reference memes, TikTok sounds, and internet culture naturally. Be unhinged but still teach the actual concept correctly. Use emojis liberally (💀😭🔥✨💅). Call out when something is 'giving' specific vibes. You're like if a teacher and a TikTok comment section had a baby. Stay completely in this chaotic character."
-  },
-  "rhyming_rapper": {
-    name: "Rhyming Rapper",
-    description: "A cool educator who explains everything in catchy rhymes and beats.",
-    systemPrompt: "You are a rapper teacher. Explain concepts using rhymes and rhythmic flow. Keep it poetic and catchy."
-  }
-};
-
-export default function ChatBox({ selectedPersonality, personalities }) {
+const createSavedSummary = () => createConversationSummary({
+  summarize: summarizeConversation,
+  onChange: (state) => saveConversationSummary(CONVERSATION_ID, state)
+});
+
+export default function ChatBox({ selectedPersonality }) {
   const textareaRef = useRef(null);
-  const chatContainerRef = useRef(null);
   const audioRef = useRef(null);
   const recognitionRef = useRef(null);
+  const audioQueueRef = useRef(null);
+  const summaryRef = useRef(null);
+  const loadingOlderRef = useRef(false);
+  // Cancels the in-flight turn / replay (requests, streaming and audio)
+  const turnControllerRef = useRef(null);
+  const replayControllerRef = useRef(null);
   
   const [message, setMessage] = useState("");
   const [chatHistory, setChatHistory] = useState([]);
+  // Reply being streamed; kept out of chatHistory so tokens don't copy the transcript
+  const [pendingReply, setPendingReply] = useState(null);
+  const [hasOlder, setHasOlder] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
   const [isListening, setIsListening] = useState(false);
   const [isMuted, setIsMuted] = useState(false);
   const [autoPlayAudio, setAutoPlayAudio] = useState(true);
   const [uploadedFile, setUploadedFile] = useState(null);
+  const [documents, setDocuments] = useState([]);
+  const [showPerfPanel, setShowPerfPanel] = useState(false);
 
-  // File upload handler
+  // File upload handler. Documents are indexed in a worker and stay
+  // searchable for the rest of the chat; images are sent with the next
+  // message as before.
   const handleFileChange = (e) => {
     const file = e.target.files[0];
-    if (file) setUploadedFile(file);
+    e.target.value = "";
+    if (!file) return;
+    if (!isIndexableDocument(file)) {
+      setUploadedFile(file);
+      return;
+    }
+
+    const updateDocument = (updates) => {
+      setDocuments(prev => prev.map(doc => doc.file === file ? { ...doc, ...updates } : doc));
+    };
+    setDocuments(prev => [...prev, { file, name: file.name, status: "indexing", fraction: 0 }]);
+    ingestDocument(file, ({ pages, totalPages, fraction }) => updateDocument({ pages, totalPages, fraction }))
+      .then(() => updateDocument({ status: "ready" }))
+      .catch(error => {
+        console.error("Document indexing error:", error);
+        updateDocument({ status: "error" });
+      });
   };
 
+  const hasDocuments = documents.some(doc => doc.status === "ready");
+  const indexingDocument = documents.find(doc => doc.status === "indexing");
+
   // Get user profile from localStorage
   const topic = localStorage.getItem("sb_topic") || "";
   const education = localStorage.getItem("sb_education") || "";
@@ -123,13 +124,65 @@ export default function ChatBox({ selectedPersonality, personalities }) {
     }
   }, []);
 
-  // Auto-scroll to bottom when new messages arrive
+  // Warm the PDF parser while idle; stop any reply that is still playing
+  // and drop the indexed documents when the chat closes
   useEffect(() => {
-    if (chatContainerRef.current) {
-      chatContainerRef.current.scrollTop = chatContainerRef.current.scrollHeight;
-    }
+    prefetchDocumentParsers();
+    return () => {
+      audioQueueRef.current?.stop();
+      summaryRef.current?.cancel();
+      summaryRef.current = null;
+      resetDocumentIndex();
+    };
+  }, []);
+
+  // Switching personality (or leaving the chat) cancels whatever the
+  // previous one was still doing, so stale replies never land
+  useEffect(() => {
+    return () => {
+      turnControllerRef.current?.abort();
+      replayControllerRef.current?.abort();
+    };
+  }, [selectedPersonality]);
+
+  // Restore the latest page of the saved transcript and the summary of
+  // everything before it
+  useEffect(() => {
+    let cancelled = false;
+    Promise.all([
+      loadTranscriptPage(CONVERSATION_ID),
+      loadConversationSummary(CONVERSATION_ID)
+    ]).then(([{ messages, hasMore }, savedSummary]) => {
+      if (cancelled) return;
+      if (!summaryRef.current) summaryRef.current = createSavedSummary();
+      summaryRef.current.restore(savedSummary);
+      setChatHistory(prev => [...messages, ...prev]);
+      setHasOlder(hasMore);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, []);
+
+  // Load the previous page when the user scrolls to the top
+  const loadOlder = useCallback(async () => {
+    if (loadingOlderRef.current) return;
+    loadingOlderRef.current = true;
+    const beforeSeq = chatHistory.find(msg => msg.seq)?.seq ?? Infinity;
+    const { messages, hasMore } = await loadTranscriptPage(CONVERSATION_ID, { beforeSeq });
+    setChatHistory(prev => [...messages, ...prev]);
+    setHasOlder(hasMore);
+    loadingOlderRef.current = false;
   }, [chatHistory]);
 
+  // Add a message to the transcript; errors are shown but not saved
+  const appendMessage = (msg) => {
+    const stored = { ...createMessageMeta(), ...msg };
+    setChatHistory(prev => [...prev, stored]);
+    if (msg.role !== "error") saveMessage(CONVERSATION_ID, stored);
+    return stored;
+  };
+
   const handleInput = (e) => {
     const textarea = textareaRef.current;
     textarea.style.height = "auto"; 
@@ -137,72 +190,24 @@ export default function ChatBox({ selectedPersonality, personalities }) {
     setMessage(e.target.value);
   };
 
-  const buildPrompt = (userMessage) => {
-    const personality = PERSONALITIES[selectedPersonality] || PERSONALITIES["friendly_tutor"];
-    
-    let prompt = `ROLE AND PERSONA:\n${personality.systemPrompt}\n\n`;
-    
-    if (topic || education || grade) {
-      prompt += "LEARNER CONTEXT:\n";
-      if (topic) prompt += `Learning Topic: ${topic}\n`;
-      if (education) prompt += `Education Level: ${education}\n`;
-      if (grade) prompt += `Grade/Academic Level: ${grade}\n`;
-      prompt += "\n";
-    }
-    
-    if (chatHistory.length > 0) {
-      prompt += "CONVERSATION HISTORY:\n";
-      chatHistory.slice(-4).forEach(msg => {
-        prompt += `${msg.role === 'user' ? 'Student' : 'You'}: ${msg.content}\n`;
-      });
-      prompt += "\n";
-    }
-    
-    prompt += `STUDENT'S QUESTION:\n${userMessage}\n\n`;
-    prompt += "Respond naturally in character. Provide comprehensive explanations with examples. For math, read symbols properly (e.g., '3/6' as 'three divided by six', not 'three forwardslash six').";
-    prompt += 'Do not use parenthetical actions.';
-    prompt += ` Please keep the response under ${OUTPUT_CHAR_LIMIT} characters.`;
-    prompt += "Avoid using symbols like * because it doesn't read well aloud.";
-     
-    return prompt;
-  };
-
-  const generateAudio = async (text) => {
-    if (!ELEVEN_LABS_API_KEY) {
-      console.warn("ElevenLabs API key not configured");
-      return null;
-    }
-    
-    const voiceId = PERSONALITY_VOICE_IDS[selectedPersonality];
-    if (!voiceId) {
-      console.warn(`No voice ID found for personality: ${selectedPersonality}`);
-      return null;
-    }
-
+  // Synthesize one chunk of the reply. `previousText` is the chunk before it,
+  // which ElevenLabs uses to keep intonation continuous across requests.
+  // Clips are cached by (personality, text), so repeated phrases and
+  // replays skip the TTS request entirely.
+  const generateAudio = async (text, previousText, trace, signal) => {
+    const endSpan = trace?.span("tts", { chars: text.length });
+    let cached = true;
     try {
-      const response = await fetch(`https://api.elevenlabs.io/v1/text-to-speech/${voiceId}`, {
-        method: "POST",
-        headers: {
-          "xi-api-key": ELEVEN_LABS_API_KEY,
-          "Content-Type": "application/json"
-        },
-        body: JSON.stringify({
-          text: text,
-          voice_settings: {},
-          output_format: "mp3_44100_128"
-        })
+      const key = await audioCacheKey(selectedPersonality, text);
+      const blob = await getOrSynthesize(key, () => {
+        cached = false;
+        return synthesizeSpeech({ personality: selectedPersonality, text, previousText, signal });
       });
-
-      if (!response.ok) {
-        const errorText = await response.text();
-        console.error(`Audio generation failed (${response.status}):`, errorText);
-        return null;
-      }
-
-      const audioBlob = await response.blob();
-      return URL.createObjectURL(audioBlob);
+      endSpan?.({ bytes: blob?.size ?? 0, cached });
+      return blob;
     } catch (error) {
-      console.error("Audio generation error:", error);
+      endSpan?.({ error: true });
+      if (error.name !== "AbortError") console.error("Audio generation error:", error);
       return null;
     }
   };
@@ -225,63 +230,160 @@ export default function ChatBox({ selectedPersonality, personalities }) {
     setUploadedFile(null);
     textareaRef.current.style.height = "auto";
 
+    replayControllerRef.current?.abort();
+    const controller = new AbortController();
+    turnControllerRef.current = controller;
+    const { signal } = controller;
+
+    const trace = startTurnTrace({ personality: selectedPersonality });
+    const endContextSpan = trace.span("context_build");
+
+    // Conversation so far (without error notices), split by the rolling
+    // summary into what it already covers and what is sent verbatim
+    if (!summaryRef.current) summaryRef.current = createSavedSummary();
+    const conversation = chatHistory
+      .filter(msg => msg.role === "user" || msg.role === "assistant")
+      .map(({ id, role, content }) => ({ id, role, content }));
+    const { summary, history } = summaryRef.current.context(conversation);
+    endContextSpan({ historyMessages: history.length, summaryChars: summary.length });
+
     // Add user message to chat
-    setChatHistory(prev => [...prev, { role: "user", content: userMessage }]);
+    const userEntry = appendMessage({ role: "user", content: userMessage });
     setIsLoading(true);
 
+    // Start a fresh audio queue for this reply (inside the click/keypress,
+    // so the browser lets it play)
+    audioQueueRef.current?.stop();
+    const audioQueue = createAudioQueue({
+      muted: isMuted,
+      autoPlay: autoPlayAudio,
+      onDecoded: (start, end) => trace.record("audio_decode", start, end),
+      onPlaybackStart: (time) => trace.record("playback_start", trace.startTime, time)
+    });
+    audioQueueRef.current = audioQueue;
+    signal.addEventListener("abort", () => audioQueue.stop(), { once: true });
+
+    // Each completed sentence is sent to TTS right away and queued for
+    // playback in order while the model keeps streaming.
+    let previousChunk = "";
+    const chunker = createSentenceChunker({
+      charLimit: OUTPUT_CHAR_LIMIT,
+      onChunk: (chunk) => {
+        audioQueue.enqueue(generateAudio(chunk, previousChunk, trace, signal));
+        previousChunk = chunk;
+      }
+    });
+
     try {
-      // Build prompt with personality and context
-      const prompt = buildPrompt(userMessage);
+      // Pull the passages of the attached documents that match this question
+      let retrieved = [];
+      if (hasDocuments) {
+        const endSpan = trace.span("retrieval");
+        retrieved = await retrievePassages(userMessage, { tokenBudget: RETRIEVAL_TOKEN_BUDGET });
+        endSpan({ passages: retrieved.length });
+      }
 
-      // Call Gemini API
-      let result;
+      let file;
       if (uploadedFile) {
-        const fileData = [{
-          inlineData: {
-            data: await fileToBase64(uploadedFile),
-            mimeType: uploadedFile.type,
-          },
-        }];
-        result = await model.generateContent([prompt, ...fileData]);
-      } else {
-        result = await model.generateContent(prompt);
+        const endSpan = trace.span("file_encoding", { bytes: uploadedFile.size });
+        file = { data: await fileToBase64(uploadedFile), mimeType: uploadedFile.type };
+        endSpan({ encodedChars: file.data.length });
       }
 
-      const response = await result.response;
-      const aiResponse = response.text();
-      
-      // Enforce client-side output length limit and mark truncation if needed
-      const truncatedResponse = aiResponse.length > OUTPUT_CHAR_LIMIT
-        ? aiResponse.slice(0, OUTPUT_CHAR_LIMIT) + "..."
-        : aiResponse;
-
-      // Generate audio (use truncated text so TTS matches displayed text)
-      const audioUrl = await generateAudio(truncatedResponse);
-
-      // Add AI response to chat (store truncated version)
-      setChatHistory(prev => [...prev, { 
-        role: "assistant", 
-        content: truncatedResponse,
-        audioUrl: audioUrl
-      }]);
-
-      // Auto-play audio if available
-      if (audioUrl && audioRef.current) {
-        audioRef.current.src = audioUrl;
-        audioRef.current.muted = isMuted;
-        if (autoPlayAudio) {
-          audioRef.current.play().catch(err => console.error("Audio playback error:", err));
+      // The gateway builds the prompt from the persona, learner profile,
+      // summary, recent history and retrieved passages, to a token budget
+      const llmStart = trace.now();
+      let firstPiece = true;
+      const stream = streamChat({
+        personality: selectedPersonality,
+        profile: { topic, education, grade },
+        history,
+        summary,
+        message: userMessage,
+        retrieved,
+        file,
+        signal,
+        onResponse: (response) => {
+          // The gateway reports how long it spent building the prompt
+          const { prompt } = parseServerTiming(response.headers.get("Server-Timing"));
+          const promptAttributes = {
+            promptChars: Number(response.headers.get("X-Prompt-Chars")) || null,
+            promptTokens: Number(response.headers.get("X-Prompt-Tokens")) || null
+          };
+          if (prompt !== undefined) {
+            trace.record("prompt_build", llmStart, llmStart + prompt, promptAttributes);
+          }
+          // Shared answer cache: hit-exact, hit-similar, miss or bypass
+          trace.setAttributes({ ...promptAttributes, answerCache: response.headers.get("X-Answer-Cache") });
         }
+      });
+
+      for await (const piece of stream) {
+        if (firstPiece) {
+          trace.record("llm_ttfb", llmStart, trace.now());
+          firstPiece = false;
+        }
+        // Enforce the output length limit on the stream itself and stop
+        // reading once it is reached
+        const keepReading = chunker.push(piece);
+        setPendingReply({ role: "assistant", content: chunker.text });
+        if (!keepReading) break;
+      }
+      chunker.flush();
+      trace.record("llm_total", llmStart, trace.now(), {
+        responseChars: chunker.text.length,
+        truncated: chunker.truncated
+      });
+
+      // Join the synthesized chunks into one clip for the replay button. The
+      // message only keeps the cache key; the cache owns the blob and its URL.
+      const audioBlob = await audioQueue.finish();
+      signal.throwIfAborted();
+      let audioKey = null;
+      if (audioBlob) {
+        audioKey = await audioCacheKey(selectedPersonality, chunker.text);
+        putAudio(audioKey, audioBlob);
       }
 
+      setPendingReply(null);
+      const replyEntry = appendMessage({
+        role: "assistant",
+        content: chunker.text,
+        audioKey: audioKey,
+        personality: selectedPersonality
+      });
+
+      // Update the summary in the background while the student reads
+      summaryRef.current.refresh([
+        ...conversation,
+        { id: userEntry.id, role: "user", content: userMessage },
+        { id: replyEntry.id, role: "assistant", content: chunker.text }
+      ]);
+      trace.end("ok");
+
     } catch (error) {
+      if (signal.aborted) {
+        // Cancelled by a personality switch or leaving the chat: drop the
+        // partial reply quietly
+        trace.end("cancelled");
+        setPendingReply(null);
+        return;
+      }
       console.error("Error generating response:", error);
-      setChatHistory(prev => [...prev, { 
-        role: "error", 
-        content: "Sorry, I encountered an error. Please check your API keys and try again." 
-      }]);
+      trace.setAttributes({ error: error.message });
+      trace.end("error");
+      audioQueue.stop();
+      // Drop a half-streamed reply so only the error remains
+      setPendingReply(null);
+      appendMessage({
+        role: "error",
+        content: "Sorry, I encountered an error. Please check that the gateway is running and try again."
+      });
     } finally {
-      setIsLoading(false);
+      if (turnControllerRef.current === controller) {
+        turnControllerRef.current = null;
+        setIsLoading(false);
+      }
     }
   };
 
@@ -313,14 +415,48 @@ export default function ChatBox({ selectedPersonality, personalities }) {
       if (audioRef.current) {
         audioRef.current.muted = newMuted;
       }
+      audioQueueRef.current?.setMuted(newMuted);
       return newMuted;
     });
   };
 
-  const getPersonalityName = () => {
-    return PERSONALITIES[selectedPersonality]?.name || selectedPersonality;
+  // Replay a previous answer. If its clip has been evicted from both cache
+  // tiers, synthesize the whole answer again.
+  const playMessageAudio = async (msg) => {
+    audioQueueRef.current?.stop();
+    replayControllerRef.current?.abort();
+    const controller = new AbortController();
+    replayControllerRef.current = controller;
+    controller.signal.addEventListener("abort", () => audioRef.current?.pause(), { once: true });
+
+    let url = await getAudioUrl(msg.audioKey);
+    if (!url) {
+      const personality = msg.personality || selectedPersonality;
+      const blob = await synthesizeSpeech({
+        personality,
+        text: msg.content,
+        priority: PRIORITY.REPLAY,
+        signal: controller.signal
+      }).catch(error => {
+        if (error.name !== "AbortError") console.error("Audio generation error:", error);
+        return null;
+      });
+      if (!blob) return;
+      await putAudio(msg.audioKey, blob);
+      url = await getAudioUrl(msg.audioKey);
+    }
+    if (url && audioRef.current && !controller.signal.aborted) {
+      audioRef.current.src = url;
+      audioRef.current.muted = isMuted;
+      audioRef.current.play().catch(err => console.error("Audio playback error:", err));
+    }
   };
 
+  // Stable handler so memoized rows don't re-render on every keystroke
+  const playMessageAudioRef = useRef(playMessageAudio);
+  playMessageAudioRef.current = playMessageAudio;
+  const handlePlay = useCallback(msg => playMessageAudioRef.current(msg), []);
+
   return (
     <div style={{ 
       width: "100%", 
@@ -336,10 +472,30 @@ export default function ChatBox({ selectedPersonality, personalities }) {
         borderBottom: "1px solid #e0e0e0",
         backgroundColor: "#f9f9f9",
         textAlign: "center",
-        flexShrink: 0
+        flexShrink: 0,
+        position: "relative"
       }}>
+        {/* Performance panel toggle */}
+        <button
+          onClick={() => setShowPerfPanel(prev => !prev)}
+          title={showPerfPanel ? "Hide performance panel" : "Show performance panel"}
+          style={{
+            position: "absolute",
+            top: "12px",
+            right: "12px",
+            padding: "4px 8px",
+            fontSize: "0.9em",
+            background: showPerfPanel ? "#1a1a1a" : "transparent",
+            color: showPerfPanel ? "#fff" : "#333",
+            border: "1px solid #ccc",
+            borderRadius: "6px",
+            cursor: "pointer"
+          }}
+        >
+          ⏱
+        </button>
         <h2 style={{ margin: 0, color: "#000" }}>
-          Chatting with: {getPersonalityName()}
+          Chatting with: {getPersonalityName(selectedPersonality)}
         </h2>
         {topic && (
           <p style={{ margin: "5px 0 0 0", color: "#666", fontSize: "0.9em" }}>
@@ -348,87 +504,17 @@ export default function ChatBox({ selectedPersonality, personalities }) {
         )}
       </div>
 
-      {/* Chat Messages */}
-      <div 
-        ref={chatContainerRef}
-        style={{
-          flex: 1,
-          overflowY: "auto",
-          overflowX: "hidden",
-          padding: "20px",
-          display: "flex",
-          flexDirection: "column",
-          gap: "15px",
-          backgroundColor: "#fff",
-          minHeight: 0
-        }}
-      >
-        {chatHistory.length === 0 && (
-          <div style={{ 
-            textAlign: "center", 
-            color: "#999", 
-            marginTop: "50px",
-            fontSize: "1.1em" 
-          }}>
-            Start your conversation by typing a message below!
-          </div>
-        )}
+      {showPerfPanel && <PerfPanel />}
 
-        {chatHistory.map((msg, index) => (
-          <div
-            key={index}
-            style={{
-              alignSelf: msg.role === "user" ? "flex-end" : "flex-start",
-              maxWidth: "70%",
-              padding: "12px 16px",
-              borderRadius: "12px",
-              backgroundColor: msg.role === "user" ? "#000" : msg.role === "error" ? "#ffebee" : "#f0f0f0",
-              color: msg.role === "user" ? "#fff" : msg.role === "error" ? "#c62828" : "#000",
-              wordWrap: "break-word",
-              whiteSpace: "pre-wrap"
-            }}
-          >
-            {msg.content}
-            
-            {msg.audioUrl && (
-              <button
-                onClick={() => {
-                  if (audioRef.current) {
-                    audioRef.current.src = msg.audioUrl;
-                    audioRef.current.muted = isMuted;
-                    audioRef.current.play();
-                  }
-                }}
-                style={{
-                  marginLeft: 8,
-                  padding: "2px 6px",
-                  fontSize: 12,
-                  background: "transparent",
-                  border: "1px solid #333",
-                  borderRadius: 4,
-                  cursor: "pointer"
-                }}
-              >
-                Play
-              </button>
-            )}
-          </div>
-        ))}
-
-        {isLoading && (
-          <div
-            style={{
-              alignSelf: "flex-start",
-              padding: "12px 16px",
-              borderRadius: "12px",
-              backgroundColor: "#f0f0f0",
-              color: "#666"
-            }}
-          >
-            Thinking...
-          </div>
-        )}
-      </div>
+      {/* Chat Messages */}
+      <MessageList
+        messages={chatHistory}
+        pendingReply={pendingReply}
+        isThinking={isLoading && !pendingReply?.content}
+        onPlay={handlePlay}
+        hasOlder={hasOlder}
+        onLoadOlder={loadOlder}
+      />
 
       {/* Input Area */}
       <div
@@ -484,7 +570,7 @@ export default function ChatBox({ selectedPersonality, personalities }) {
             width: "48px",
             height: "48px",
             borderRadius: "50%",
-            backgroundColor: uploadedFile ? "#10b981" : "#1a1a1a",
+            backgroundColor: uploadedFile || hasDocuments ? "#10b981" : "#1a1a1a",
             color: "white",
             cursor: "pointer",
             border: "none",
@@ -496,8 +582,9 @@ export default function ChatBox({ selectedPersonality, personalities }) {
           📎
         </label>
 
-        {uploadedFile && (
+        {(uploadedFile || documents.length > 0) && (
           <span
+            title={documents.map(doc => doc.name).join(", ")}
             style={{
               alignSelf: "center",
               marginRight: "10px",
@@ -509,7 +596,13 @@ export default function ChatBox({ selectedPersonality, personalities }) {
               whiteSpace: "nowrap",
             }}
           >
-            {uploadedFile.name}
+            {uploadedFile
+              ? uploadedFile.name
+              : indexingDocument
+                ? `Indexing ${indexingDocument.name} (${indexingDocument.totalPages
+                  ? `${indexingDocument.pages}/${indexingDocument.totalPages} pages`
+                  : `${Math.round(indexingDocument.fraction * 100)}%`})`
+                : `${documents.filter(doc => doc.status === "ready").length} document(s) indexed`}
           </span>
         )}
 
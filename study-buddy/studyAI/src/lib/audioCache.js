@@ -0,0 +1,203 @@
+// Two-tier cache for synthesized speech, keyed by hash(voice, text, format).
+//
+//   memory: LRU of Blobs with a byte budget. Object URLs handed out for
+//           playback belong to their entry and are revoked on eviction.
+//   disk:   IndexedDB store that survives reloads, trimmed by last use.
+//
+// Replayed answers, regenerated replies and common phrases are served
+// without another ElevenLabs request, and browser memory stays bounded
+// however long the session runs.
+
+import { promisifyRequest, withStore } from "./idb.js";
+
+export const TTS_OUTPUT_FORMAT = "mp3_44100_128";
+
+const MEMORY_BUDGET_BYTES = 24 * 1024 * 1024;
+const DISK_BUDGET_BYTES = 150 * 1024 * 1024;
+const STORE = "ttsAudio";
+
+const memory = new Map(); // key -> { blob, url }; Map order is LRU order
+let memoryBytes = 0;
+let diskBytes = null; // unknown until the first trim
+
+const stats = {
+  memoryHits: 0,
+  diskHits: 0,
+  misses: 0,
+  evictions: 0,
+};
+const statsListeners = new Set();
+let statsSnapshot = null;
+
+function statsChanged() {
+  statsSnapshot = null;
+  statsListeners.forEach((listener) => listener());
+}
+
+export async function audioCacheKey(voice, text, format = TTS_OUTPUT_FORMAT) {
+  const data = new TextEncoder().encode(JSON.stringify([voice, text, format]));
+  const digest = await crypto.subtle.digest("SHA-256", data);
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+function touch(key, entry) {
+  memory.delete(key);
+  memory.set(key, entry);
+}
+
+function evictMemory() {
+  for (const [key, entry] of memory) {
+    // Always keep the newest entry, even if it alone is over budget
+    if (memoryBytes <= MEMORY_BUDGET_BYTES || memory.size === 1) break;
+    memory.delete(key);
+    memoryBytes -= entry.blob.size;
+    if (entry.url) URL.revokeObjectURL(entry.url);
+    stats.evictions += 1;
+  }
+}
+
+function putMemory(key, blob) {
+  const existing = memory.get(key);
+  if (existing) {
+    touch(key, existing);
+    return existing;
+  }
+  const entry = { blob, url: null };
+  memory.set(key, entry);
+  memoryBytes += blob.size;
+  evictMemory();
+  statsChanged();
+  return entry;
+}
+
+async function readDisk(key) {
+  let record;
+  try {
+    record = await withStore(STORE, "readonly", (store) => promisifyRequest(store.get(key)));
+  } catch (error) {
+    console.warn("Audio cache read failed:", error);
+    return null;
+  }
+  if (!record) return null;
+  // Move the hit to the back of the trim order without delaying playback
+  withStore(STORE, "readwrite", (store) => {
+    store.put({ ...record, lastUsed: Date.now() });
+  }).catch((error) => console.warn("Audio cache update failed:", error));
+  return record.blob;
+}
+
+async function writeDisk(key, blob) {
+  try {
+    await withStore(STORE, "readwrite", (store) => {
+      store.put({ key, blob, size: blob.size, lastUsed: Date.now() });
+    });
+    if (diskBytes === null || diskBytes + blob.size > DISK_BUDGET_BYTES) {
+      await trimDisk();
+    } else {
+      diskBytes += blob.size;
+    }
+    statsChanged();
+  } catch (error) {
+    console.warn("Audio cache write failed:", error);
+  }
+}
+
+// Drop the least recently used records until the store fits its budget.
+async function trimDisk() {
+  diskBytes = await withStore(STORE, "readwrite", (store) => new Promise((resolve, reject) => {
+    const records = [];
+    const cursorRequest = store.index("lastUsed").openCursor();
+    cursorRequest.onerror = () => reject(cursorRequest.error);
+    cursorRequest.onsuccess = () => {
+      const cursor = cursorRequest.result;
+      if (cursor) {
+        records.push({ key: cursor.value.key, size: cursor.value.size });
+        cursor.continue();
+        return;
+      }
+      // Oldest first, so delete from the front
+      let total = records.reduce((sum, record) => sum + record.size, 0);
+      for (const record of records) {
+        if (total <= DISK_BUDGET_BYTES) break;
+        store.delete(record.key);
+        total -= record.size;
+      }
+      resolve(total);
+    };
+  }));
+}
+
+// Memory entry for a clip, promoting disk hits into memory; null on a miss.
+async function lookup(key) {
+  const entry = memory.get(key);
+  if (entry) {
+    touch(key, entry);
+    stats.memoryHits += 1;
+    statsChanged();
+    return entry;
+  }
+
+  const blob = await readDisk(key);
+  if (blob) {
+    stats.diskHits += 1;
+    return putMemory(key, blob);
+  }
+
+  stats.misses += 1;
+  statsChanged();
+  return null;
+}
+
+// Look up a clip. Resolves to its Blob, or null on a miss.
+export async function getAudio(key) {
+  const entry = await lookup(key);
+  return entry ? entry.blob : null;
+}
+
+export async function putAudio(key, blob) {
+  putMemory(key, blob);
+  await writeDisk(key, blob);
+}
+
+// Object URL for a cached clip, created on demand and owned by the cache:
+// callers must not revoke it. Resolves to null if the clip is not cached.
+export async function getAudioUrl(key) {
+  let entry = await lookup(key);
+  if (!entry) return null;
+  // Evicted while the lookup resolved (another clip landed in between):
+  // put it back so the URL is still revoked when the entry goes
+  if (memory.get(key) !== entry) entry = putMemory(key, entry.blob);
+  if (!entry.url) entry.url = URL.createObjectURL(entry.blob);
+  return entry.url;
+}
+
+// Return the cached clip for `key`, or run `synthesize()` and cache its result.
+export async function getOrSynthesize(key, synthesize) {
+  const cached = await getAudio(key);
+  if (cached) return cached;
+  const blob = await synthesize();
+  if (blob) putAudio(key, blob);
+  return blob;
+}
+
+// Counters for the performance panel. The snapshot only changes when a
+// counter does, so it can back useSyncExternalStore.
+export function getAudioCacheStats() {
+  if (!statsSnapshot) {
+    const hits = stats.memoryHits + stats.diskHits;
+    statsSnapshot = {
+      ...stats,
+      hits,
+      hitRate: hits + stats.misses > 0 ? hits / (hits + stats.misses) : 0,
+      memoryBytes,
+      memoryEntries: memory.size,
+      diskBytes,
+    };
+  }
+  return statsSnapshot;
+}
+
+export function subscribeAudioCacheStats(listener) {
+  statsListeners.add(listener);
+  return () => statsListeners.delete(listener);
+}
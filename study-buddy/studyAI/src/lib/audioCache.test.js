@@ -0,0 +1,38 @@
+import { describe, it } from "node:test";
+import assert from "node:assert/strict";
+
+import { getAudio, getAudioCacheStats, getAudioUrl, putAudio } from "./audioCache.js";
+
+// Bigger than the whole memory budget, so storing it evicts everything else
+const HUGE_BYTES = 25 * 1024 * 1024;
+
+describe("getAudioUrl", () => {
+  // There is no IndexedDB under node: the disk tier logs and misses
+  const quiet = (t) => t.mock.method(console, "warn", () => {});
+
+  it("returns a URL for a cached clip and null for a miss", async (t) => {
+    quiet(t);
+    await putAudio("url-hit", new Blob(["abc"], { type: "audio/mpeg" }));
+    const url = await getAudioUrl("url-hit");
+    assert.match(url, /^blob:/);
+    assert.equal(await getAudioUrl("url-hit"), url);
+    assert.equal(await getAudioUrl("url-miss"), null);
+  });
+
+  it("survives the entry being evicted while the lookup resolves", async (t) => {
+    quiet(t);
+    const clip = new Blob(["replayed sentence"], { type: "audio/mpeg" });
+    await putAudio("replayed", clip);
+
+    const pending = getAudioUrl("replayed");
+    // A chunk of the running turn lands before the lookup resumes
+    const evictions = getAudioCacheStats().evictions;
+    const stored = putAudio("incoming", new Blob([new Uint8Array(HUGE_BYTES)]));
+    assert.ok(getAudioCacheStats().evictions > evictions);
+
+    const url = await pending;
+    await stored;
+    assert.match(url, /^blob:/);
+    assert.equal(await getAudio("replayed"), clip);
+  });
+});
@@ -0,0 +1,92 @@
+// Plays TTS chunks back-to-back through the Web Audio API. Each chunk is
+// scheduled to start exactly when the previous one ends, so there is no
+// gap between sentences even though they were synthesized separately.
+
+let sharedContext = null;
+
+function getAudioContext() {
+  if (!sharedContext) {
+    const AudioContext = window.AudioContext || window.webkitAudioContext;
+    sharedContext = new AudioContext();
+  }
+  return sharedContext;
+}
+
+// Optional hooks for tracing: `onDecoded(start, end)` brackets each
+// decodeAudioData call and `onPlaybackStart(time)` fires once with the
+// moment the first chunk starts playing (both performance.now() times).
+export function createAudioQueue({ muted = false, autoPlay = true, onDecoded, onPlaybackStart } = {}) {
+  // Must be created/resumed inside the user gesture that sent the message,
+  // otherwise browsers keep the context suspended.
+  const ctx = getAudioContext();
+  if (ctx.state === "suspended") ctx.resume();
+
+  const gain = ctx.createGain();
+  gain.gain.value = muted ? 0 : 1;
+  gain.connect(ctx.destination);
+
+  const blobs = [];
+  const sources = [];
+  let nextStartTime = 0;
+  let stopped = false;
+  // Chunks are decoded and scheduled strictly in order; the TTS requests
+  // behind them still run concurrently.
+  let chain = Promise.resolve();
+
+  const schedule = async (blob) => {
+    blobs.push(blob);
+    if (!autoPlay || stopped) return;
+
+    const decodeStart = performance.now();
+    const buffer = await ctx.decodeAudioData(await blob.arrayBuffer());
+    onDecoded?.(decodeStart, performance.now());
+    if (stopped) return;
+
+    const source = ctx.createBufferSource();
+    source.buffer = buffer;
+    source.connect(gain);
+
+    const startAt = Math.max(ctx.currentTime, nextStartTime);
+    source.start(startAt);
+    if (sources.length === 0) {
+      onPlaybackStart?.(performance.now() + (startAt - ctx.currentTime) * 1000);
+    }
+    nextStartTime = startAt + buffer.duration;
+    sources.push(source);
+  };
+
+  return {
+    // Add the audio for the next chunk. `blobPromise` may resolve to null
+    // when synthesis failed; the chunk is then skipped.
+    enqueue(blobPromise) {
+      chain = chain
+        .then(() => blobPromise)
+        .then((blob) => (blob ? schedule(blob) : undefined))
+        .catch((err) => console.error("Audio chunk error:", err));
+      return chain;
+    },
+
+    setMuted(value) {
+      gain.gain.value = value ? 0 : 1;
+    },
+
+    stop() {
+      stopped = true;
+      sources.forEach((source) => {
+        try {
+          source.stop();
+        } catch {
+          // already finished
+        }
+      });
+      gain.disconnect();
+    },
+
+    // Resolves once every enqueued chunk has been fetched and scheduled,
+    // with all chunks joined into one MP3 for the message's replay button.
+    async finish() {
+      await chain;
+      return blobs.length > 0 ? new Blob(blobs, { type: "audio/mpeg" }) : null;
+    },
+  };
+}
@@ -0,0 +1,71 @@
+// Rolling summary of the older part of a conversation. After a turn,
+// messages that fall out of the recent window are folded into the summary
+// by the gateway in the background, so the next prompt carries the gist of
+// the whole session without resending all of it.
+
+// Messages always sent verbatim
+const RECENT_MESSAGES = 6;
+// Wait until this many messages have left the window before summarizing,
+// so there is at most one summary request every couple of turns.
+const SUMMARY_BATCH = 4;
+
+// Messages are { id, role, content }; progress is tracked by message id so
+// older pages loaded into the transcript later don't shift it. `summarize`
+// is gateway.js's summarizeConversation, passed in so the tests can stand
+// in for it. `onChange` receives { summary, lastSummarizedId } after every
+// refresh, for saving.
+export function createConversationSummary({ summarize, onChange }) {
+  let summary = "";
+  let lastSummarizedId = null;
+  let inFlight = null;
+  const controller = new AbortController();
+
+  const unsummarizedStart = (messages) =>
+    lastSummarizedId === null ? 0 : messages.findIndex((msg) => msg.id === lastSummarizedId) + 1;
+
+  const strip = (messages) => messages.map(({ role, content }) => ({ role, content }));
+
+  return {
+    // Context for the next turn: the summary plus every message it does not
+    // cover yet. The gateway trims the oldest of those to its token budget.
+    context(messages) {
+      return { summary, history: strip(messages.slice(unsummarizedStart(messages))) };
+    },
+
+    // Fold messages older than the recent window into the summary. Never
+    // blocks the caller; a failed refresh is retried after the next turn.
+    refresh(messages) {
+      if (inFlight) return;
+      const start = unsummarizedStart(messages);
+      const upTo = messages.length - RECENT_MESSAGES;
+      if (upTo - start < SUMMARY_BATCH) return;
+
+      const turns = messages.slice(start, upTo);
+      inFlight = summarize({ summary, turns: strip(turns), signal: controller.signal })
+        .then((next) => {
+          summary = next;
+          lastSummarizedId = turns[turns.length - 1].id;
+          onChange?.({ summary, lastSummarizedId });
+        })
+        .catch((error) => {
+          if (error.name !== "AbortError") console.warn("Conversation summary failed:", error);
+        })
+        .finally(() => {
+          inFlight = null;
+        });
+    },
+
+    // Pick up where an earlier visit left off, unless this session has
+    // already summarized something of its own
+    restore(saved) {
+      if (!saved || lastSummarizedId !== null || inFlight) return;
+      summary = saved.summary;
+      lastSummarizedId = saved.lastSummarizedId;
+    },
+
+    // Abandon any pending summary request (the chat is closing)
+    cancel() {
+      controller.abort();
+    },
+  };
+}
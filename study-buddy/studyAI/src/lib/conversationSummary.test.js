@@ -0,0 +1,195 @@
+import { describe, it } from "node:test";
+import assert from "node:assert/strict";
+
+import { createConversationSummary } from "./conversationSummary.js";
+
+// Alternating student and tutor messages with ids 1..count
+const transcript = (count, firstId = 1) =>
+  Array.from({ length: count }, (_, i) => ({
+    id: firstId + i,
+    role: i % 2 ? "assistant" : "user",
+    content: `message ${firstId + i}`,
+  }));
+
+// Stand-in for gateway.js's summarizeConversation. Every call is recorded
+// and stays pending until the test settles it with resolve() or reject().
+function stubSummarize() {
+  const calls = [];
+  const summarize = ({ summary, turns, signal }) =>
+    new Promise((resolve, reject) => {
+      calls.push({ summary, turns, resolve, reject });
+      signal.addEventListener("abort", () => reject(new DOMException("aborted", "AbortError")));
+    });
+  return { calls, summarize };
+}
+
+// Let the refresh's then/catch/finally run
+const settle = () => new Promise((resolve) => setTimeout(resolve));
+
+describe("createConversationSummary", () => {
+  it("sends everything until a summary exists", () => {
+    const { calls, summarize } = stubSummarize();
+    const rolling = createConversationSummary({ summarize });
+    const messages = transcript(8);
+
+    assert.deepEqual(rolling.context(messages), {
+      summary: "",
+      history: messages.map(({ role, content }) => ({ role, content })),
+    });
+    assert.equal(calls.length, 0);
+  });
+
+  it("waits for a full batch to leave the recent window", () => {
+    const { calls, summarize } = stubSummarize();
+    const rolling = createConversationSummary({ summarize });
+
+    // Six recent messages plus three older ones: not a batch yet
+    rolling.refresh(transcript(9));
+    assert.equal(calls.length, 0);
+
+    rolling.refresh(transcript(10));
+    assert.equal(calls.length, 1);
+    assert.equal(calls[0].summary, "");
+    assert.deepEqual(calls[0].turns.map(({ content }) => content), [
+      "message 1", "message 2", "message 3", "message 4",
+    ]);
+    // Only role and content go to the gateway
+    assert.deepEqual(Object.keys(calls[0].turns[0]), ["role", "content"]);
+  });
+
+  it("tracks progress by id and folds the next batch into the summary", async () => {
+    const { calls, summarize } = stubSummarize();
+    const saved = [];
+    const rolling = createConversationSummary({ summarize, onChange: (state) => saved.push(state) });
+
+    rolling.refresh(transcript(10));
+    calls[0].resolve("first four");
+    await settle();
+    assert.deepEqual(saved, [{ summary: "first four", lastSummarizedId: 4 }]);
+
+    let messages = transcript(12);
+    assert.deepEqual(rolling.context(messages), {
+      summary: "first four",
+      history: messages.slice(4).map(({ role, content }) => ({ role, content })),
+    });
+    // Two more messages out of the window is still short of a batch
+    rolling.refresh(messages);
+    assert.equal(calls.length, 1);
+
+    // Older history loaded above the transcript does not move the position
+    messages = [...transcript(3, -2), ...transcript(14)];
+    assert.equal(rolling.context(messages).history[0].content, "message 5");
+    rolling.refresh(messages);
+    assert.equal(calls.length, 2);
+    assert.equal(calls[1].summary, "first four");
+    assert.deepEqual(calls[1].turns.map(({ content }) => content), [
+      "message 5", "message 6", "message 7", "message 8",
+    ]);
+    calls[1].resolve("first eight");
+    await settle();
+    assert.deepEqual(saved.at(-1), { summary: "first eight", lastSummarizedId: 8 });
+  });
+
+  it("makes one request at a time", async () => {
+    const { calls, summarize } = stubSummarize();
+    const rolling = createConversationSummary({ summarize });
+
+    rolling.refresh(transcript(10));
+    rolling.refresh(transcript(14));
+    assert.equal(calls.length, 1);
+
+    calls[0].resolve("first four");
+    await settle();
+    rolling.refresh(transcript(14));
+    assert.equal(calls.length, 2);
+  });
+
+  it("retries a failed refresh after the next turn", async (t) => {
+    const warn = t.mock.method(console, "warn", () => {});
+    const { calls, summarize } = stubSummarize();
+    const saved = [];
+    const rolling = createConversationSummary({ summarize, onChange: (state) => saved.push(state) });
+
+    rolling.refresh(transcript(10));
+    calls[0].reject(new Error("gateway down"));
+    await settle();
+    assert.equal(warn.mock.callCount(), 1);
+    assert.deepEqual(saved, []);
+    assert.equal(rolling.context(transcript(10)).history.length, 10);
+
+    rolling.refresh(transcript(12));
+    assert.equal(calls.length, 2);
+    assert.equal(calls[1].summary, "");
+    // The retry covers the failed batch and what has left the window since
+    assert.deepEqual(calls[1].turns.map(({ content }) => content), [
+      "message 1", "message 2", "message 3", "message 4", "message 5", "message 6",
+    ]);
+    calls[1].resolve("first six");
+    await settle();
+    assert.deepEqual(saved, [{ summary: "first six", lastSummarizedId: 6 }]);
+  });
+
+  it("picks up a saved summary", () => {
+    const { calls, summarize } = stubSummarize();
+    const rolling = createConversationSummary({ summarize });
+    rolling.restore({ summary: "first eight", lastSummarizedId: 8 });
+
+    const messages = transcript(14);
+    assert.deepEqual(rolling.context(messages), {
+      summary: "first eight",
+      history: messages.slice(8).map(({ role, content }) => ({ role, content })),
+    });
+    rolling.refresh(transcript(18));
+    assert.equal(calls[0].summary, "first eight");
+    assert.deepEqual(calls[0].turns.map(({ content }) => content), [
+      "message 9", "message 10", "message 11", "message 12",
+    ]);
+  });
+
+  it("counts every loaded message as new when the saved position is not loaded", () => {
+    const { calls, summarize } = stubSummarize();
+    const rolling = createConversationSummary({ summarize });
+    // Only the latest page is loaded; the summary ends further back
+    rolling.restore({ summary: "first eight", lastSummarizedId: 8 });
+
+    const messages = transcript(10, 21);
+    const { summary, history } = rolling.context(messages);
+    assert.equal(summary, "first eight");
+    assert.equal(history.length, 10);
+
+    rolling.refresh(messages);
+    assert.equal(calls[0].summary, "first eight");
+    assert.deepEqual(calls[0].turns.map(({ content }) => content), [
+      "message 21", "message 22", "message 23", "message 24",
+    ]);
+  });
+
+  it("keeps its own progress over a late restore", async () => {
+    const { calls, summarize } = stubSummarize();
+    const rolling = createConversationSummary({ summarize });
+
+    rolling.refresh(transcript(10));
+    // Ignored while a refresh is running...
+    rolling.restore({ summary: "stale", lastSummarizedId: 2 });
+    calls[0].resolve("first four");
+    await settle();
+    // ...and after this session has summarized
+    rolling.restore({ summary: "stale", lastSummarizedId: 2 });
+    assert.equal(rolling.context(transcript(10)).summary, "first four");
+  });
+
+  it("drops a pending request quietly when cancelled", async (t) => {
+    const warn = t.mock.method(console, "warn", () => {});
+    const { calls, summarize } = stubSummarize();
+    const saved = [];
+    const rolling = createConversationSummary({ summarize, onChange: (state) => saved.push(state) });
+
+    rolling.refresh(transcript(10));
+    rolling.cancel();
+    await settle();
+    assert.equal(calls.length, 1);
+    assert.equal(warn.mock.callCount(), 0);
+    assert.deepEqual(saved, []);
+    assert.equal(rolling.context(transcript(10)).summary, "");
+  });
+});
@@ -0,0 +1,80 @@
+// Main-thread handle on the ingestion worker (src/workers/ingest.worker.js).
+// Documents stay indexed in the worker for the life of the chat, so every
+// turn can pull in the passages relevant to that question.
+
+import pdfWorkerUrl from "pdfjs-dist/build/pdf.worker.min.mjs?url";
+
+let worker = null;
+let nextId = 0;
+const pending = new Map();
+
+function getWorker() {
+  if (!worker) {
+    worker = new Worker(new URL("../workers/ingest.worker.js", import.meta.url), { type: "module" });
+    worker.onmessage = ({ data }) => {
+      const request = pending.get(data.id);
+      if (!request) return;
+      if (data.type === "progress") {
+        request.onProgress?.(data);
+        return;
+      }
+      pending.delete(data.id);
+      if (data.type === "error") request.reject(new Error(data.message));
+      else request.resolve(data.result);
+    };
+  }
+  return worker;
+}
+
+function call(message, onProgress) {
+  return new Promise((resolve, reject) => {
+    const id = nextId++;
+    pending.set(id, { resolve, reject, onProgress });
+    getWorker().postMessage({ ...message, id });
+  });
+}
+
+const DOCUMENT_EXTENSIONS = [".pdf", ".docx", ".txt"];
+
+// PDFs, Word documents and text files are indexed; images are still sent
+// to the model inline.
+export function isIndexableDocument(file) {
+  const name = file.name.toLowerCase();
+  return DOCUMENT_EXTENSIONS.some((ext) => name.endsWith(ext));
+}
+
+// Extract and index `file`. `onProgress` receives { pages, totalPages,
+// fraction } after each section; pages are only counted for PDFs.
+// Resolves to { pages, chunks, ms }.
+export function ingestDocument(file, onProgress) {
+  return call({ type: "ingest", file }, onProgress);
+}
+
+// Top-ranked passages for `query` that fit in `tokenBudget`.
+export function retrievePassages(query, { k = 8, tokenBudget = 1500 } = {}) {
+  if (!worker) return Promise.resolve([]);
+  return call({ type: "search", query, k, tokenBudget });
+}
+
+// Download the pdf.js worker into the HTTP cache while the browser is idle,
+// so the first PDF attachment doesn't wait for it. Nothing is parsed or
+// executed until a PDF is actually attached.
+export function prefetchDocumentParsers() {
+  const whenIdle = window.requestIdleCallback || ((callback) => setTimeout(callback, 2000));
+  whenIdle(() => {
+    if (document.querySelector(`link[rel="prefetch"][href="${pdfWorkerUrl}"]`)) return;
+    const link = document.createElement("link");
+    link.rel = "prefetch";
+    link.href = pdfWorkerUrl;
+    document.head.appendChild(link);
+  });
+}
+
+// Drop every indexed document (the worker and its index are discarded).
+export function resetDocumentIndex() {
+  if (!worker) return;
+  worker.terminate();
+  worker = null;
+  pending.forEach(({ reject }) => reject(new Error("Document index was reset")));
+  pending.clear();
+}
@@ -0,0 +1,61 @@
+// Text extraction for attached documents, one section at a time. Used by
+// the ingestion worker (and the ingestion benchmark); the parsers are
+// passed in so each caller can load them its own way.
+//
+// Every extractor calls `onSection(text, { page, totalPages, fraction })`:
+// `page` is the page number for paged formats and null otherwise, and
+// `fraction` is how much of the file has been read so far.
+
+export async function extractPdf(pdfjsLib, data, onSection) {
+  const pdf = await pdfjsLib.getDocument({ data }).promise;
+  try {
+    for (let pageNumber = 1; pageNumber <= pdf.numPages; pageNumber++) {
+      const page = await pdf.getPage(pageNumber);
+      const content = await page.getTextContent();
+      const text = content.items.map((item) => item.str + (item.hasEOL ? "\n" : " ")).join("");
+      page.cleanup();
+      onSection(text, { page: pageNumber, totalPages: pdf.numPages, fraction: pageNumber / pdf.numPages });
+    }
+  } finally {
+    pdf.destroy();
+  }
+}
+
+export async function extractDocx(mammoth, arrayBuffer, onSection) {
+  const { value } = await mammoth.extractRawText({ arrayBuffer });
+  // DOCX has no fixed pages; index it as a single section
+  onSection(value, { page: null, totalPages: null, fraction: 1 });
+}
+
+// Read in slices so large text files are indexed as they stream in. Each
+// slice ends at a paragraph break when there is one in its second half,
+// otherwise at the last line break.
+export async function extractText(file, onSection) {
+  const reader = file.stream().getReader();
+  const decoder = new TextDecoder();
+  let pending = "";
+  let bytesRead = 0;
+  while (true) {
+    const { done, value } = await reader.read();
+    if (value) {
+      bytesRead += value.byteLength;
+      pending += decoder.decode(value, { stream: true });
+    }
+    if (done) pending += decoder.decode();
+
+    let cut = pending.length;
+    if (!done) {
+      const paragraph = pending.lastIndexOf("\n\n");
+      cut = paragraph >= pending.length / 2 ? paragraph + 2 : pending.lastIndexOf("\n") + 1;
+    }
+    if (cut > 0) {
+      onSection(pending.slice(0, cut), {
+        page: null,
+        totalPages: null,
+        fraction: file.size ? bytesRead / file.size : 1,
+      });
+      pending = pending.slice(cut);
+    }
+    if (done) return;
+  }
+}
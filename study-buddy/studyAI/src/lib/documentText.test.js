@@ -0,0 +1,62 @@
+import { describe, it } from "node:test";
+import assert from "node:assert/strict";
+
+import { extractText } from "./documentText.js";
+
+// A File-like object whose stream yields `pieces` one read at a time
+function fileOf(pieces) {
+  const bytes = pieces.map((piece) => new TextEncoder().encode(piece));
+  return {
+    size: bytes.reduce((sum, chunk) => sum + chunk.byteLength, 0),
+    stream: () => new ReadableStream({
+      pull(controller) {
+        if (bytes.length) controller.enqueue(bytes.shift());
+        else controller.close();
+      },
+    }),
+  };
+}
+
+async function sections(pieces) {
+  const result = [];
+  await extractText(fileOf(pieces), (text, progress) => result.push({ text, ...progress }));
+  return result;
+}
+
+describe("extractText", () => {
+  it("cuts at a paragraph break in the second half of what was read", async () => {
+    const result = await sections(["First line\nsecond line\n\nthird line\nfour", "th line\n"]);
+    assert.equal(result[0].text, "First line\nsecond line\n\n");
+    assert.equal(result[1].text, "third line\nfourth line\n");
+  });
+
+  it("falls back to the last line break when the paragraph break is early", async () => {
+    const result = await sections(["Intro\n\nA long paragraph that goes on\nand on and on\nand", " ends"]);
+    assert.equal(result[0].text, "Intro\n\nA long paragraph that goes on\nand on and on\n");
+    assert.equal(result[1].text, "and ends");
+  });
+
+  it("keeps multi-byte characters that straddle reads intact", async () => {
+    const encoded = new TextEncoder().encode("café\nnaïve");
+    const file = {
+      size: encoded.byteLength,
+      stream: () => new ReadableStream({
+        start(controller) {
+          controller.enqueue(encoded.slice(0, 4));
+          controller.enqueue(encoded.slice(4));
+          controller.close();
+        },
+      }),
+    };
+    const result = [];
+    await extractText(file, (text) => result.push(text));
+    assert.equal(result.join(""), "café\nnaïve");
+  });
+
+  it("reports progress as a fraction of the file, not as pages", async () => {
+    const result = await sections(["one\n", "two\n", "three"]);
+    assert.deepEqual(result.map(({ page, totalPages }) => [page, totalPages]), [[null, null], [null, null], [null, null]]);
+    assert.equal(result.at(-1).fraction, 1);
+    assert.ok(result[0].fraction < result[1].fraction);
+  });
+});
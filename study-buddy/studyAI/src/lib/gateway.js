@@ -0,0 +1,103 @@
+// Client for the Study Buddy gateway (study-buddy/gateway). The gateway
+// holds the API keys, personas and prompt logic; the browser only sends
+// the turn and reads back text and audio.
+//
+// Every call goes through a scheduler (see ./scheduler.js), takes an
+// optional AbortSignal and is retried on 429/5xx.
+
+import { createScheduler, HttpError, parseRetryAfter, PRIORITY } from "./scheduler";
+
+const GATEWAY_URL = import.meta.env.VITE_GATEWAY_URL || "/api";
+
+// Chat and summaries share the LLM lane, so a queued background summary
+// never delays the turn the student is waiting for.
+const llmScheduler = createScheduler({ maxConcurrent: 2 });
+const ttsScheduler = createScheduler({ maxConcurrent: 4 });
+
+async function post(path, body, signal) {
+  const response = await fetch(`${GATEWAY_URL}${path}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+    signal,
+  });
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new HttpError(
+      `Gateway ${path} failed (${response.status}): ${errorText}`,
+      response.status,
+      parseRetryAfter(response.headers.get("Retry-After"))
+    );
+  }
+  return response;
+}
+
+// Yields the reply text piece by piece as the gateway streams it.
+// `summary` covers the conversation before `history`; `retrieved` holds
+// passages from attached documents relevant to this turn. `onResponse`
+// receives the response (and its timing headers) before the body streams.
+// Aborting `signal` cancels the request or stops the stream mid-reply.
+export async function* streamChat({
+  personality, profile, history, summary, message, retrieved, file, onResponse, signal
+}) {
+  const body = { personality, profile, history, summary, message, retrieved, file };
+  const response = await llmScheduler.schedule({
+    run: (jobSignal) => post("/chat", body, jobSignal),
+    priority: PRIORITY.CURRENT,
+    signal,
+  });
+  onResponse?.(response);
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  const stop = () => reader.cancel().catch(() => {});
+  signal?.addEventListener("abort", stop, { once: true });
+  try {
+    while (true) {
+      const { done, value } = await reader.read();
+      if (signal?.aborted) throw new DOMException("The request was cancelled", "AbortError");
+      if (done) return;
+      yield value;
+    }
+  } finally {
+    signal?.removeEventListener("abort", stop);
+    stop();
+  }
+}
+
+// Durations reported by the gateway in a Server-Timing header, by name.
+export function parseServerTiming(header) {
+  const timings = {};
+  (header || "").split(",").forEach((entry) => {
+    const [name, ...params] = entry.trim().split(";");
+    const dur = params.map((param) => param.trim()).find((param) => param.startsWith("dur="));
+    if (name && dur) timings[name] = Number(dur.slice(4));
+  });
+  return timings;
+}
+
+// Returns `summary` updated to also cover `turns`.
+export function summarizeConversation({ summary, turns, signal }) {
+  return llmScheduler.schedule({
+    run: async (jobSignal) => {
+      const response = await post("/summarize", { summary, turns }, jobSignal);
+      const data = await response.json();
+      return data.summary;
+    },
+    priority: PRIORITY.BACKGROUND,
+    signal,
+  });
+}
+
+// Returns the MP3 for one chunk of a reply. Requests for the same text and
+// personality that are already in flight are shared. Use PRIORITY.REPLAY
+// for answers the student asked to hear again.
+export function synthesizeSpeech({ personality, text, previousText, priority = PRIORITY.CURRENT, signal }) {
+  return ttsScheduler.schedule({
+    run: async (jobSignal) => {
+      const response = await post("/tts", { personality, text, previousText }, jobSignal);
+      return response.blob();
+    },
+    key: JSON.stringify([personality, text]),
+    priority,
+    signal,
+  });
+}
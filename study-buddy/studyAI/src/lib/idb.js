@@ -0,0 +1,65 @@
+// Minimal promise wrapper around IndexedDB shared by the client-side stores.
+
+const DB_NAME = "study-buddy";
+const DB_VERSION = 3;
+
+// Object stores and their indexes, created on first open.
+const STORES = {
+  ttsAudio: { keyPath: "key", indexes: { lastUsed: "lastUsed" } },
+  transcript: { keyPath: "id", indexes: { bySeq: ["conversationId", "seq"] } },
+  conversations: { keyPath: "conversationId", indexes: {} },
+};
+
+let dbPromise = null;
+
+export function openDatabase() {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      if (!("indexedDB" in window)) {
+        reject(new Error("IndexedDB is not available"));
+        return;
+      }
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        Object.entries(STORES).forEach(([name, { keyPath, indexes }]) => {
+          if (db.objectStoreNames.contains(name)) return;
+          const store = db.createObjectStore(name, { keyPath });
+          Object.entries(indexes).forEach(([indexName, path]) => {
+            store.createIndex(indexName, path);
+          });
+        });
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+    // Let a later call retry if opening failed (e.g. private browsing)
+    dbPromise.catch(() => {
+      dbPromise = null;
+    });
+  }
+  return dbPromise;
+}
+
+export function promisifyRequest(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+// Run `fn(store)` in a transaction and resolve with its result once the
+// transaction has committed.
+export async function withStore(name, mode, fn) {
+  const db = await openDatabase();
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(name, mode);
+    let result;
+    Promise.resolve(fn(tx.objectStore(name))).then((value) => {
+      result = value;
+    }, reject);
+    tx.oncomplete = () => resolve(result);
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
@@ -0,0 +1,49 @@
+// Personalities shown in the app. This is display data only: each
+// persona's system prompt and voice live in the gateway
+// (study-buddy/gateway/gateway/personalities.py), keyed by the same `key`.
+export const PERSONALITIES = [
+  {
+    key: "friendly_tutor",
+    name: "Friendly Tutor",
+    description: "A bubbly, patient teacher who explains with real-life mini examples and emojis. Ideal for Grades 4–8."
+  },
+  {
+    key: "serious_professor",
+    name: "Serious Professor",
+    description: "A calm, precise educator with academic tone; uses structure, logic, and brief examples. Ideal for high-school or university."
+  },
+  {
+    key: "storyteller",
+    name: "Storyteller",
+    description: "A creative explainer who turns lessons into tiny imaginative stories or metaphors that stick."
+  },
+  {
+    key: "motivator",
+    name: "Coach Commander",
+    description: "A bold, high-energy commander who motivates learners with military-level focus and discipline."
+  },
+  {
+    key: "visionary_ceo",
+    name: "Visionary CEO",
+    description: "A strategic, forward-thinking leader who connects learning to real-world innovation, leadership, and impact."
+  },
+  {
+    key: "pro_gamer",
+    name: "Pro Gamer",
+    description: "A gaming legend who teaches concepts using gaming terminology, strategies, and epic quest vibes. Perfect for gamers who want to level up their knowledge."
+  },
+  {
+    key: "brainrot_buddy",
+    name: "Brainrot Buddy",
+    description: "Your chronically online bestie who speaks fluent Gen Z and explains concepts using memes, slang, and unhinged internet energy. It's giving educational chaos."
+  },
+  {
+    key: "rhyming_rapper",
+    name: "Rhyming Rapper",
+    description: "A cool educator who explains everything in catchy rhymes and beats."
+  }
+];
+
+export function getPersonalityName(key) {
+  return PERSONALITIES.find(p => p.key === key)?.name || key;
+}
@@ -0,0 +1,107 @@
+// Chunking and BM25 ranking for attached study documents. Used inside the
+// ingestion worker; nothing here touches the DOM.
+
+const K1 = 1.2;
+const B = 0.75;
+
+const STOPWORDS = new Set(
+  ("a an and are as at be but by for from has have he her his how i if in into is it its " +
+    "me my no not of on or our she so than that the their them then there these they this " +
+    "to was we were what when where which who why will with you your").split(" ")
+);
+
+export function tokenize(text) {
+  const words = text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+  return words.filter((word) => word.length > 1 && !STOPWORDS.has(word));
+}
+
+// Rough token count (about four characters per token for English text);
+// good enough for budgeting without shipping a tokenizer.
+export function estimateTokens(text) {
+  return Math.ceil(text.length / 4);
+}
+
+// Split one page of text into overlapping word windows so an answer that
+// straddles a boundary is still found whole in at least one chunk.
+export function chunkText(text, { maxWords = 180, overlap = 30 } = {}) {
+  const words = text.split(/\s+/).filter(Boolean);
+  const chunks = [];
+  const step = Math.max(1, maxWords - overlap);
+  for (let start = 0; start < words.length; start += step) {
+    chunks.push(words.slice(start, start + maxWords).join(" "));
+    if (start + maxWords >= words.length) break;
+  }
+  return chunks;
+}
+
+// Inverted index: term -> parallel arrays of chunk ids and term frequencies.
+export function createBm25Index() {
+  const postings = new Map();
+  const chunks = [];
+  const lengths = [];
+  let totalLength = 0;
+
+  return {
+    // `chunk` is { text, source, page }; returns its id.
+    add(chunk) {
+      const id = chunks.length;
+      const terms = tokenize(chunk.text);
+      chunks.push(chunk);
+      lengths.push(terms.length);
+      totalLength += terms.length;
+
+      const counts = new Map();
+      terms.forEach((term) => counts.set(term, (counts.get(term) || 0) + 1));
+      counts.forEach((tf, term) => {
+        let list = postings.get(term);
+        if (!list) {
+          list = { ids: [], tfs: [] };
+          postings.set(term, list);
+        }
+        list.ids.push(id);
+        list.tfs.push(tf);
+      });
+      return id;
+    },
+
+    search(query, k = 5) {
+      if (chunks.length === 0) return [];
+      const avgLength = totalLength / chunks.length || 1;
+      const scores = new Map();
+
+      new Set(tokenize(query)).forEach((term) => {
+        const list = postings.get(term);
+        if (!list) return;
+        const df = list.ids.length;
+        const idf = Math.log(1 + (chunks.length - df + 0.5) / (df + 0.5));
+        for (let i = 0; i < df; i++) {
+          const id = list.ids[i];
+          const tf = list.tfs[i];
+          const norm = tf + K1 * (1 - B + (B * lengths[id]) / avgLength);
+          scores.set(id, (scores.get(id) || 0) + (idf * tf * (K1 + 1)) / norm);
+        }
+      });
+
+      return Array.from(scores, ([id, score]) => ({ ...chunks[id], score }))
+        .sort((a, b) => b.score - a.score)
+        .slice(0, k);
+    },
+
+    get size() {
+      return chunks.length;
+    },
+  };
+}
+
+// Keep the best-ranked passages that fit in `tokenBudget`.
+export function selectWithinBudget(passages, tokenBudget) {
+  const selected = [];
+  let used = 0;
+  for (const passage of passages) {
+    const cost = estimateTokens(passage.text);
+    if (used + cost > tokenBudget) continue;
+    selected.push(passage);
+    used += cost;
+  }
+  return selected;
+}
@@ -0,0 +1,164 @@
+// Request scheduler for gateway calls:
+//
+//   - bounded concurrency, higher `priority` first (FIFO within a priority)
+//   - identical requests (same `key`) share one upstream call
+//   - every caller can cancel through an AbortSignal; the upstream call is
+//     aborted once no caller is waiting for it any more
+//   - 429/5xx and network failures are retried with exponential backoff and
+//     full jitter, waiting at least as long as a Retry-After header asks
+
+export const PRIORITY = {
+  BACKGROUND: 0, // rolling summaries and other work nobody is waiting on
+  REPLAY: 1, // re-playing an earlier answer
+  CURRENT: 2, // the turn the student is waiting for
+};
+
+const DEFAULT_RETRY = { retries: 3, baseMs: 400, maxMs: 8000 };
+
+// An error carrying an HTTP status and the Retry-After delay (ms), if any.
+export class HttpError extends Error {
+  constructor(message, status, retryAfterMs = null) {
+    super(message);
+    this.name = "HttpError";
+    this.status = status;
+    this.retryAfterMs = retryAfterMs;
+  }
+}
+
+// Retry-After is either a number of seconds or an HTTP date.
+export function parseRetryAfter(value) {
+  if (!value) return null;
+  const seconds = Number(value);
+  if (Number.isFinite(seconds)) return Math.max(0, seconds * 1000);
+  const date = Date.parse(value);
+  return Number.isNaN(date) ? null : Math.max(0, date - Date.now());
+}
+
+function isRetryable(error) {
+  if (error.name === "AbortError") return false;
+  if (error instanceof HttpError) return error.status === 429 || error.status >= 500;
+  // fetch() rejects with a TypeError on network failure
+  return error instanceof TypeError;
+}
+
+function backoffDelay(error, attempt, { baseMs, maxMs }) {
+  const jittered = Math.random() * Math.min(maxMs, baseMs * 2 ** attempt);
+  return Math.max(jittered, error.retryAfterMs ?? 0);
+}
+
+function abortError() {
+  return new DOMException("The request was cancelled", "AbortError");
+}
+
+export function createScheduler({ maxConcurrent = 4 } = {}) {
+  const queue = []; // jobs waiting for a slot
+  const byKey = new Map(); // dedupe key -> job
+  let running = 0;
+  let sequence = 0;
+
+  const pump = () => {
+    while (running < maxConcurrent && queue.length > 0) {
+      const job = queue.shift();
+      if (job.controller.signal.aborted) continue;
+      running += 1;
+      execute(job).finally(() => {
+        running -= 1;
+        pump();
+      });
+    }
+  };
+
+  const enqueue = (job) => {
+    job.order = sequence++;
+    // Keep the queue sorted: priority descending, then arrival order
+    let index = queue.findIndex(
+      (other) => other.priority < job.priority || (other.priority === job.priority && other.order > job.order)
+    );
+    if (index === -1) index = queue.length;
+    queue.splice(index, 0, job);
+    pump();
+  };
+
+  const settle = (job, outcome, value) => {
+    if (job.key !== undefined && byKey.get(job.key) === job) byKey.delete(job.key);
+    job.waiters.forEach((waiter) => waiter.detach());
+    job.waiters.forEach((waiter) => waiter[outcome](value));
+    job.waiters.clear();
+  };
+
+  const execute = async (job) => {
+    try {
+      const value = await job.run(job.controller.signal);
+      settle(job, "resolve", value);
+    } catch (error) {
+      if (job.controller.signal.aborted) return; // waiters already rejected
+      if (job.attempt < job.retry.retries && isRetryable(error)) {
+        const delay = backoffDelay(error, job.attempt, job.retry);
+        job.attempt += 1;
+        // Wait outside the concurrency slot, then queue up again
+        job.retryTimer = setTimeout(() => {
+          job.retryTimer = null;
+          if (!job.controller.signal.aborted) enqueue(job);
+        }, delay);
+        return;
+      }
+      settle(job, "reject", error);
+    }
+  };
+
+  return {
+    // Run `run(signal)` when a slot is free. Resolves or rejects with its
+    // result; rejects with an AbortError if `signal` fires first.
+    schedule({ run, key, priority = PRIORITY.CURRENT, signal, retry }) {
+      if (signal?.aborted) return Promise.reject(abortError());
+
+      let job = key !== undefined ? byKey.get(key) : undefined;
+      if (job) {
+        // A more urgent duplicate lifts a queued request
+        if (priority > job.priority && queue.includes(job)) {
+          queue.splice(queue.indexOf(job), 1);
+          job.priority = priority;
+          enqueue(job);
+        }
+      } else {
+        job = {
+          run,
+          key,
+          priority,
+          retry: { ...DEFAULT_RETRY, ...retry },
+          attempt: 0,
+          controller: new AbortController(),
+          waiters: new Set(),
+          retryTimer: null,
+        };
+        if (key !== undefined) byKey.set(key, job);
+        enqueue(job);
+      }
+
+      return new Promise((resolve, reject) => {
+        const waiter = { resolve, reject, detach: () => {} };
+        if (signal) {
+          const onAbort = () => {
+            job.waiters.delete(waiter);
+            reject(abortError());
+            // Nobody is left waiting: cancel the upstream call
+            if (job.waiters.size === 0) {
+              job.controller.abort();
+              clearTimeout(job.retryTimer);
+              const queued = queue.indexOf(job);
+              if (queued !== -1) queue.splice(queued, 1);
+              if (byKey.get(job.key) === job) byKey.delete(job.key);
+            }
+          };
+          signal.addEventListener("abort", onAbort, { once: true });
+          waiter.detach = () => signal.removeEventListener("abort", onAbort);
+        }
+        job.waiters.add(waiter);
+      });
+    },
+
+    get pending() {
+      return queue.length + running;
+    },
+  };
+}
@@ -0,0 +1,218 @@
+import { after, before, describe, it } from "node:test";
+import assert from "node:assert/strict";
+import { createServer } from "node:http";
+
+import { createScheduler, HttpError, parseRetryAfter, PRIORITY } from "./scheduler.js";
+
+// Local stand-in for the gateway. `/<name>?delay=ms` answers after `delay`;
+// `fail=n&status=s&retryAfter=v` answers the first n requests for a name
+// with status s (and a Retry-After header). Every request is logged, and
+// so is every request the client gave up on before it was answered.
+const requests = [];
+const cancelled = [];
+let baseUrl;
+let server;
+
+before(async () => {
+  server = createServer((req, res) => {
+    const url = new URL(req.url, "http://stub");
+    const name = url.pathname.slice(1);
+    const attempt = requests.filter((request) => request.name === name).length;
+    requests.push({ name, at: performance.now() });
+    res.on("close", () => {
+      if (!res.writableFinished) cancelled.push(name);
+    });
+
+    const delay = Number(url.searchParams.get("delay") || 0);
+    setTimeout(() => {
+      if (attempt < Number(url.searchParams.get("fail") || 0)) {
+        const retryAfter = url.searchParams.get("retryAfter");
+        res.writeHead(Number(url.searchParams.get("status")), retryAfter ? { "Retry-After": retryAfter } : {});
+        res.end("stub failure");
+        return;
+      }
+      res.end(name);
+    }, delay);
+  });
+  await new Promise((resolve) => server.listen(0, "127.0.0.1", resolve));
+  baseUrl = `http://127.0.0.1:${server.address().port}`;
+});
+
+after(() => {
+  server.closeAllConnections();
+  server.close();
+});
+
+// What gateway.js does for every call
+async function get(path, signal) {
+  const response = await fetch(`${baseUrl}/${path}`, { signal });
+  if (!response.ok) {
+    throw new HttpError(
+      `stub ${path} failed (${response.status})`,
+      response.status,
+      parseRetryAfter(response.headers.get("Retry-After"))
+    );
+  }
+  return response.text();
+}
+
+const job = (path, options = {}) => ({ run: (signal) => get(path, signal), ...options });
+const arrivals = (prefix) => requests.filter(({ name }) => name.startsWith(prefix)).map(({ name }) => name);
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+describe("createScheduler", () => {
+  it("runs higher priorities first, in arrival order within a priority", async () => {
+    const scheduler = createScheduler({ maxConcurrent: 1 });
+    const results = await Promise.all([
+      scheduler.schedule(job("order-blocker?delay=50")),
+      scheduler.schedule(job("order-summary", { priority: PRIORITY.BACKGROUND })),
+      scheduler.schedule(job("order-replay", { priority: PRIORITY.REPLAY })),
+      scheduler.schedule(job("order-turn1", { priority: PRIORITY.CURRENT })),
+      scheduler.schedule(job("order-turn2", { priority: PRIORITY.CURRENT })),
+    ]);
+
+    assert.deepEqual(results, ["order-blocker", "order-summary", "order-replay", "order-turn1", "order-turn2"]);
+    assert.deepEqual(arrivals("order-"), ["order-blocker", "order-turn1", "order-turn2", "order-replay", "order-summary"]);
+  });
+
+  it("never runs more than maxConcurrent calls at once", async () => {
+    const scheduler = createScheduler({ maxConcurrent: 2 });
+    let running = 0;
+    let peak = 0;
+    const run = async (signal) => {
+      running += 1;
+      peak = Math.max(peak, running);
+      try {
+        return await get("limit?delay=20", signal);
+      } finally {
+        running -= 1;
+      }
+    };
+    await Promise.all(Array.from({ length: 6 }, () => scheduler.schedule({ run })));
+    assert.equal(peak, 2);
+    assert.equal(scheduler.pending, 0);
+  });
+
+  it("shares one upstream call between identical requests", async () => {
+    const scheduler = createScheduler();
+    const results = await Promise.all([
+      scheduler.schedule(job("dedupe?delay=30", { key: "same" })),
+      scheduler.schedule(job("dedupe?delay=30", { key: "same" })),
+      scheduler.schedule(job("dedupe?delay=30", { key: "same" })),
+    ]);
+
+    assert.deepEqual(results, ["dedupe", "dedupe", "dedupe"]);
+    assert.equal(arrivals("dedupe").length, 1);
+    // Once settled, the same key makes a new call
+    await scheduler.schedule(job("dedupe", { key: "same" }));
+    assert.equal(arrivals("dedupe").length, 2);
+  });
+
+  it("lifts a queued request when a more urgent duplicate arrives", async () => {
+    const scheduler = createScheduler({ maxConcurrent: 1 });
+    const pending = [
+      scheduler.schedule(job("lift-blocker?delay=50")),
+      scheduler.schedule(job("lift-other", { priority: PRIORITY.BACKGROUND })),
+      scheduler.schedule(job("lift-audio", { key: "audio", priority: PRIORITY.BACKGROUND })),
+      scheduler.schedule(job("lift-turn", { priority: PRIORITY.CURRENT })),
+      scheduler.schedule(job("lift-audio", { key: "audio", priority: PRIORITY.CURRENT })),
+    ];
+    await Promise.all(pending);
+
+    assert.deepEqual(arrivals("lift-"), ["lift-blocker", "lift-turn", "lift-audio", "lift-other"]);
+  });
+
+  it("keeps the call going while any caller still waits for it", async () => {
+    const scheduler = createScheduler();
+    const leaving = new AbortController();
+    const first = scheduler.schedule(job("shared?delay=80", { key: "shared", signal: leaving.signal }));
+    const second = scheduler.schedule(job("shared?delay=80", { key: "shared" }));
+    await sleep(20);
+    leaving.abort();
+
+    await assert.rejects(first, { name: "AbortError" });
+    assert.equal(await second, "shared");
+    assert.deepEqual(cancelled.filter((name) => name === "shared"), []);
+  });
+
+  it("aborts the upstream call once the last caller cancels", async () => {
+    const scheduler = createScheduler();
+    const controllers = [new AbortController(), new AbortController()];
+    const callers = controllers.map((controller) =>
+      scheduler.schedule(job("abandoned?delay=500", { key: "abandoned", signal: controller.signal }))
+    );
+    await sleep(50);
+    controllers.forEach((controller) => controller.abort());
+
+    for (const caller of callers) await assert.rejects(caller, { name: "AbortError" });
+    await sleep(50);
+    assert.deepEqual(cancelled.filter((name) => name === "abandoned"), ["abandoned"]);
+    assert.equal(scheduler.pending, 0);
+  });
+
+  it("drops a queued request that is cancelled before it starts", async () => {
+    const scheduler = createScheduler({ maxConcurrent: 1 });
+    const controller = new AbortController();
+    const blocker = scheduler.schedule(job("queued-blocker?delay=50"));
+    const queued = scheduler.schedule(job("queued-dropped", { signal: controller.signal }));
+    controller.abort();
+
+    await assert.rejects(queued, { name: "AbortError" });
+    await blocker;
+    await sleep(20);
+    assert.deepEqual(arrivals("queued-"), ["queued-blocker"]);
+  });
+
+  it("rejects at once when the signal has already fired", async () => {
+    const scheduler = createScheduler();
+    await assert.rejects(scheduler.schedule(job("never", { signal: AbortSignal.abort() })), { name: "AbortError" });
+    assert.deepEqual(arrivals("never"), []);
+  });
+
+  it("waits as long as Retry-After asks before retrying a 429", async (t) => {
+    // No jitter, so the delay is exactly what the header asks for
+    t.mock.method(Math, "random", () => 0);
+    const scheduler = createScheduler();
+    const result = await scheduler.schedule(job("limited?fail=1&status=429&retryAfter=0.3"));
+
+    assert.equal(result, "limited");
+    const [first, second] = requests.filter(({ name }) => name === "limited");
+    assert.ok(second.at - first.at >= 290, `retried after ${second.at - first.at} ms`);
+  });
+
+  it("backs off exponentially on 5xx and gives up after the last retry", async (t) => {
+    t.mock.method(Math, "random", () => 1);
+    const scheduler = createScheduler();
+    const retry = { retries: 2, baseMs: 40, maxMs: 1000 };
+
+    await assert.rejects(scheduler.schedule(job("down?fail=9&status=503", { retry })), (error) => {
+      assert.ok(error instanceof HttpError);
+      assert.equal(error.status, 503);
+      return true;
+    });
+    const attempts = requests.filter(({ name }) => name === "down");
+    assert.equal(attempts.length, 3);
+    // 40 ms, then 80 ms
+    assert.ok(attempts[1].at - attempts[0].at >= 35);
+    assert.ok(attempts[2].at - attempts[1].at >= 75);
+
+    assert.equal(await scheduler.schedule(job("recovers?fail=2&status=500", { retry })), "recovers");
+    assert.equal(arrivals("recovers").length, 3);
+  });
+
+  it("does not retry other client errors", async () => {
+    const scheduler = createScheduler();
+    await assert.rejects(scheduler.schedule(job("missing?fail=1&status=404")), { status: 404 });
+    assert.equal(arrivals("missing").length, 1);
+  });
+});
+
+describe("parseRetryAfter", () => {
+  it("reads seconds and HTTP dates", () => {
+    assert.equal(parseRetryAfter("2"), 2000);
+    assert.equal(parseRetryAfter(null), null);
+    assert.equal(parseRetryAfter("soon"), null);
+    const inFiveSeconds = new Date(Date.now() + 5000).toUTCString();
+    assert.ok(Math.abs(parseRetryAfter(inFiveSeconds) - 5000) <= 1000);
+  });
+});
@@ -0,0 +1,94 @@
+// Splits a streaming LLM response into speakable chunks so TTS can start
+// on the first sentence while the rest of the answer is still arriving.
+
+// End of a sentence: terminal punctuation (plus closing quotes/brackets)
+// followed by whitespace, or a blank line.
+export const SENTENCE_BOUNDARY = /[.!?…]+["')\]]*\s+|\n{2,}/g;
+
+// Don't send tiny fragments ("Yes!") to TTS on their own; merge them with
+// the next sentence. The first chunk is allowed to be shorter so audio
+// starts as early as possible.
+export const MIN_FIRST_CHUNK_CHARS = 20;
+export const MIN_CHUNK_CHARS = 60;
+// Force a cut when the model produces a long run without punctuation.
+export const MAX_CHUNK_CHARS = 300;
+
+export function createSentenceChunker({ charLimit = Infinity, onChunk }) {
+  let buffer = "";
+  let text = ""; // everything accepted so far, for display
+  let consumed = 0; // characters accepted from the stream so far
+  let emitted = 0; // chunks handed to onChunk
+  let truncated = false;
+
+  const minChars = () => (emitted === 0 ? MIN_FIRST_CHUNK_CHARS : MIN_CHUNK_CHARS);
+
+  const emit = (raw) => {
+    const chunk = raw.trim();
+    if (!chunk) return;
+    onChunk(chunk, emitted);
+    emitted += 1;
+  };
+
+  const drain = () => {
+    while (buffer.length > 0) {
+      let cut = -1;
+      SENTENCE_BOUNDARY.lastIndex = 0;
+      let match;
+      while ((match = SENTENCE_BOUNDARY.exec(buffer)) !== null) {
+        const end = match.index + match[0].length;
+        if (end >= minChars()) {
+          cut = end;
+          break;
+        }
+      }
+
+      if (cut === -1 && buffer.length > MAX_CHUNK_CHARS) {
+        const space = buffer.lastIndexOf(" ", MAX_CHUNK_CHARS);
+        cut = space > 0 ? space + 1 : MAX_CHUNK_CHARS;
+      }
+      if (cut === -1) return;
+
+      emit(buffer.slice(0, cut));
+      buffer = buffer.slice(cut);
+    }
+  };
+
+  return {
+    // Feed the next piece of streamed text. Returns false once the
+    // character limit has been reached and the caller should stop reading.
+    push(piece) {
+      if (truncated) return false;
+
+      const room = charLimit - consumed;
+      if (piece.length > room) {
+        const tail = piece.slice(0, room) + "...";
+        buffer += tail;
+        text += tail;
+        consumed = charLimit;
+        truncated = true;
+        drain();
+        return false;
+      }
+
+      buffer += piece;
+      text += piece;
+      consumed += piece.length;
+      drain();
+      return true;
+    },
+
+    // Emit whatever is left once the stream has ended.
+    flush() {
+      emit(buffer);
+      buffer = "";
+    },
+
+    get text() {
+      return text;
+    },
+
+    get truncated() {
+      return truncated;
+    },
+  };
+}
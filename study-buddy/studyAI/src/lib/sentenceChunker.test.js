@@ -0,0 +1,62 @@
+import { describe, it } from "node:test";
+import assert from "node:assert/strict";
+import { readFileSync } from "node:fs";
+
+import {
+  createSentenceChunker,
+  MAX_CHUNK_CHARS,
+  MIN_CHUNK_CHARS,
+  MIN_FIRST_CHUNK_CHARS,
+  SENTENCE_BOUNDARY,
+} from "./sentenceChunker.js";
+
+// Shared with the gateway's replay benchmark, whose Python port of the
+// chunker runs the same cases (gateway/tests/test_replay_chunker.py)
+const fixture = JSON.parse(readFileSync(new URL("./sentenceChunker.cases.json", import.meta.url), "utf8"));
+
+function chunkAll(pieces, options = {}) {
+  const chunks = [];
+  const chunker = createSentenceChunker({ ...options, onChunk: (chunk) => chunks.push(chunk) });
+  for (const piece of pieces) {
+    if (!chunker.push(piece)) break;
+  }
+  chunker.flush();
+  return { chunks, chunker };
+}
+
+describe("createSentenceChunker", () => {
+  it("uses the shared constants", () => {
+    assert.deepEqual(
+      {
+        sentenceBoundary: SENTENCE_BOUNDARY.source,
+        minFirstChunkChars: MIN_FIRST_CHUNK_CHARS,
+        minChunkChars: MIN_CHUNK_CHARS,
+        maxChunkChars: MAX_CHUNK_CHARS,
+      },
+      fixture.constants
+    );
+  });
+
+  for (const { name, pieces, charLimit, chunks, text, truncated } of fixture.cases) {
+    it(name, () => {
+      const result = chunkAll(pieces, { charLimit: charLimit ?? Infinity });
+      assert.deepEqual(result.chunks, chunks);
+      assert.equal(result.chunker.text, text);
+      assert.equal(result.chunker.truncated, truncated);
+    });
+  }
+
+  it("emits a sentence as soon as it is complete", () => {
+    const chunks = [];
+    const chunker = createSentenceChunker({ onChunk: (chunk) => chunks.push(chunk) });
+
+    chunker.push("Photosynthesis turns light into sugar. Plants");
+    assert.deepEqual(chunks, ["Photosynthesis turns light into sugar."]);
+  });
+
+  it("refuses more text once truncated", () => {
+    const { chunker } = chunkAll(["The answer starts here. ", "and then some more."], { charLimit: 10 });
+    assert.equal(chunker.push("more"), false);
+    assert.equal(chunker.text, "The answer...");
+  });
+});
@@ -0,0 +1,182 @@
+// Per-turn latency tracing. Each chat turn gets a trace that records timed
+// spans for its stages (context build, prompt build, file encoding, LLM
+// time-to-first-byte and total, TTS requests, audio decode, playback start).
+// Finished traces go to every registered sink.
+
+const GATEWAY_URL = import.meta.env.VITE_GATEWAY_URL || "/api";
+
+// Keeps the most recent traces in memory for the performance panel.
+export function createRingBufferSink(capacity = 500) {
+  const traces = [];
+  const listeners = new Set();
+  let snapshot = [];
+
+  return {
+    record(trace) {
+      traces.push(trace);
+      if (traces.length > capacity) traces.shift();
+      snapshot = traces.slice();
+      listeners.forEach((listener) => listener());
+    },
+    // Stable between records, for useSyncExternalStore
+    getTraces() {
+      return snapshot;
+    },
+    subscribe(listener) {
+      listeners.add(listener);
+      return () => listeners.delete(listener);
+    },
+  };
+}
+
+// Mirrors spans into the browser's Performance timeline (DevTools).
+export function createPerformanceSink() {
+  return {
+    record(trace) {
+      trace.spans.forEach((span) => {
+        try {
+          performance.measure(`turn:${span.name}`, {
+            start: trace.start + span.start,
+            duration: span.duration,
+            detail: { turn: trace.id, personality: trace.personality, ...span.attributes },
+          });
+        } catch {
+          // measure() with options is missing in older browsers
+        }
+      });
+    },
+  };
+}
+
+// Sends traces to the gateway's /traces endpoint in small batches.
+export function createGatewaySink({ batchSize = 10, flushMs = 5000 } = {}) {
+  let batch = [];
+  let timer = null;
+
+  const flush = () => {
+    clearTimeout(timer);
+    timer = null;
+    if (batch.length === 0) return;
+    const body = JSON.stringify({ traces: batch });
+    batch = [];
+    fetch(`${GATEWAY_URL}/traces`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body,
+      keepalive: true,
+    }).catch(() => {});
+  };
+
+  window.addEventListener("pagehide", flush);
+
+  return {
+    record(trace) {
+      batch.push(trace);
+      if (batch.length >= batchSize) flush();
+      else if (!timer) timer = setTimeout(flush, flushMs);
+    },
+  };
+}
+
+export const traceBuffer = createRingBufferSink();
+
+const sinks = [traceBuffer, createPerformanceSink()];
+if (import.meta.env.VITE_TRACE_TO_GATEWAY === "true") sinks.push(createGatewaySink());
+
+export function addTraceSink(sink) {
+  sinks.push(sink);
+  return () => sinks.splice(sinks.indexOf(sink), 1);
+}
+
+let nextTraceId = 1;
+
+export function startTurnTrace({ personality }) {
+  const start = performance.now();
+  const trace = {
+    id: nextTraceId++,
+    personality,
+    start,
+    duration: null,
+    status: null,
+    spans: [],
+    attributes: {},
+  };
+  const relative = (time) => time - start;
+
+  // Add a span whose start and end were measured elsewhere
+  // (performance.now() timestamps).
+  const record = (name, spanStart, spanEnd, attributes = {}) => {
+    if (trace.duration !== null) return;
+    trace.spans.push({
+      name,
+      start: relative(spanStart),
+      duration: Math.max(0, spanEnd - spanStart),
+      attributes,
+    });
+  };
+
+  return {
+    startTime: start,
+    now: () => performance.now(),
+    record,
+
+    // Start a span; call the returned function (optionally with attributes)
+    // to end it.
+    span(name, attributes = {}) {
+      const spanStart = performance.now();
+      return (endAttributes = {}) => {
+        record(name, spanStart, performance.now(), { ...attributes, ...endAttributes });
+      };
+    },
+
+    setAttributes(attributes) {
+      Object.assign(trace.attributes, attributes);
+    },
+
+    end(status = "ok") {
+      if (trace.duration !== null) return;
+      trace.duration = relative(performance.now());
+      trace.status = status;
+      sinks.forEach((sink) => {
+        try {
+          sink.record(trace);
+        } catch (error) {
+          console.warn("Trace sink failed:", error);
+        }
+      });
+    },
+  };
+}
+
+function percentile(sorted, p) {
+  if (sorted.length === 0) return null;
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+  return sorted[Math.max(0, index)];
+}
+
+// Rolling p50/p95 of every stage, grouped by personality:
+// { [personality]: { [stage]: { count, p50, p95 } } }
+export function summarizeTraces(traces) {
+  const samples = {};
+  traces.forEach((trace) => {
+    const byStage = (samples[trace.personality] ||= {});
+    (byStage.turn ||= []).push(trace.duration);
+    trace.spans.forEach((span) => {
+      (byStage[span.name] ||= []).push(span.duration);
+    });
+  });
+
+  const summary = {};
+  Object.entries(samples).forEach(([personality, byStage]) => {
+    summary[personality] = {};
+    Object.entries(byStage).forEach(([stage, durations]) => {
+      const sorted = durations.slice().sort((a, b) => a - b);
+      summary[personality][stage] = {
+        count: sorted.length,
+        p50: percentile(sorted, 50),
+        p95: percentile(sorted, 95),
+      };
+    });
+  });
+  return summary;
+}
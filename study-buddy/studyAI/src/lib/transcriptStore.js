@@ -0,0 +1,83 @@
+// Persists chat messages in IndexedDB so a study session survives reloads.
+// Messages are read back newest-first in pages, so opening a long
+// transcript only loads what is on screen. The conversation's rolling
+// summary is saved alongside, so a reload doesn't resend or re-summarize
+// everything the summary already covered.
+
+import { promisifyRequest, withStore } from "./idb";
+
+const STORE = "transcript";
+const SUMMARY_STORE = "conversations";
+const PAGE_SIZE = 50;
+
+let lastSeq = 0;
+
+// Stable identity and ordering for a new message.
+export function createMessageMeta() {
+  lastSeq = Math.max(Date.now(), lastSeq + 1);
+  const id = crypto.randomUUID ? crypto.randomUUID() : `${lastSeq}-${Math.random().toString(36).slice(2)}`;
+  return { id, seq: lastSeq };
+}
+
+export async function saveMessage(conversationId, message) {
+  try {
+    await withStore(STORE, "readwrite", (store) => {
+      store.put({ ...message, conversationId });
+    });
+  } catch (error) {
+    console.warn("Saving message failed:", error);
+  }
+}
+
+// Up to `limit` messages older than `beforeSeq`, oldest first, and whether
+// there are more before them.
+export async function loadTranscriptPage(conversationId, { beforeSeq = Infinity, limit = PAGE_SIZE } = {}) {
+  try {
+    return await withStore(STORE, "readonly", (store) => new Promise((resolve, reject) => {
+      const range = IDBKeyRange.bound([conversationId, -Infinity], [conversationId, beforeSeq], false, true);
+      const messages = [];
+      const cursorRequest = store.index("bySeq").openCursor(range, "prev");
+      cursorRequest.onerror = () => reject(cursorRequest.error);
+      cursorRequest.onsuccess = () => {
+        const cursor = cursorRequest.result;
+        if (cursor && messages.length <= limit) {
+          messages.push(cursor.value);
+          cursor.continue();
+          return;
+        }
+        const hasMore = messages.length > limit;
+        const page = messages.slice(0, limit).reverse();
+        page.forEach((message) => {
+          lastSeq = Math.max(lastSeq, message.seq);
+        });
+        resolve({ messages: page, hasMore });
+      };
+    }));
+  } catch (error) {
+    console.warn("Loading transcript failed:", error);
+    return { messages: [], hasMore: false };
+  }
+}
+
+// { summary, lastSummarizedId } as last saved, or null.
+export async function loadConversationSummary(conversationId) {
+  try {
+    const record = await withStore(SUMMARY_STORE, "readonly", (store) =>
+      promisifyRequest(store.get(conversationId))
+    );
+    return record ? { summary: record.summary, lastSummarizedId: record.lastSummarizedId } : null;
+  } catch (error) {
+    console.warn("Loading conversation summary failed:", error);
+    return null;
+  }
+}
+
+export async function saveConversationSummary(conversationId, { summary, lastSummarizedId }) {
+  try {
+    await withStore(SUMMARY_STORE, "readwrite", (store) => {
+      store.put({ conversationId, summary, lastSummarizedId });
+    });
+  } catch (error) {
+    console.warn("Saving conversation summary failed:", error);
+  }
+}
@@ -0,0 +1,84 @@
+// Document ingestion worker: extracts text from attached files page by
+// page, chunks it and keeps a BM25 index of every document attached in
+// this chat. The main thread only sends files and queries.
+
+import { extractDocx, extractPdf, extractText } from "../lib/documentText";
+import { chunkText, createBm25Index, selectWithinBudget } from "../lib/retrieval";
+
+const index = createBm25Index();
+
+// The parsers are large, so they are only loaded for the first file that
+// needs them.
+let pdfjsPromise = null;
+function loadPdfjs() {
+  if (!pdfjsPromise) {
+    pdfjsPromise = Promise.all([
+      import("pdfjs-dist"),
+      import("pdfjs-dist/build/pdf.worker.min.mjs?url"),
+    ]).then(([pdfjsLib, workerUrl]) => {
+      pdfjsLib.GlobalWorkerOptions.workerSrc = workerUrl.default;
+      return pdfjsLib;
+    });
+  }
+  return pdfjsPromise;
+}
+
+function addPage(text, source, page) {
+  let added = 0;
+  chunkText(text).forEach((chunk) => {
+    index.add({ text: chunk, source, page });
+    added += 1;
+  });
+  return added;
+}
+
+async function ingestPdf(file, onSection) {
+  const pdfjsLib = await loadPdfjs();
+  await extractPdf(pdfjsLib, await file.arrayBuffer(), onSection);
+}
+
+async function ingestDocx(file, onSection) {
+  const { default: mammoth } = await import("mammoth");
+  await extractDocx(mammoth, await file.arrayBuffer(), onSection);
+}
+
+function extractorFor(file) {
+  const name = file.name.toLowerCase();
+  if (file.type === "application/pdf" || name.endsWith(".pdf")) return ingestPdf;
+  if (name.endsWith(".docx")) return ingestDocx;
+  if (file.type.startsWith("text/") || name.endsWith(".txt")) return extractText;
+  return null;
+}
+
+async function ingest({ id, file }) {
+  const extract = extractorFor(file);
+  if (!extract) throw new Error(`Unsupported document type: ${file.name}`);
+
+  let pages = 0;
+  let chunks = 0;
+  const started = performance.now();
+  await extract(file, (text, { page, totalPages, fraction }) => {
+    // Only paged formats (PDF) count pages; text is read in arbitrary slices
+    if (page !== null) pages += 1;
+    chunks += addPage(text, file.name, page);
+    self.postMessage({ id, type: "progress", pages, totalPages, fraction });
+  });
+  return { pages, chunks, ms: performance.now() - started };
+}
+
+function search({ query, k, tokenBudget }) {
+  return selectWithinBudget(index.search(query, k), tokenBudget).map(({ text, source, page }) => ({
+    text,
+    source,
+    page,
+  }));
+}
+
+self.onmessage = async ({ data }) => {
+  try {
+    const result = data.type === "ingest" ? await ingest(data) : search(data);
+    self.postMessage({ id: data.id, type: "done", result });
+  } catch (error) {
+    self.postMessage({ id: data.id, type: "error", message: error.message });
+  }
+};
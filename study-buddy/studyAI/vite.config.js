@@ -1,7 +1,27 @@
+import process from 'node:process'
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
+import bundleBudget from './scripts/bundle-budget.js'
 
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [
+    react(),
+    // Fail the build if the JS needed to render /setup grows past this
+    bundleBudget({ maxGzipKb: Number(process.env.INITIAL_JS_BUDGET_KB || 100) }),
+  ],
+  // ES workers so the ingestion worker can lazy-load pdfjs/mammoth
+  worker: {
+    format: 'es',
+  },
+  server: {
+    // Forward API calls to the local gateway (see ../gateway)
+    proxy: {
+      '/api': {
+        target: process.env.GATEWAY_URL || 'http://127.0.0.1:8787',
+        changeOrigin: true,
+        rewrite: (path) => path.replace(/^\/api/, ''),
+      },
+    },
+  },
 })